@@ -10,8 +10,10 @@ import concurrent.futures
 import datetime
 import json
 import logging
+import os
+import threading
 import time
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import requests
 
@@ -23,6 +25,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger("cliente_test")
 
+# Una sesión por hilo del pool para reutilizar conexiones (keep-alive)
+_sesiones = threading.local()
+
+
+def obtener_sesion() -> requests.Session:
+    """
+    Devuelve la sesión HTTP del hilo actual, creándola la primera vez.
+
+    Returns:
+        Sesión de requests que mantiene abiertas las conexiones con el servidor.
+    """
+    sesion = getattr(_sesiones, "sesion", None)
+    if sesion is None:
+        sesion = _sesiones.sesion = requests.Session()
+    return sesion
+
 
 def realizar_solicitud(
         url: str,
@@ -48,9 +66,9 @@ def realizar_solicitud(
 
     try:
         if metodo.upper() == "GET":
-            respuesta = requests.get(url, timeout=timeout)
+            respuesta = obtener_sesion().get(url, timeout=timeout)
         elif metodo.upper() == "POST":
-            respuesta = requests.post(url, json=datos, timeout=timeout)
+            respuesta = obtener_sesion().post(url, json=datos, timeout=timeout)
         else:
             raise ValueError(f"Método HTTP no soportado: {metodo}")
 
@@ -218,12 +236,14 @@ def ejecutar_prueba_concurrente(
     return resultados
 
 
-def analizar_resultados(resultados: List[Dict]) -> Dict:
+def analizar_resultados(resultados: List[Dict], duracion: Optional[float] = None) -> Dict:
     """
     Analiza los resultados de la prueba.
 
     Args:
         resultados: Lista con resultados de las solicitudes.
+        duracion: Segundos que duró la prueba completa; si se indica, se añaden la
+            duración y el rendimiento (solicitudes por segundo).
 
     Returns:
         Diccionario con estadísticas.
@@ -250,7 +270,7 @@ def analizar_resultados(resultados: List[Dict]) -> Dict:
     solicitudes_exitosas = sum(1 for r in resultados if r["exito"])
     tasa_exito = solicitudes_exitosas / len(resultados)
 
-    return {
+    analisis = {
         "total_solicitudes": len(resultados),
         "solicitudes_exitosas": solicitudes_exitosas,
         "tasa_exito": tasa_exito,
@@ -265,22 +285,32 @@ def analizar_resultados(resultados: List[Dict]) -> Dict:
         },
         "codigos_respuesta": codigos,
     }
+    if duracion:
+        analisis["duracion_segundos"] = duracion
+        analisis["solicitudes_por_segundo"] = len(resultados) / duracion
+    return analisis
 
 
 def guardar_resultados(
-        resultados: List[Dict], analisis: Dict, archivo: str
+        resultados: List[Dict], analisis: Dict, archivo: str,
+        configuracion: Optional[Dict] = None,
 ):
     """
     Guarda los resultados y análisis en un archivo JSON.
 
+    El archivo se escribe con otro nombre y se renombra al terminar, así el servidor
+    nunca ve (ni indexa) un archivo a medio escribir.
+
     Args:
         resultados: Lista con resultados de las solicitudes.
         analisis: Diccionario con análisis de los resultados.
         archivo: Nombre base del archivo donde guardar los resultados.
+        configuracion: Parámetros de la prueba (tipo, concurrencia, solicitudes...).
     """
     datos = {
         "timestamp": time.time(),
         "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "configuracion": configuracion,
         "analisis": analisis,
         "resultados_detallados": resultados,
     }
@@ -288,8 +318,9 @@ def guardar_resultados(
     archivo = f"{archivo}_{timestamp_str}.json"
 
     try:
-        with open(archivo, "w") as f:
+        with open(f"{archivo}.tmp", "w") as f:
             json.dump(datos, f, indent=2)
+        os.replace(f"{archivo}.tmp", archivo)
         logger.info(f"Resultados guardados en {archivo}")
     except Exception as e:
         logger.error(f"Error al guardar resultados: {str(e)}")
@@ -341,21 +372,31 @@ def main():
     url_base = f"http://{args.host}:{args.port}"
 
     # Ejecutar prueba concurrente
+    inicio = time.time()
     resultados = ejecutar_prueba_concurrente(
         url_base=url_base,
         num_solicitudes=args.solicitudes,
         concurrencia=args.concurrencia,
         tipo_prueba=args.tipo,
     )
+    duracion = time.time() - inicio
 
     # Analizar y guardar resultados
-    analisis = analizar_resultados(resultados)
-    guardar_resultados(resultados, analisis, args.output)
+    analisis = analizar_resultados(resultados, duracion)
+    configuracion = {
+        "url_base": url_base,
+        "tipo": args.tipo,
+        "solicitudes": args.solicitudes,
+        "concurrencia": args.concurrencia,
+    }
+    guardar_resultados(resultados, analisis, args.output, configuracion)
 
     # Mostrar resumen de la prueba
     print("\nRESUMEN DE LA PRUEBA:")
     print(f"Total solicitudes: {analisis['total_solicitudes']}")
     print(f"Tasa de éxito: {analisis['tasa_exito'] * 100:.1f}%")
+    if "solicitudes_por_segundo" in analisis:
+        print(f"Rendimiento: {analisis['solicitudes_por_segundo']:.1f} solicitudes/s")
     print(f"Tiempo promedio: {analisis['tiempos']['promedio'] * 1000:.1f}ms")
     print(f"Percentil 95: {analisis['tiempos']['p95'] * 1000:.1f}ms")
     print("\nCódigos de respuesta:")
@@ -5,36 +5,210 @@ Inicia un servidor HTTP simple usando hilos para manejar múltiples conexiones a
 """
 
 import argparse
+import functools
 import logging
+import signal
 import threading
 import time
 
-from server.config import HOST, PORT, DEBUG_MODE, logger
+from server.config import (
+    ALMACEN_DATOS,
+    ALMACENES_DATOS,
+    CAPACIDAD_REGISTRO_SOLICITUDES,
+    COLA_CONEXIONES,
+    CONSUMIDORES_COLA,
+    HILOS_POOL,
+    HOST,
+    INTERVALO_DIARIO,
+    INTERVALO_MUESTREO_SISTEMA,
+    PORT,
+    DEBUG_MODE,
+    KEEPALIVE_MAX_SOLICITUDES,
+    KEEPALIVE_TIMEOUT,
+    LOTE_COLA,
+    MODOS_SINCRONIZACION_DIARIO,
+    MODO_PROCESADOR,
+    MODOS_PROCESADOR,
+    MOTOR_SERVIDOR,
+    NOMBRE_MEMORIA_ESTADISTICAS,
+    PATRON_ESTATICOS,
+    POLITICA_COLA,
+    POLITICAS_COLA,
+    PREFIJO_ESTATICOS,
+    PROCESOS_PROCESADOR,
+    RAIZ_ESTATICOS,
+    SINCRONIZACION_DIARIO,
+    WORKERS,
+    logger,
+)
+from server.core.async_server import AsyncioHTTPServer
+from server.core.almacen import crear_almacen
+from server.core.estadisticas import crear_tabla_estadisticas
+from server.core.estaticos import ArchivosEstaticos
 from server.core.http_server import ThreadingHTTPServer
 from server.core.handler import HTTPRequestHandler
 from server.core.procesador import ProcesadorCola
+from server.core.recursos import RecursosCompartidos
+from server.core.sistema import MonitorSistema
+from server.core.supervisor import Supervisor
 
 
-def iniciar_servidor(host='localhost', puerto=8080, debug=False):
+def iniciar_servidor(host='localhost', puerto=8080, debug=False,
+                     keepalive_timeout=KEEPALIVE_TIMEOUT,
+                     keepalive_max=KEEPALIVE_MAX_SOLICITUDES, motor=MOTOR_SERVIDOR,
+                     hilos=HILOS_POOL, cola_conexiones=COLA_CONEXIONES, workers=WORKERS,
+                     stats_shm=NOMBRE_MEMORIA_ESTADISTICAS, raiz_estaticos=RAIZ_ESTATICOS,
+                     patron_estaticos=PATRON_ESTATICOS,
+                     capacidad_registro=CAPACIDAD_REGISTRO_SOLICITUDES,
+                     politica_cola=POLITICA_COLA, consumidores_cola=CONSUMIDORES_COLA,
+                     lote_cola=LOTE_COLA, modo_procesador=MODO_PROCESADOR,
+                     procesos_procesador=PROCESOS_PROCESADOR,
+                     almacen=ALMACEN_DATOS, sincronizacion_diario=SINCRONIZACION_DIARIO,
+                     intervalo_diario=INTERVALO_DIARIO,
+                     intervalo_sistema=INTERVALO_MUESTREO_SISTEMA):
     """
     Inicia el servidor HTTP y el procesador de la cola de tareas en hilos separados.
 
+    Con más de un worker, el proceso actual actúa como supervisor y cada worker
+    ejecuta su propio servidor sobre el mismo puerto.
+
     Args:
         host (str): Dirección del host.
         puerto (int): Puerto en el que se ejecutará el servidor.
         debug (bool): Activa el modo de depuración.
+        keepalive_timeout (float): Segundos de inactividad antes de cerrar una conexión persistente.
+        keepalive_max (int): Solicitudes máximas atendidas por conexión.
+        motor (str): Motor del servidor, "threading" o "asyncio".
+        hilos (int): Hilos trabajadores del pool.
+        cola_conexiones (int): Conexiones que pueden esperar a un trabajador antes de responder 503.
+        workers (int): Número de procesos worker (modo pre-fork si es mayor que 1).
+        stats_shm (str, optional): Nombre del segmento de memoria compartida donde publicar
+            los contadores para herramientas externas.
+        raiz_estaticos (str): Directorio servido bajo la ruta de archivos estáticos.
+        patron_estaticos (str, optional): Patrón de los nombres servidos de ese directorio;
+            None para servirlo entero.
+        capacidad_registro (int): Solicitudes que conserva el registro de solicitudes.
+        politica_cola (str): Política cuando la cola de procesamiento está llena.
+        consumidores_cola (int): Hilos consumidores del procesador de la cola.
+        lote_cola (int): Elementos que cada consumidor extrae de la cola por despertar.
+        modo_procesador (str): "hilos" o "procesos" para ejecutar el trabajo de cada lote.
+        procesos_procesador (int, optional): Procesos del pool en el modo "procesos".
+        almacen (str): Almacén de los datos de POST /data, "diario" o "sqlite".
+        sincronizacion_diario (str): Política de sincronización con el disco del almacén.
+        intervalo_diario (float): Segundos máximos que un registro espera a escribirse.
+        intervalo_sistema (float): Segundos entre muestras de las métricas de /status.
     """
     if debug:
         logger.setLevel(logging.DEBUG)
 
+    HTTPRequestHandler.timeout_keepalive = keepalive_timeout
+    HTTPRequestHandler.max_solicitudes_conexion = keepalive_max
+    HTTPRequestHandler.estaticos = ArchivosEstaticos(raiz_estaticos, patron=patron_estaticos)
+    recursos = HTTPRequestHandler.recursos
+    if (capacidad_registro, politica_cola) != (recursos.max_solicitudes, recursos.politica_cola):
+        HTTPRequestHandler.recursos = RecursosCompartidos(capacidad_registro, politica_cola)
+    HTTPRequestHandler.almacen = crear_almacen(almacen, intervalo_diario, sincronizacion_diario)
+    # Una sola vez, antes de lanzar los workers
+    HTTPRequestHandler.almacen.preparar()
+    if intervalo_sistema != HTTPRequestHandler.sistema.intervalo:
+        HTTPRequestHandler.sistema = MonitorSistema(intervalo_sistema)
+
+    opciones = {
+        "host": host,
+        "puerto": puerto,
+        "motor": motor,
+        "hilos": hilos,
+        "cola_conexiones": cola_conexiones,
+        "consumidores_cola": consumidores_cola,
+        "lote_cola": lote_cola,
+        "modo_procesador": modo_procesador,
+        "procesos_procesador": procesos_procesador,
+    }
+    if workers == 1 and not stats_shm:
+        ejecutar_servidor(**opciones)
+        return
+
+    estadisticas = crear_tabla_estadisticas(workers, stats_shm)
+    if stats_shm:
+        logger.info(f"Estadísticas publicadas en la memoria compartida '{stats_shm}'")
+    try:
+        if workers > 1:
+            supervisor = Supervisor(
+                (host, puerto), workers, functools.partial(ejecutar_worker, **opciones),
+                estadisticas=estadisticas,
+            )
+            supervisor.ejecutar()
+        else:
+            HTTPRequestHandler.recursos.conectar_estadisticas(estadisticas, 0)
+            ejecutar_servidor(**opciones)
+    finally:
+        estadisticas.cerrar(eliminar=True)
+
+
+def ejecutar_worker(indice, socket_escucha, estadisticas, **opciones):
+    """
+    Punto de entrada de un proceso worker en modo pre-fork.
+
+    Args:
+        indice (int): Índice del worker.
+        socket_escucha (socket.socket): Socket en escucha compartido por los workers.
+        estadisticas (TablaEstadisticas): Tabla de estadísticas compartida.
+        **opciones: Argumentos de `ejecutar_servidor`.
+    """
+    recursos = HTTPRequestHandler.recursos
+    recursos.conectar_estadisticas(estadisticas, indice)
+    try:
+        ejecutar_servidor(socket_escucha=socket_escucha, **opciones)
+    finally:
+        # Lo contado desde la última publicación periódica, para el worker que lo sustituya
+        recursos.publicar_estadisticas()
+
+
+def ejecutar_servidor(host, puerto, motor, hilos, cola_conexiones,
+                      consumidores_cola=CONSUMIDORES_COLA, lote_cola=LOTE_COLA,
+                      modo_procesador=MODO_PROCESADOR, procesos_procesador=PROCESOS_PROCESADOR,
+                      socket_escucha=None):
+    """
+    Crea el servidor HTTP con el motor elegido y lo atiende hasta recibir Ctrl+C.
+
+    Args:
+        host (str): Dirección del host.
+        puerto (int): Puerto en el que se ejecutará el servidor.
+        motor (str): Motor del servidor, "threading" o "asyncio".
+        hilos (int): Hilos trabajadores del pool.
+        cola_conexiones (int): Conexiones que pueden esperar a un trabajador antes de responder 503.
+        consumidores_cola (int): Hilos consumidores del procesador de la cola.
+        lote_cola (int): Elementos que cada consumidor extrae de la cola por despertar.
+        modo_procesador (str): "hilos" o "procesos" para ejecutar el trabajo de cada lote.
+        procesos_procesador (int, optional): Procesos del pool en el modo "procesos".
+        socket_escucha (socket.socket, optional): Socket ya en escucha (modo pre-fork).
+    """
+    # SIGTERM detiene el servidor igual que Ctrl+C, vaciando la cola y el almacén
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
     try:
-        # Crear el servidor HTTP
-        server = ThreadingHTTPServer((host, puerto), HTTPRequestHandler)
+        # Crear el servidor HTTP con el motor elegido
+        if motor == "asyncio":
+            server = AsyncioHTTPServer(
+                (host, puerto), HTTPRequestHandler,
+                hilos=hilos, socket_escucha=socket_escucha,
+            )
+        else:
+            server = ThreadingHTTPServer(
+                (host, puerto), HTTPRequestHandler,
+                hilos=hilos, profundidad_cola=cola_conexiones,
+                socket_escucha=socket_escucha,
+            )
 
         # Iniciar el procesador de fondo para gestionar la cola de tareas
-        procesador = ProcesadorCola(HTTPRequestHandler.recursos)
+        procesador = ProcesadorCola(
+            HTTPRequestHandler.recursos, consumidores=consumidores_cola, lote=lote_cola,
+            modo=modo_procesador, procesos=procesos_procesador,
+        )
         procesador.start()
 
+        # Los ids de POST /data continúan tras los guardados en ejecuciones anteriores
+        HTTPRequestHandler.recursos.continuar_ids(HTTPRequestHandler.almacen.ultimo_id())
+
         # Levantar el servidor en un hilo para permitir la interrupción con Ctrl+C
         thread_server = threading.Thread(target=server.serve_forever, daemon=True)
         thread_server.start()
@@ -55,6 +229,7 @@ def iniciar_servidor(host='localhost', puerto=8080, debug=False):
             server.shutdown()
             server.server_close()
             procesador.stop()
+            HTTPRequestHandler.almacen.cerrar()
             logger.info("Servidor cerrado correctamente.")
         except UnboundLocalError:
             pass
@@ -81,5 +256,161 @@ if __name__ == "__main__":
         help="Activa logs en modo debug"
     )
 
+    parser.add_argument(
+        "--keepalive-timeout",
+        type=float,
+        default=KEEPALIVE_TIMEOUT,
+        help=f"Segundos de inactividad de una conexión persistente (por defecto: {KEEPALIVE_TIMEOUT})"
+    )
+    parser.add_argument(
+        "--keepalive-max",
+        type=int,
+        default=KEEPALIVE_MAX_SOLICITUDES,
+        help=f"Solicitudes máximas por conexión (por defecto: {KEEPALIVE_MAX_SOLICITUDES})"
+    )
+
+    parser.add_argument(
+        "--hilos",
+        type=int,
+        default=HILOS_POOL,
+        help=f"Hilos trabajadores del pool (por defecto: {HILOS_POOL})"
+    )
+    parser.add_argument(
+        "--cola-conexiones",
+        type=int,
+        default=COLA_CONEXIONES,
+        help=f"Conexiones en espera antes de responder 503 (por defecto: {COLA_CONEXIONES})"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["threading", "asyncio"],
+        default=MOTOR_SERVIDOR,
+        help=f"Motor del servidor (por defecto: {MOTOR_SERVIDOR})"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS,
+        help=f"Procesos worker que comparten el puerto (por defecto: {WORKERS})"
+    )
+
+    parser.add_argument(
+        "--stats-shm",
+        metavar="NOMBRE",
+        default=NOMBRE_MEMORIA_ESTADISTICAS,
+        help="Publica los contadores en un segmento de memoria compartida con este nombre, "
+             "legible con 'python -m server.utils.monitor_estadisticas'"
+    )
+
+    parser.add_argument(
+        "--static-root",
+        metavar="DIRECTORIO",
+        default=RAIZ_ESTATICOS,
+        help=f"Directorio servido en {PREFIJO_ESTATICOS}/ (por defecto: {RAIZ_ESTATICOS})"
+    )
+
+    parser.add_argument(
+        "--static-pattern",
+        metavar="PATRON",
+        default=PATRON_ESTATICOS,
+        help="Solo se sirven los archivos de la raíz cuyo nombre cumple este patrón; "
+             f"'' para servir todo el directorio (por defecto: {PATRON_ESTATICOS})"
+    )
+
+    parser.add_argument(
+        "--request-log",
+        type=int,
+        default=CAPACIDAD_REGISTRO_SOLICITUDES,
+        help=f"Solicitudes que conserva el registro de /solicitudes "
+             f"(por defecto: {CAPACIDAD_REGISTRO_SOLICITUDES})"
+    )
+
+    parser.add_argument(
+        "--queue-policy",
+        choices=POLITICAS_COLA,
+        default=POLITICA_COLA,
+        help=f"Qué hacer con la cola de procesamiento llena (por defecto: {POLITICA_COLA})"
+    )
+
+    parser.add_argument(
+        "--queue-workers",
+        type=int,
+        default=CONSUMIDORES_COLA,
+        help=f"Hilos consumidores del procesador de la cola (por defecto: {CONSUMIDORES_COLA})"
+    )
+    parser.add_argument(
+        "--queue-batch",
+        type=int,
+        default=LOTE_COLA,
+        help=f"Elementos que un consumidor toma de la cola de una vez (por defecto: {LOTE_COLA})"
+    )
+    parser.add_argument(
+        "--queue-mode",
+        choices=MODOS_PROCESADOR,
+        default=MODO_PROCESADOR,
+        help=f"Ejecutar el trabajo de cada lote en los hilos consumidores o en un pool "
+             f"de procesos (por defecto: {MODO_PROCESADOR})"
+    )
+    parser.add_argument(
+        "--queue-processes",
+        type=int,
+        default=PROCESOS_PROCESADOR,
+        help="Procesos del pool en el modo 'procesos' (por defecto: uno por núcleo)"
+    )
+
+    parser.add_argument(
+        "--storage",
+        choices=ALMACENES_DATOS,
+        default=ALMACEN_DATOS,
+        help=f"Almacén de los datos de POST /data (por defecto: {ALMACEN_DATOS})"
+    )
+    parser.add_argument(
+        "--journal-sync",
+        choices=MODOS_SINCRONIZACION_DIARIO,
+        default=SINCRONIZACION_DIARIO,
+        help=f"Sincronización con el disco del almacén de POST /data (por defecto: {SINCRONIZACION_DIARIO})"
+    )
+    parser.add_argument(
+        "--journal-interval",
+        type=float,
+        default=INTERVALO_DIARIO,
+        help=f"Segundos máximos que un registro espera a escribirse en el almacén "
+             f"(por defecto: {INTERVALO_DIARIO})"
+    )
+
+    parser.add_argument(
+        "--status-interval",
+        type=float,
+        default=INTERVALO_MUESTREO_SISTEMA,
+        help=f"Segundos entre muestras de CPU, memoria e hilos para /status "
+             f"(por defecto: {INTERVALO_MUESTREO_SISTEMA})"
+    )
+
     args = parser.parse_args()
-    iniciar_servidor(host=args.host, puerto=args.port, debug=args.debug)
+    if not args.status_interval > 0:
+        parser.error("--status-interval debe ser mayor que 0")
+    iniciar_servidor(
+        host=args.host,
+        puerto=args.port,
+        debug=args.debug,
+        keepalive_timeout=args.keepalive_timeout,
+        keepalive_max=args.keepalive_max,
+        motor=args.engine,
+        hilos=args.hilos,
+        cola_conexiones=args.cola_conexiones,
+        workers=args.workers,
+        stats_shm=args.stats_shm,
+        raiz_estaticos=args.static_root,
+        patron_estaticos=args.static_pattern or None,
+        capacidad_registro=args.request_log,
+        politica_cola=args.queue_policy,
+        consumidores_cola=args.queue_workers,
+        lote_cola=args.queue_batch,
+        modo_procesador=args.queue_mode,
+        procesos_procesador=args.queue_processes,
+        almacen=args.storage,
+        sincronizacion_diario=args.journal_sync,
+        intervalo_diario=args.journal_interval,
+        intervalo_sistema=args.status_interval,
+    )
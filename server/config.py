@@ -1,13 +1,134 @@
 import logging
+import os
 
 DEBUG_MODE = False
 HOST = 'localhost'
 PORT = 8000
 
+# Lectura y análisis de solicitudes HTTP
+TAMANO_LECTURA = 64 * 1024  # Bytes leídos del socket en cada recv
+MAX_TAMANO_CABECERAS = 64 * 1024  # Límite de la línea de petición más cabeceras
+MAX_TAMANO_CUERPO = 10 * 1024 * 1024  # Límite del cuerpo (Content-Length)
+TIMEOUT_LECTURA = 10  # Segundos de espera máxima por datos de un cliente lento
+
+# Conexiones persistentes (HTTP keep-alive)
+KEEPALIVE_TIMEOUT = 5  # Segundos de inactividad antes de cerrar una conexión
+KEEPALIVE_MAX_SOLICITUDES = 100  # Solicitudes máximas atendidas por conexión
+
+# Pool de hilos del servidor threading y control de admisión
+HILOS_POOL = 32  # Hilos trabajadores que atienden conexiones
+COLA_CONEXIONES = 64  # Conexiones aceptadas en espera de un trabajador
+RETRY_AFTER = 1  # Segundos indicados en Retry-After al responder 503
+ESPERA_CIERRE_TRABAJADORES = 5  # Segundos que el cierre espera a los trabajadores del pool
+# Segundos que un trabajador espera la primera o la siguiente solicitud de una conexión
+# antes de aparcarla en el selector y quedar libre (0 si hay conexiones en cola)
+ESPERA_KEEPALIVE_EN_HILO = 0.005
+
+# Motor del servidor: "threading" (un hilo por conexión) o "asyncio" (bucle de eventos)
+MOTOR_SERVIDOR = "threading"
+HILOS_ASYNCIO = 32  # Hilos del pool que ejecuta los manejadores síncronos en modo asyncio
+
+# Procesos worker (modo pre-fork); con 1 el servidor se ejecuta en un único proceso
+WORKERS = 1
+# Nombre del segmento de memoria compartida con los contadores del servidor (None = no publicar)
+NOMBRE_MEMORIA_ESTADISTICAS = None
+# Segundos entre publicaciones de los contadores de cada worker en la tabla compartida
+INTERVALO_PUBLICACION_ESTADISTICAS = 0.5
+
+# Archivos estáticos: los archivos de RAIZ_ESTATICOS cuyo nombre cumple PATRON_ESTATICOS
+# se sirven bajo PREFIJO_ESTATICOS (None para servir todo el directorio y sus subdirectorios)
+PREFIJO_ESTATICOS = "/archivos"
+RAIZ_ESTATICOS = "./data"
+PATRON_ESTATICOS = "resultados_prueba*.json"
+CACHE_ESTATICOS_ENTRADAS = 64  # Archivos abiertos que se mantienen en caché
+CACHE_ESTATICOS_TTL = 1  # Segundos durante los que se reutiliza un stat sin repetirlo
+
+# Plantillas HTML y archivos propios del servidor (CSS), servidos bajo PREFIJO_ACTIVOS
+# con caché de larga duración: la URL incluye el hash del contenido
+DIRECTORIO_PLANTILLAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+DIRECTORIO_ACTIVOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+PREFIJO_ACTIVOS = "/static"
+MAX_AGE_ACTIVOS = 365 * 24 * 3600
+
+# Compresión de respuestas (gzip/deflate negociado con Accept-Encoding)
+COMPRESION_ACTIVA = True
+COMPRESION_MINIMA = 1024  # Bytes por debajo de los cuales no se comprime
+NIVEL_COMPRESION = 6  # Nivel de zlib (1 = rápido, 9 = máxima compresión)
+CACHE_COMPRESION_ENTRADAS = 32  # Cuerpos comprimidos que se conservan por hash
+
+# Política cuando la cola de procesamiento en segundo plano está llena:
+#   "descartar_nueva"   descarta la solicitud que llega (no espera nunca)
+#   "descartar_antigua" desaloja la más antigua de la cola para hacer sitio
+#   "bloquear"          espera hasta ESPERA_COLA segundos y después descarta
+POLITICA_COLA = "descartar_nueva"
+POLITICAS_COLA = ("descartar_nueva", "descartar_antigua", "bloquear")
+ESPERA_COLA = 2
+
+# Procesador de fondo de la cola: pool de consumidores que extraen lotes
+CONSUMIDORES_COLA = 4  # Hilos consumidores iniciales
+MAX_CONSUMIDORES_COLA = 64
+LOTE_COLA = 16  # Elementos máximos que un consumidor toma en cada despertar
+# Dónde se ejecuta la función de procesamiento de cada lote:
+#   "hilos"    en el propio consumidor (adecuado para trabajo de E/S)
+#   "procesos" en un ProcessPoolExecutor (trabajo de CPU, sin competir por el GIL)
+MODO_PROCESADOR = "hilos"
+MODOS_PROCESADOR = ("hilos", "procesos")
+PROCESOS_PROCESADOR = None  # Procesos del pool; None para uno por núcleo
+MAX_LOTES_EN_VUELO = 8  # Lotes enviados al pool de procesos a la vez como máximo
+RESULTADOS_RETENIDOS = 100  # Resultados de lotes que se guardan si no hay callback
+
+# Registro de solicitudes (buffer circular de tamaño fijo, ~40 bytes por solicitud
+# más los índices por IP, método y ruta)
+CAPACIDAD_REGISTRO_SOLICITUDES = 1000
+PENDIENTES_REGISTRO_SOLICITUDES = 64  # Solicitudes anotadas antes de volcarlas al registro
+
+# Métricas del sistema de /status y /api/status: un hilo las muestrea cada
+# INTERVALO_MUESTREO_SISTEMA segundos y las solicitudes solo leen la última muestra
+INTERVALO_MUESTREO_SISTEMA = 1.0
+
+# Archivos de resultados de client.py que se resumen en /data y /api/data
+PATRON_RESULTADOS = "resultados_prueba_*.json"
+INTERVALO_VIGILANCIA_RESULTADOS = 1.0  # Segundos entre recorridos de la carpeta
+# Índice de resúmenes (un JSON por línea) dentro de la misma carpeta; cada archivo de
+# resultados se lee una sola vez y /api/data/historial se sirve solo desde el índice
+INDICE_RESULTADOS = ".indice_resultados.jsonl"
+TAMANO_BLOQUE_RESULTADOS = 1 << 16  # Caracteres leídos de cada vez al recorrer un archivo
+PRECISION_PERCENTILES = 0.01  # Error relativo máximo de los percentiles por endpoint
+
+# Almacén de los datos de POST /data: "diario" (segmentos JSON Lines) o "sqlite"
+ALMACEN_DATOS = "diario"
+ALMACENES_DATOS = ("diario", "sqlite")
+# Fuera de RAIZ_ESTATICOS: los datos guardados no se sirven bajo PREFIJO_ESTATICOS
+DIRECTORIO_ALMACEN = "./almacen"
+ARCHIVO_SQLITE = os.path.join(DIRECTORIO_ALMACEN, "datos.sqlite3")
+
+# Diario de peticiones de POST /data: segmentos JSON Lines de solo anexado con un
+# índice id -> posición cada uno
+DIRECTORIO_DIARIO = os.path.join(DIRECTORIO_ALMACEN, "diario")
+# Ubicaciones anteriores, dentro de ./data; se trasladan al arrancar si existen
+DIRECTORIO_DIARIO_ANTERIOR = "./data/diario"
+ARCHIVO_SQLITE_ANTERIOR = "./data/datos.sqlite3"
+# Formatos anteriores (array JSON y JSON Lines en un solo archivo), se migran al arrancar
+ARCHIVOS_DIARIO_ANTERIORES = ("./data/peticiones.json", "./data/peticiones.jsonl")
+TAMANO_SEGMENTO_DIARIO = 16 * 1024 * 1024  # Bytes a partir de los cuales se cierra un segmento
+INTERVALO_COMPACTACION_DIARIO = 60  # Segundos entre fusiones de segmentos pequeños
+INTERVALO_DIARIO = 0.05  # Segundos máximos que un registro espera a escribirse
+# Sincronización con el disco: "ninguna", "lote" (un fsync por lote) o "siempre"
+# (POST /data no responde hasta que su registro está sincronizado)
+SINCRONIZACION_DIARIO = "lote"
+MODOS_SINCRONIZACION_DIARIO = ("ninguna", "lote", "siempre")
+
+# Consultas filtradas del registro de solicitudes (/api/solicitudes?ip=...&limit=...)
+LIMITE_CONSULTA_SOLICITUDES = 100  # Solicitudes por página si no se indica limit
+MAX_LIMITE_CONSULTA_SOLICITUDES = 1000
+
+# Respuestas por streaming (Transfer-Encoding: chunked)
+LOTE_STREAMING = 100  # Registros renderizados y enviados en cada trozo
+
 # Configurar logging global
 logging.basicConfig(
     level=logging.DEBUG if DEBUG_MODE else logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
 )
-logger = logging.getLogger('servidor_http')
\ No newline at end of file
+logger = logging.getLogger('servidor_http')
@@ -0,0 +1,228 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from ..config import (
+    ARCHIVO_SQLITE,
+    ARCHIVO_SQLITE_ANTERIOR,
+    DIRECTORIO_DIARIO,
+    INTERVALO_DIARIO,
+    SINCRONIZACION_DIARIO,
+)
+from .diario import DiarioPeticiones, EscritorPorLotes, trasladar_anterior
+
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS datos (
+    id INTEGER PRIMARY KEY,
+    marca REAL NOT NULL,
+    registro TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS datos_marca ON datos (marca, id);
+"""
+
+# PRAGMA synchronous para cada política de sincronización. En modo WAL, FULL hace un
+# fsync del WAL en cada commit, es decir, uno por lote.
+SINCRONIZACION_SQLITE = {"ninguna": "OFF", "lote": "FULL", "siempre": "FULL"}
+
+
+class AlmacenSQLite(EscritorPorLotes):
+    """
+    Almacén de POST /data en una base de datos SQLite (módulo `sqlite3`) en modo WAL.
+
+    Solo el hilo escritor escribe: cada lote se inserta con `executemany` en una única
+    transacción, de modo que el coste del commit (y de su `fsync`) se reparte entre
+    todos los registros del lote. En modo WAL los lectores no bloquean al escritor ni
+    al revés; cada hilo que consulta usa su propia conexión de solo lectura, creada la
+    primera vez. Varios workers pueden compartir la base: SQLite serializa sus
+    transacciones.
+
+    Las consultas por rango de fechas usan el índice sobre `marca` (el `timestamp` del
+    registro en segundos desde epoch) y las consultas por id la clave primaria.
+    """
+
+    nombre = "almacén SQLite"
+    admite_consultas = True
+
+    def __init__(self, ruta: str = ARCHIVO_SQLITE, intervalo: float = INTERVALO_DIARIO,
+                 sincronizacion: str = SINCRONIZACION_DIARIO):
+        """
+        Configura el almacén; la base no se abre hasta el primer registro o consulta.
+
+        Args:
+            ruta (str): Archivo de la base de datos.
+            intervalo (float): Segundos máximos que un registro espera en el buffer.
+            sincronizacion (str): "ninguna", "lote" o "siempre".
+
+        Raises:
+            ValueError: Si la política de sincronización no existe.
+        """
+        super().__init__(intervalo, sincronizacion)
+        self.ruta = ruta
+        self._escritura: Optional[sqlite3.Connection] = None
+        self._local = threading.local()
+
+    def _conectar(self, solo_lectura: bool = False, **opciones) -> sqlite3.Connection:
+        """
+        Abre una conexión en modo autocommit (las transacciones se abren explícitamente).
+        """
+        conexion = sqlite3.connect(self.ruta, isolation_level=None, timeout=10, **opciones)
+        if solo_lectura:
+            conexion.execute("PRAGMA query_only = ON")
+        else:
+            conexion.execute("PRAGMA journal_mode = WAL")
+            conexion.execute(f"PRAGMA synchronous = {SINCRONIZACION_SQLITE[self.sincronizacion]}")
+        return conexion
+
+    def _lectura(self) -> sqlite3.Connection:
+        """
+        Conexión de solo lectura del hilo actual.
+        """
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = self._local.conexion = self._conectar(solo_lectura=True)
+        return conexion
+
+    def preparar(self) -> None:
+        """
+        Crea la base, activa el modo WAL (queda guardado en el archivo) y crea la tabla
+        y sus índices. Se llama antes de arrancar los workers.
+        """
+        trasladar_anterior(ARCHIVO_SQLITE_ANTERIOR, self.ruta, ("", "-wal", "-shm"))
+        os.makedirs(os.path.dirname(os.path.abspath(self.ruta)), exist_ok=True)
+        conexion = self._conectar()
+        try:
+            conexion.executescript(ESQUEMA_SQLITE)
+        finally:
+            conexion.close()
+
+    def _preparar(self, registro: Dict) -> Tuple[int, float, str]:
+        """
+        Convierte un registro en la fila que inserta `_escribir_lote`.
+
+        Args:
+            registro (Dict): Dato de POST /data con su `id` y `timestamp` (ISO 8601).
+
+        Returns:
+            Tuple[int, float, str]: Id, `timestamp` en segundos desde epoch y registro
+                como JSON compacto.
+        """
+        marca = datetime.fromisoformat(registro["timestamp"]).timestamp()
+        return registro["id"], marca, json.dumps(registro, ensure_ascii=False, separators=(",", ":"))
+
+    def _escribir_lote(self, lote: List[Tuple[int, float, str]]) -> None:
+        """
+        Inserta un lote de filas en una sola transacción. Un id repetido reemplaza la
+        fila anterior.
+
+        Args:
+            lote (List[Tuple[int, float, str]]): Filas de `_preparar`.
+
+        Raises:
+            sqlite3.Error: Si la inserción falla; la transacción se deshace.
+        """
+        if self._escritura is None:
+            # Solo la usa el hilo escritor; `cerrar` la cierra cuando ya ha terminado
+            self._escritura = self._conectar(check_same_thread=False)
+        self._escritura.execute("BEGIN IMMEDIATE")
+        try:
+            self._escritura.executemany(
+                "INSERT OR REPLACE INTO datos (id, marca, registro) VALUES (?, ?, ?)", lote
+            )
+        except sqlite3.Error:
+            self._escritura.execute("ROLLBACK")
+            raise
+        self._escritura.execute("COMMIT")
+
+    def _al_cerrar(self) -> None:
+        """
+        Cierra la conexión de escritura.
+        """
+        if self._escritura is not None:
+            self._escritura.close()
+            self._escritura = None
+
+    def leer(self, id_dato: int) -> Optional[bytes]:
+        """
+        Busca un registro por id.
+
+        Args:
+            id_dato (int): Id asignado por POST /data.
+
+        Returns:
+            bytes | None: Registro como JSON, o None si no existe.
+        """
+        fila = self._lectura().execute("SELECT registro FROM datos WHERE id = ?", (id_dato,)).fetchone()
+        return fila[0].encode("utf-8") if fila is not None else None
+
+    def consultar(self, desde: Optional[float], hasta: Optional[float], limite: int) -> List[str]:
+        """
+        Busca los registros con `timestamp` en `[desde, hasta)`, del más antiguo al más
+        reciente.
+
+        Args:
+            desde (float, optional): Instante inicial en segundos desde epoch, incluido.
+            hasta (float, optional): Instante final en segundos desde epoch, excluido.
+            limite (int): Máximo de registros.
+
+        Returns:
+            List[str]: Registros como JSON.
+        """
+        condiciones, argumentos = [], []
+        if desde is not None:
+            condiciones.append("marca >= ?")
+            argumentos.append(desde)
+        if hasta is not None:
+            condiciones.append("marca < ?")
+            argumentos.append(hasta)
+        donde = f"WHERE {' AND '.join(condiciones)} " if condiciones else ""
+        filas = self._lectura().execute(
+            f"SELECT registro FROM datos {donde}ORDER BY marca, id LIMIT ?", (*argumentos, limite)
+        )
+        return [fila[0] for fila in filas]
+
+    def ultimo_id(self) -> int:
+        """
+        Mayor id guardado, para que los ids nuevos no repitan los de ejecuciones
+        anteriores.
+
+        Returns:
+            int: Último id, o 0 si no hay datos.
+        """
+        return self._lectura().execute("SELECT COALESCE(MAX(id), 0) FROM datos").fetchone()[0]
+
+    def obtener_stats(self) -> Dict:
+        """
+        Retorna las estadísticas del almacén.
+
+        Returns:
+            Dict: Las del escritor más la ruta de la base.
+        """
+        stats = super().obtener_stats()
+        stats["archivo"] = self.ruta
+        return stats
+
+
+def crear_almacen(tipo: str, intervalo: float = INTERVALO_DIARIO,
+                  sincronizacion: str = SINCRONIZACION_DIARIO) -> EscritorPorLotes:
+    """
+    Crea el almacén de POST /data elegido.
+
+    Args:
+        tipo (str): "diario" (segmentos JSON Lines) o "sqlite".
+        intervalo (float): Segundos máximos que un registro espera a escribirse.
+        sincronizacion (str): "ninguna", "lote" o "siempre".
+
+    Returns:
+        EscritorPorLotes: Almacén sin arrancar.
+
+    Raises:
+        ValueError: Si el tipo no existe.
+    """
+    if tipo == "diario":
+        return DiarioPeticiones(DIRECTORIO_DIARIO, intervalo, sincronizacion)
+    if tipo == "sqlite":
+        return AlmacenSQLite(ARCHIVO_SQLITE, intervalo, sincronizacion)
+    raise ValueError(f"Almacén desconocido: {tipo}")
@@ -0,0 +1,243 @@
+import asyncio
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from ..config import HILOS_ASYNCIO, TAMANO_LECTURA, TIMEOUT_LECTURA, logger
+from ..utils.resultados import detener_caches_resultados
+from .parser import ErrorSolicitud, ParserHTTP
+
+# Bytes pendientes en el transporte a partir de los cuales un hilo que escribe espera
+# a que el bucle los envíe, para que una respuesta por streaming no se acumule en memoria
+LIMITE_BUFER_ESCRITURA = 256 * 1024
+
+
+class SalidaAsyncio:
+    """
+    Adaptador que expone `sendall()` y `sendmsg()` sobre un `asyncio.StreamWriter`.
+
+    Permite que los manejadores síncronos escriban sus respuestas desde los hilos
+    del pool: las escrituras se delegan al bucle de eventos en orden de llegada y,
+    si el cliente no lee tan rápido como se genera la respuesta, el hilo espera.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, writer: asyncio.StreamWriter):
+        self.loop = loop
+        self.writer = writer
+        self._hilo_loop = threading.get_ident()
+
+    def sendall(self, datos) -> None:
+        """
+        Escribe los datos en la conexión.
+
+        Args:
+            datos (bytes | memoryview): Datos a enviar.
+        """
+        if threading.get_ident() == self._hilo_loop:
+            self.writer.write(datos)
+        else:
+            # Copiar: el búfer del llamante puede reutilizarse antes de que escriba el bucle
+            self.loop.call_soon_threadsafe(self.writer.write, bytes(datos))
+            self._esperar_vaciado()
+
+    def sendmsg(self, buffers, ancdata=(), flags=0) -> int:
+        """
+        Escribe varios búferes de una vez, con la misma interfaz que `socket.sendmsg`.
+
+        Los objetos `bytes` son inmutables y se entregan al bucle sin copiarlos; solo
+        se copian los búferes mutables cuando la escritura llega desde otro hilo.
+
+        Args:
+            buffers (Sequence[bytes | memoryview]): Búferes a enviar en orden.
+            ancdata: Sin efecto; se acepta por compatibilidad con `socket.sendmsg`.
+            flags: Sin efecto; el transporte de asyncio agrupa las escrituras.
+
+        Returns:
+            int: Número total de bytes aceptados (siempre todos).
+        """
+        if threading.get_ident() == self._hilo_loop:
+            self.writer.writelines(buffers)
+        else:
+            copias = [
+                b.obj if isinstance(b, memoryview) and isinstance(b.obj, bytes) and b.nbytes == len(b.obj)
+                else bytes(b)
+                for b in buffers
+            ]
+            self.loop.call_soon_threadsafe(self.writer.writelines, copias)
+            self._esperar_vaciado()
+        return sum(memoryview(b).nbytes for b in buffers)
+
+    def _esperar_vaciado(self) -> None:
+        """
+        Bloquea el hilo llamante mientras el transporte tenga demasiados datos pendientes.
+
+        Raises:
+            ConnectionError: Si la conexión se cierra mientras se espera.
+            TimeoutError: Si el cliente no lee nada en `TIMEOUT_LECTURA` segundos.
+        """
+        if self.writer.transport.get_write_buffer_size() < LIMITE_BUFER_ESCRITURA:
+            return
+        futuro = asyncio.run_coroutine_threadsafe(self.writer.drain(), self.loop)
+        try:
+            futuro.result(TIMEOUT_LECTURA)
+        except TimeoutError:
+            futuro.cancel()
+            raise
+
+
+class AsyncioHTTPServer:
+    """
+    Servidor HTTP basado en `asyncio.start_server`.
+
+    Cada conexión es una corrutina, por lo que miles de conexiones inactivas o lentas
+    no consumen un hilo del sistema cada una. Reutiliza el parser y los manejadores
+    de `HTTPRequestHandler`: las rutas síncronas se ejecutan en un pool de hilos
+    acotado y las rutas con versión asíncrona (como /sleep) directamente en el bucle.
+    Ofrece la misma interfaz que `ThreadingHTTPServer` (`serve_forever`, `shutdown`,
+    `server_close`) para poder usarse desde `main.py` sin cambios.
+    """
+
+    def __init__(self, server_address, RequestHandlerClass, hilos: int = HILOS_ASYNCIO,
+                 socket_escucha=None):
+        """
+        Crea el socket de escucha e inicializa el servidor.
+
+        Args:
+            server_address (tuple): Tupla con (host, puerto) donde el servidor escuchará.
+            RequestHandlerClass: Clase encargada de procesar las solicitudes entrantes.
+            hilos (int): Tamaño del pool de hilos para los manejadores síncronos.
+            socket_escucha (socket.socket, optional): Socket ya enlazado y en escucha
+                (modo multiproceso). Si se indica, no se crea uno nuevo.
+        """
+        self.RequestHandlerClass = RequestHandlerClass
+        self.hilos = hilos
+        self.socket = socket_escucha or socket.create_server(server_address, backlog=1024)
+        self.server_address = self.socket.getsockname()[:2]
+        self._loop = None
+        self._detener = None
+        self._detenido = threading.Event()
+        self.conexiones_abiertas = 0
+        logger.info(f"Servidor asyncio iniciado en {self.server_address[0]}:{self.server_address[1]}")
+
+    def serve_forever(self) -> None:
+        """
+        Ejecuta el bucle de eventos hasta que se llame a `shutdown()`.
+        """
+        try:
+            asyncio.run(self._ejecutar())
+        finally:
+            self._detenido.set()
+
+    def shutdown(self) -> None:
+        """
+        Detiene el bucle de eventos y espera a que `serve_forever()` termine.
+        """
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._detener.set)
+            self._detenido.wait()
+
+    def obtener_stats_pool(self) -> Dict:
+        """
+        Retorna el estado del motor asyncio.
+
+        Returns:
+            Dict: Tamaño del pool de hilos para manejadores síncronos y conexiones abiertas.
+        """
+        return {
+            "hilos": self.hilos,
+            "conexiones_abiertas": self.conexiones_abiertas,
+        }
+
+    def server_close(self) -> None:
+        """
+        Cierra el socket de escucha y detiene los hilos vigilantes de los resultados.
+        """
+        self.socket.close()
+        detener_caches_resultados()
+
+    async def _ejecutar(self) -> None:
+        """
+        Arranca `asyncio.start_server` sobre el socket ya enlazado.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._detener = asyncio.Event()
+        executor = ThreadPoolExecutor(max_workers=self.hilos, thread_name_prefix="AsyncioWorker")
+        self._loop.set_default_executor(executor)
+
+        servidor = await asyncio.start_server(self._atender_conexion, sock=self.socket)
+        async with servidor:
+            await self._detener.wait()
+
+    async def _atender_conexion(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        """
+        Atiende una conexión persistente: lee solicitudes con el parser incremental y
+        las despacha hasta que la conexión deba cerrarse.
+
+        Args:
+            reader (asyncio.StreamReader): Flujo de lectura de la conexión.
+            writer (asyncio.StreamWriter): Flujo de escritura de la conexión.
+        """
+        loop = asyncio.get_running_loop()
+        client_address = writer.get_extra_info("peername")
+        handler = self.RequestHandlerClass.para_conexion(
+            SalidaAsyncio(loop, writer), client_address, self
+        )
+        parser = ParserHTTP()
+        atendidas = 0
+        self.conexiones_abiertas += 1
+
+        try:
+            while True:
+                try:
+                    solicitud = parser.siguiente()
+                except ErrorSolicitud as e:
+                    handler.mantener_conexion = False
+                    handler.send_error(e.codigo, e.mensaje)
+                    break
+
+                if solicitud is None:
+                    if parser.espera_continuar:
+                        writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                        parser.espera_continuar = False
+                    if parser.tiene_datos or atendidas == 0:
+                        timeout = TIMEOUT_LECTURA
+                    else:
+                        timeout = handler.timeout_keepalive
+                    datos = await asyncio.wait_for(reader.read(TAMANO_LECTURA), timeout)
+                    if not datos:
+                        break
+                    parser.alimentar(datos)
+                    continue
+
+                atendidas += 1
+                handler.mantener_conexion = handler.negociar_conexion(solicitud, atendidas)
+                handler.solicitudes_restantes = handler.max_solicitudes_conexion - atendidas
+
+                corrutina = handler.resolver_asincrono(solicitud)
+                if corrutina is not None:
+                    # El bucle de eventos nunca debe esperar a que se libere la cola de fondo
+                    handler.preparar_solicitud(solicitud, puede_esperar=False)
+                    await corrutina
+                else:
+                    await loop.run_in_executor(None, handler.procesar_solicitud, solicitud)
+                await writer.drain()
+                handler.solicitud = None
+
+                if not handler.mantener_conexion:
+                    break
+        except asyncio.TimeoutError:
+            if parser.tiene_datos:
+                logger.warning(f"Tiempo de lectura agotado para {client_address}")
+        except (ConnectionError, OSError) as e:
+            logger.debug(f"Conexión con {client_address} interrumpida: {e}")
+        except Exception:
+            logger.error(f"Error al manejar solicitud de {client_address}", exc_info=True)
+        finally:
+            self.conexiones_abiertas -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
@@ -0,0 +1,154 @@
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+from ..config import CACHE_COMPRESION_ENTRADAS, COMPRESION_MINIMA, NIVEL_COMPRESION
+
+# wbits de zlib para cada codificación: 31 = contenedor gzip, 15 = contenedor zlib
+# (lo que HTTP denomina "deflate")
+CODIFICACIONES = {"gzip": 31, "deflate": 15}
+
+# Tipos de contenido que merece la pena comprimir
+TIPOS_COMPRIMIBLES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+
+
+def es_comprimible(content_type: Optional[str], longitud: Optional[int]) -> bool:
+    """
+    Indica si una respuesta es candidata a comprimirse.
+
+    Args:
+        content_type (str, optional): Tipo de contenido de la respuesta.
+        longitud (int, optional): Longitud del cuerpo en bytes; None si no se conoce
+            de antemano (respuestas por streaming).
+
+    Returns:
+        bool: True si el tipo es textual y el cuerpo supera `COMPRESION_MINIMA`.
+    """
+    return (
+        content_type is not None
+        and (longitud is None or longitud >= COMPRESION_MINIMA)
+        and content_type.startswith(TIPOS_COMPRIMIBLES)
+    )
+
+
+def crear_compresor(codificacion: str, nivel: int = NIVEL_COMPRESION):
+    """
+    Crea un compresor incremental de zlib para la codificación indicada.
+
+    Args:
+        codificacion (str): "gzip" o "deflate".
+        nivel (int): Nivel de compresión (1-9).
+
+    Returns:
+        zlib.Compress: Compresor.
+    """
+    return zlib.compressobj(nivel, zlib.DEFLATED, CODIFICACIONES[codificacion])
+
+
+def negociar_codificacion(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Elige la codificación a partir de la cabecera `Accept-Encoding` del cliente.
+
+    Respeta los pesos `q`, incluido `q=0` para rechazar una codificación, y el
+    comodín `*`. A igualdad de peso se prefiere gzip.
+
+    Args:
+        accept_encoding (str, optional): Valor de la cabecera.
+
+    Returns:
+        Optional[str]: "gzip", "deflate" o None para enviar el cuerpo sin comprimir.
+    """
+    if not accept_encoding:
+        return None
+    pesos = {}
+    for elemento in accept_encoding.lower().split(","):
+        nombre, _, parametros = elemento.partition(";")
+        peso = 1.0
+        parametro = parametros.strip()
+        if parametro.startswith("q="):
+            try:
+                peso = float(parametro[2:])
+            except ValueError:
+                peso = 0.0
+        pesos[nombre.strip()] = peso
+
+    comodin = pesos.get("*", 0.0)
+    mejor, mejor_peso = None, 0.0
+    for codificacion in CODIFICACIONES:
+        peso = pesos.get(codificacion, comodin)
+        if peso > mejor_peso:
+            mejor, mejor_peso = codificacion, peso
+    return mejor
+
+
+def comprimir(cuerpo, codificacion: str, nivel: int = NIVEL_COMPRESION) -> bytes:
+    """
+    Comprime un cuerpo completo.
+
+    Args:
+        cuerpo (bytes | memoryview): Cuerpo sin comprimir.
+        codificacion (str): "gzip" o "deflate".
+        nivel (int): Nivel de compresión de zlib (1-9).
+
+    Returns:
+        bytes: Cuerpo comprimido.
+    """
+    compresor = crear_compresor(codificacion, nivel)
+    return compresor.compress(cuerpo) + compresor.flush()
+
+
+class CacheCompresion:
+    """
+    Caché LRU de cuerpos ya comprimidos, indexada por el hash del contenido.
+
+    Las páginas que no cambian entre solicitudes se comprimen una sola vez; calcular
+    el hash del cuerpo es mucho más barato que volver a comprimirlo. Solo deben pasar
+    por aquí los cuerpos que se repiten: uno distinto en cada respuesta desalojaría a
+    los demás sin volver a usarse nunca.
+    """
+
+    def __init__(self, max_entradas: int = CACHE_COMPRESION_ENTRADAS, nivel: int = NIVEL_COMPRESION):
+        """
+        Inicializa la caché.
+
+        Args:
+            max_entradas (int): Cuerpos comprimidos que se conservan como máximo.
+            nivel (int): Nivel de compresión de zlib (1-9).
+        """
+        self.max_entradas = max_entradas
+        self.nivel = nivel
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def comprimir(self, cuerpo, codificacion: str) -> bytes:
+        """
+        Retorna el cuerpo comprimido, desde la caché si ya se comprimió antes.
+
+        Args:
+            cuerpo (bytes | memoryview): Cuerpo sin comprimir.
+            codificacion (str): "gzip" o "deflate".
+
+        Returns:
+            bytes: Cuerpo comprimido.
+        """
+        clave = (hashlib.blake2b(cuerpo, digest_size=16).digest(), codificacion)
+        with self._lock:
+            comprimido = self._entradas.get(clave)
+            if comprimido is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return comprimido
+            self.fallos += 1
+
+        # Comprimir fuera del lock para no serializar a los demás hilos
+        comprimido = comprimir(cuerpo, codificacion, self.nivel)
+
+        with self._lock:
+            self._entradas[clave] = comprimido
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return comprimido
@@ -0,0 +1,912 @@
+import itertools
+import json
+import mmap
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin workers pre-fork no hay otros procesos con los que coordinarse
+    fcntl = None
+
+from ..config import (
+    ARCHIVOS_DIARIO_ANTERIORES,
+    DIRECTORIO_DIARIO,
+    DIRECTORIO_DIARIO_ANTERIOR,
+    INTERVALO_COMPACTACION_DIARIO,
+    INTERVALO_DIARIO,
+    MODOS_SINCRONIZACION_DIARIO,
+    SINCRONIZACION_DIARIO,
+    TAMANO_SEGMENTO_DIARIO,
+    logger,
+)
+
+# Archivos de cada segmento: `<base>.jsonl` con los registros y `<base>.idx` con el índice
+# (pares id, posición como enteros de 64 bits sin signo en el orden de bytes de la
+# máquina, ordenados por id). Mientras un proceso escribe el segmento, su índice está
+# sin ordenar en `<base>.abierto.idx`.
+SUFIJO_DATOS = ".jsonl"
+SUFIJO_INDICE = ".idx"
+SUFIJO_INDICE_ABIERTO = ".abierto.idx"
+
+_nombres = itertools.count()
+
+
+def _serializar(registro: Dict) -> bytes:
+    """
+    Codifica un registro como una línea JSON terminada en salto de línea.
+    """
+    return json.dumps(registro, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _marca_registro(linea: bytes) -> float:
+    """
+    Instante del `timestamp` de una línea del diario, para decidir cuál de dos
+    registros con el mismo id es el más reciente.
+
+    Returns:
+        float: Segundos desde epoch, o -inf si la línea no tiene un `timestamp` válido.
+    """
+    try:
+        return datetime.fromisoformat(json.loads(linea)["timestamp"]).timestamp()
+    except (ValueError, KeyError, TypeError):
+        return float("-inf")
+
+
+def _nueva_base(directorio: str, generacion: int = 0) -> str:
+    """
+    Nombre de un segmento nuevo, único entre procesos y creciente en el tiempo. Los
+    segmentos producidos por una compactación llevan su generación (`-g<n>`).
+    """
+    nombre = f"{time.time_ns():020d}-{os.getpid()}-{next(_nombres)}"
+    if generacion:
+        nombre += f"-g{generacion}"
+    return os.path.join(directorio, nombre)
+
+
+def _generacion(base: str) -> int:
+    """
+    Generación de un segmento: 0 si lo escribió un proceso, n si sale de n
+    compactaciones sucesivas.
+    """
+    _, separador, generacion = os.path.basename(base).rpartition("-g")
+    return int(generacion) if separador and generacion.isdigit() else 0
+
+
+def _escribir_indice(base: str, entradas: Iterable[Tuple[int, int]]) -> None:
+    """
+    Escribe el índice ordenado de un segmento; aparece de forma atómica con `os.replace`.
+
+    Args:
+        base (str): Ruta del segmento sin sufijo.
+        entradas (Iterable[Tuple[int, int]]): Pares (id, posición) ordenados por id.
+    """
+    indice = array("Q")
+    for id_dato, posicion in entradas:
+        indice.append(id_dato)
+        indice.append(posicion)
+    temporal = base + SUFIJO_INDICE + ".tmp"
+    with open(temporal, "wb") as f:
+        indice.tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, base + SUFIJO_INDICE)
+
+
+def _escribir_segmento(directorio: str, registros: List[Tuple[int, bytes]],
+                       generacion: int = 0) -> None:
+    """
+    Escribe un segmento ya cerrado con registros ordenados por id.
+
+    Si un id está repetido, el índice apunta a su última aparición.
+
+    Args:
+        directorio (str): Directorio del diario.
+        registros (List[Tuple[int, bytes]]): Pares (id, línea) ordenados por id.
+        generacion (int): Generación del segmento (ver `_generacion`).
+    """
+    base = _nueva_base(directorio, generacion)
+    posiciones: Dict[int, int] = {}
+    posicion = 0
+    with open(base + SUFIJO_DATOS, "wb") as f:
+        for id_dato, linea in registros:
+            f.write(linea)
+            posiciones[id_dato] = posicion
+            posicion += len(linea)
+        f.flush()
+        os.fsync(f.fileno())
+    _escribir_indice(base, sorted(posiciones.items()))
+
+
+def _escribir_segmentos(directorio: str, registros: List[Tuple[int, bytes]], tamano: int,
+                        generacion: int = 0) -> int:
+    """
+    Reparte registros en segmentos cerrados de como mucho `tamano` bytes aproximadamente.
+
+    Returns:
+        int: Segmentos escritos.
+    """
+    registros.sort(key=lambda registro: registro[0])
+    grupo: List[Tuple[int, bytes]] = []
+    ocupado = escritos = 0
+    for registro in registros:
+        grupo.append(registro)
+        ocupado += len(registro[1])
+        if ocupado >= tamano:
+            _escribir_segmento(directorio, grupo, generacion)
+            grupo, ocupado, escritos = [], 0, escritos + 1
+    if grupo:
+        _escribir_segmento(directorio, grupo, generacion)
+        escritos += 1
+    return escritos
+
+
+def _reconstruir_indice(base: str) -> int:
+    """
+    Genera el índice de un segmento a partir de sus datos, descartando una última línea
+    incompleta. Se usa con segmentos que un proceso dejó abiertos al terminar.
+
+    Returns:
+        int: Registros del segmento.
+    """
+    posiciones: Dict[int, int] = {}
+    posicion = 0
+    with open(base + SUFIJO_DATOS, "r+b") as f:
+        for linea in f:
+            try:
+                posiciones[json.loads(linea)["id"]] = posicion
+            except (ValueError, KeyError, TypeError):
+                f.truncate(posicion)
+                break
+            posicion += len(linea)
+    if posiciones:
+        _escribir_indice(base, sorted(posiciones.items()))
+    else:
+        os.remove(base + SUFIJO_DATOS)
+    return len(posiciones)
+
+
+def _migrar_archivo(ruta: str, directorio: str, tamano: int) -> int:
+    """
+    Migra a segmentos un archivo de peticiones de un formato anterior: un array JSON
+    (`.json`) o JSON Lines en un solo archivo (`.jsonl`). Después lo renombra a
+    `<ruta>.migrado`.
+
+    Returns:
+        int: Registros migrados.
+    """
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            if ruta.endswith(SUFIJO_DATOS):
+                anteriores = [json.loads(linea) for linea in f if linea.strip()]
+            else:
+                anteriores = json.load(f)
+        if not isinstance(anteriores, list):
+            raise ValueError("se esperaba una lista de peticiones")
+        registros = [(registro["id"], _serializar(registro)) for registro in anteriores]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.error(f"No se pudo migrar {ruta} al diario: {e}")
+        return 0
+    _escribir_segmentos(directorio, registros, tamano)
+    os.replace(ruta, ruta + ".migrado")
+    logger.info(f"Migradas {len(registros)} peticiones de {ruta} a {directorio}")
+    return len(registros)
+
+
+def trasladar_anterior(anterior: Optional[str], destino: str, sufijos: Iterable[str] = ("",)) -> None:
+    """
+    Mueve un almacén de su ubicación anterior a la actual si aún no existe en esta.
+
+    Args:
+        anterior (str | None): Ruta anterior del archivo o directorio.
+        destino (str): Ruta actual.
+        sufijos (Iterable[str]): Sufijos de los archivos que acompañan al principal
+            (por ejemplo, `-wal` y `-shm` de SQLite); "" es el propio archivo.
+    """
+    if not anterior or not os.path.exists(anterior) or os.path.exists(destino):
+        return
+    if os.path.abspath(anterior) == os.path.abspath(destino):
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(destino)), exist_ok=True)
+    for sufijo in sufijos:
+        if os.path.exists(anterior + sufijo):
+            os.replace(anterior + sufijo, destino + sufijo)
+    logger.info(f"Almacén trasladado de {anterior} a {destino}")
+
+
+def preparar_diario(directorio: str = DIRECTORIO_DIARIO, anteriores: Iterable[str] = (),
+                    tamano_segmento: int = TAMANO_SEGMENTO_DIARIO,
+                    ubicacion_anterior: Optional[str] = None) -> None:
+    """
+    Deja el directorio del diario listo antes de arrancar los workers.
+
+    Cierra los segmentos que un proceso anterior dejó abiertos (por ejemplo, tras
+    `kill -9`) reconstruyendo su índice desde los datos, y migra una sola vez los
+    archivos de formatos anteriores. No debe llamarse con otros procesos escribiendo.
+
+    Args:
+        directorio (str): Directorio del diario.
+        anteriores (Iterable[str]): Archivos de formatos anteriores que migrar si existen.
+        tamano_segmento (int): Tamaño de los segmentos migrados.
+        ubicacion_anterior (str | None): Directorio anterior del diario, que se traslada
+            a `directorio` si este aún no existe.
+    """
+    trasladar_anterior(ubicacion_anterior, directorio)
+    os.makedirs(directorio, exist_ok=True)
+    for nombre in os.listdir(directorio):
+        if nombre.endswith(SUFIJO_DATOS):
+            base = os.path.join(directorio, nombre[:-len(SUFIJO_DATOS)])
+            if not os.path.exists(base + SUFIJO_INDICE):
+                registros = _reconstruir_indice(base)
+                logger.info(f"Segmento del diario {base} cerrado al arrancar ({registros} registros)")
+            if os.path.exists(base + SUFIJO_INDICE_ABIERTO):
+                os.remove(base + SUFIJO_INDICE_ABIERTO)
+    for ruta in anteriores:
+        if os.path.exists(ruta):
+            _migrar_archivo(ruta, directorio, tamano_segmento)
+
+
+@contextmanager
+def _bloqueo_compactacion(directorio: str) -> Iterator[bool]:
+    """
+    Toma sin esperar el lock de compactación del directorio, compartido entre procesos.
+
+    Yields:
+        bool: True si se obtuvo el lock.
+    """
+    if fcntl is None:
+        yield True
+        return
+    with open(os.path.join(directorio, ".compactacion"), "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class _Segmento:
+    """
+    Segmento cerrado del diario, leído con `mmap`.
+
+    El índice se ve como una secuencia de enteros sin copiarlo (`memoryview.cast`), de
+    modo que buscar un id es una búsqueda binaria que solo toca las páginas necesarias.
+    Los mapas se liberan cuando el segmento deja de estar referenciado.
+    """
+
+    def __init__(self, base: str):
+        """
+        Abre el índice del segmento.
+
+        Args:
+            base (str): Ruta del segmento sin sufijo.
+
+        Raises:
+            OSError: Si el segmento ya no existe.
+            ValueError: Si el índice está vacío.
+        """
+        self.base = base
+        self.generacion = _generacion(base)
+        with open(base + SUFIJO_INDICE, "rb") as f:
+            self._mapa_indice = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        entradas = memoryview(self._mapa_indice).cast("Q")
+        self.ids = entradas[0::2]
+        self.posiciones = entradas[1::2]
+        self.primero = self.ids[0]
+        self.ultimo = self.ids[-1]
+        # Se mapean ya los datos: el segmento sigue siendo legible aunque una compactación
+        # borre sus archivos mientras otro hilo lo consulta
+        with open(base + SUFIJO_DATOS, "rb") as f:
+            self._datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.tamano = len(self._datos)
+
+    def buscar(self, id_dato: int) -> Optional[bytes]:
+        """
+        Busca un registro por id.
+
+        Returns:
+            bytes | None: Línea JSON del registro, sin el salto de línea final.
+        """
+        i = bisect_left(self.ids, id_dato)
+        if i == len(self.ids) or self.ids[i] != id_dato:
+            return None
+        datos = self._datos
+        posicion = self.posiciones[i]
+        return datos[posicion:datos.find(b"\n", posicion)]
+
+    def registros(self) -> Iterator[Tuple[int, bytes]]:
+        """
+        Recorre los registros del segmento en orden de id.
+
+        Yields:
+            Tuple[int, bytes]: Id y línea JSON con su salto de línea.
+        """
+        datos = self._datos
+        for id_dato, posicion in zip(self.ids, self.posiciones):
+            yield id_dato, datos[posicion:datos.find(b"\n", posicion) + 1]
+
+
+class _IndiceAbierto:
+    """
+    Índice del segmento abierto de otro proceso.
+
+    El proceso dueño solo añade pares (id, posición) al final de `.abierto.idx`. Cada
+    consulta lee únicamente los bytes añadidos desde la anterior y los incorpora a una
+    copia ordenada por id, sobre la que se busca con bisección. Los ids de un mismo
+    proceso llegan casi en orden, así que reordenar la copia es raro.
+    """
+
+    def __init__(self, base: str):
+        """
+        Prepara el índice; no se lee hasta la primera búsqueda.
+
+        Args:
+            base (str): Ruta del segmento sin sufijo.
+        """
+        self.base = base
+        self._leidos = 0  # Bytes de `.abierto.idx` ya incorporados
+        self._ids = array("Q")
+        self._posiciones = array("Q")
+        self._lock = threading.Lock()
+
+    def _actualizar(self) -> None:
+        """
+        Incorpora las entradas añadidas al índice desde la última lectura.
+        """
+        with open(self.base + SUFIJO_INDICE_ABIERTO, "rb") as f:
+            f.seek(self._leidos)
+            contenido = f.read()
+        completas = len(contenido) // 16 * 16  # Una entrada a medio escribir se lee después
+        if not completas:
+            return
+        entradas = array("Q")
+        entradas.frombytes(contenido[:completas])
+        self._leidos += completas
+        ids, posiciones = entradas[0::2], entradas[1::2]
+        ordenadas = (not self._ids or ids[0] >= self._ids[-1]) and all(
+            anterior <= siguiente for anterior, siguiente in zip(ids, ids[1:])
+        )
+        self._ids.extend(ids)
+        self._posiciones.extend(posiciones)
+        if not ordenadas:
+            # Con ids repetidos, la última aparición queda detrás (posición mayor)
+            pares = sorted(zip(self._ids, self._posiciones))
+            self._ids = array("Q", (id_dato for id_dato, _ in pares))
+            self._posiciones = array("Q", (posicion for _, posicion in pares))
+
+    def buscar(self, id_dato: int) -> Optional[bytes]:
+        """
+        Busca un registro por id.
+
+        Returns:
+            bytes | None: Línea JSON del registro, sin el salto de línea final, o None
+                si no está o el segmento ya se ha cerrado.
+        """
+        try:
+            with self._lock:
+                self._actualizar()
+                i = bisect_right(self._ids, id_dato) - 1
+                if i < 0 or self._ids[i] != id_dato:
+                    return None
+                posicion = self._posiciones[i]
+            with open(self.base + SUFIJO_DATOS, "rb") as f:
+                f.seek(posicion)
+                return f.readline().rstrip(b"\n")
+        except OSError:
+            return None
+
+
+class EscritorPorLotes(ABC):
+    """
+    Base de los almacenes de POST /data: los registros se escriben por lotes desde un
+    único hilo.
+
+    `agregar` solo deja el registro preparado en un buffer en memoria; el hilo escritor
+    vuelca de una vez todos los acumulados (group commit) con `_escribir_lote`, que
+    implementa cada almacén, de modo que el coste de escribir se reparte entre las
+    peticiones concurrentes.
+
+    Políticas de sincronización con el disco (`sincronizacion`):
+
+    - "ninguna": el sistema operativo decide cuándo llegan los datos al disco.
+    - "lote": se sincroniza cada lote escrito; una caída del sistema puede perder como
+      mucho los registros de los últimos `intervalo` segundos.
+    - "siempre": `agregar` no retorna hasta que su registro está escrito y sincronizado.
+      Los registros que llegan mientras se sincroniza un lote comparten la siguiente
+      sincronización.
+
+    El hilo se arranca con el primer registro (así cada worker pre-fork tiene el suyo)
+    y `cerrar` vuelca lo pendiente antes de terminar. Cada almacén implementa los métodos
+    abstractos `_preparar`, `_escribir_lote`, `leer` y `ultimo_id`.
+    """
+
+    nombre = "almacén"
+    admite_consultas = False  # True si implementa `consultar` por rango de fechas
+
+    def __init__(self, intervalo: float = INTERVALO_DIARIO,
+                 sincronizacion: str = SINCRONIZACION_DIARIO):
+        """
+        Configura el escritor.
+
+        Args:
+            intervalo (float): Segundos máximos que un registro espera en el buffer.
+            sincronizacion (str): "ninguna", "lote" o "siempre".
+
+        Raises:
+            ValueError: Si la política de sincronización no existe.
+        """
+        if sincronizacion not in MODOS_SINCRONIZACION_DIARIO:
+            raise ValueError(f"Política de sincronización desconocida: {sincronizacion}")
+        self.intervalo = intervalo
+        self.sincronizacion = sincronizacion
+        self.registros = 0  # Registros escritos por este proceso
+        self.lotes = 0
+        self._pendientes: List = []
+        self._agregados = 0  # Registros recibidos: secuencia del último
+        self._confirmados = 0  # Registros ya escritos (y sincronizados, si corresponde)
+        self._condicion = threading.Condition()
+        self._hilo: Optional[threading.Thread] = None
+        self._cerrado = False
+
+    @abstractmethod
+    def _preparar(self, registro: Dict):
+        """
+        Convierte un registro en el elemento que recibe `_escribir_lote`. Se ejecuta en
+        el hilo del manejador, fuera de cualquier lock.
+        """
+
+    @abstractmethod
+    def _escribir_lote(self, lote: List) -> None:
+        """
+        Escribe un lote de elementos preparados. Se ejecuta en el hilo escritor.
+        """
+
+    def _al_iniciar(self) -> None:
+        """
+        Se llama al arrancar el hilo escritor, con la condición tomada.
+        """
+
+    def preparar(self) -> None:
+        """
+        Prepara el almacenamiento antes de arrancar los workers.
+        """
+
+    @abstractmethod
+    def leer(self, id_dato: int) -> Optional[bytes]:
+        """
+        Busca un registro por id.
+
+        Args:
+            id_dato (int): Id asignado por POST /data.
+
+        Returns:
+            bytes | None: Registro como JSON, o None si no existe.
+        """
+
+    @abstractmethod
+    def ultimo_id(self) -> int:
+        """
+        Mayor id guardado, para que los ids nuevos no repitan los de ejecuciones
+        anteriores.
+
+        Returns:
+            int: Último id, o 0 si no hay datos.
+        """
+
+    def _al_cerrar(self) -> None:
+        """
+        Se llama al cerrar, después de volcar lo pendiente.
+        """
+
+    def agregar(self, registro: Dict) -> None:
+        """
+        Añade un registro.
+
+        Args:
+            registro (Dict): Objeto serializable a JSON con un `id` entero y un
+                `timestamp` ISO 8601.
+
+        Raises:
+            RuntimeError: Si el almacén ya se cerró.
+        """
+        elemento = self._preparar(registro)
+        with self._condicion:
+            if self._cerrado:
+                raise RuntimeError(f"El {self.nombre} está cerrado")
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._escribir, name=type(self).__name__,
+                                              daemon=True)
+                self._hilo.start()
+                self._al_iniciar()
+            self._pendientes.append(elemento)
+            self._agregados += 1
+            secuencia = self._agregados
+            if self.sincronizacion == "siempre":
+                self._condicion.notify_all()
+                self._condicion.wait_for(lambda: self._confirmados >= secuencia or self._hilo is None)
+
+    def _escribir(self) -> None:
+        """
+        Bucle del hilo escritor: espera registros y los vuelca por lotes.
+        """
+        while True:
+            with self._condicion:
+                self._condicion.wait_for(lambda: self._pendientes or self._cerrado, self.intervalo)
+                lote, self._pendientes = self._pendientes, []
+                secuencia = self._agregados
+                if not lote and self._cerrado:
+                    return
+            if not lote:
+                continue
+            try:
+                self._escribir_lote(lote)
+                self.registros += len(lote)
+                self.lotes += 1
+            except Exception as e:
+                logger.error(f"Error escribiendo en el {self.nombre}: {e}")
+            with self._condicion:
+                self._confirmados = secuencia
+                self._condicion.notify_all()
+
+    def cerrar(self) -> None:
+        """
+        Vuelca los registros pendientes y detiene el hilo escritor.
+        """
+        with self._condicion:
+            if self._cerrado:
+                return
+            self._cerrado = True
+            self._condicion.notify_all()
+            hilo = self._hilo
+        if hilo is None:
+            return
+        hilo.join()
+        self._al_cerrar()
+        with self._condicion:
+            self._hilo = None
+            self._condicion.notify_all()
+        logger.info(f"{self.nombre.capitalize()} cerrado: {self.registros} registros en {self.lotes} lotes")
+
+    def obtener_stats(self) -> Dict:
+        """
+        Retorna las estadísticas del escritor.
+
+        Returns:
+            Dict: Política, registros y lotes escritos por este proceso y registros
+                pendientes.
+        """
+        return {
+            "sincronizacion": self.sincronizacion,
+            "registros": self.registros,
+            "lotes": self.lotes,
+            "pendientes": len(self._pendientes),
+        }
+
+
+class DiarioPeticiones(EscritorPorLotes):
+    """
+    Diario de peticiones de solo anexado, dividido en segmentos de tamaño acotado.
+
+    Cada lote se añade de una vez, con sus entradas de índice, al segmento abierto del
+    proceso, de modo que el coste de cada POST no depende del tamaño del diario. Con la
+    política "lote" o "siempre" cada lote termina con un `fsync`. Cuando el segmento
+    supera `tamano_segmento` bytes se cierra: su índice se escribe ordenado por id y se
+    abre otro. Cada proceso worker escribe en sus propios segmentos.
+
+    `leer` busca un registro por id: primero en el índice en memoria del segmento abierto
+    y después en los segmentos cerrados, cuyo rango de ids se conoce sin abrirlos, con
+    una búsqueda binaria sobre el índice mapeado con `mmap`; por último, en los
+    segmentos abiertos por otros workers, con una copia ordenada de su índice que se
+    amplía con lo que añaden (`_IndiceAbierto`). Un hilo de fondo fusiona los segmentos
+    pequeños (los que deja cada parada del servidor o cada worker) por generaciones, de
+    modo que los rangos de ids apenas se solapan y una búsqueda toca uno o dos
+    segmentos aunque el diario tenga millones de registros.
+    """
+
+    nombre = "diario de peticiones"
+
+    def __init__(self, directorio: str = DIRECTORIO_DIARIO, intervalo: float = INTERVALO_DIARIO,
+                 sincronizacion: str = SINCRONIZACION_DIARIO,
+                 tamano_segmento: int = TAMANO_SEGMENTO_DIARIO,
+                 intervalo_compactacion: float = INTERVALO_COMPACTACION_DIARIO):
+        """
+        Configura el diario; no se toca el disco hasta el primer registro o consulta.
+
+        Args:
+            directorio (str): Directorio de los segmentos.
+            intervalo (float): Segundos máximos que un registro espera en el buffer.
+            sincronizacion (str): "ninguna", "lote" o "siempre".
+            tamano_segmento (int): Bytes a partir de los cuales se cierra un segmento.
+            intervalo_compactacion (float): Segundos entre compactaciones; 0 las desactiva.
+
+        Raises:
+            ValueError: Si la política de sincronización no existe.
+        """
+        super().__init__(intervalo, sincronizacion)
+        self.directorio = directorio
+        self.tamano_segmento = tamano_segmento
+        self.intervalo_compactacion = intervalo_compactacion
+        self.compactaciones = 0
+        self._compactador: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+        # Segmento abierto por este proceso
+        self._activo: Optional[str] = None
+        self._fd = self._fd_indice = -1
+        self._tamano_activo = 0
+        self._indice_activo: Dict[int, Tuple[int, int]] = {}  # id -> (posición, longitud)
+        self._lock_activo = threading.Lock()
+        # Catálogo de segmentos cerrados, ordenado por primer id
+        self._segmentos: List[_Segmento] = []
+        self._primeros: List[int] = []
+        self._maximos: List[int] = []  # Máximo acumulado del último id de cada segmento
+        self._abiertos: List[_IndiceAbierto] = []  # Segmentos abiertos por otros procesos
+        self._marca_catalogo = (None, 0)
+        self._lock_catalogo = threading.Lock()
+
+    def _preparar(self, registro: Dict) -> Tuple[int, bytes]:
+        """
+        Serializa un registro en la línea que escribe `_escribir_lote`.
+
+        Args:
+            registro (Dict): Dato de POST /data con su `id`.
+
+        Returns:
+            Tuple[int, bytes]: Id y línea JSON terminada en salto de línea.
+        """
+        return registro["id"], _serializar(registro)
+
+    def preparar(self) -> None:
+        """
+        Cierra los segmentos que quedaron abiertos y migra los formatos anteriores (ver
+        `preparar_diario`).
+        """
+        preparar_diario(self.directorio, ARCHIVOS_DIARIO_ANTERIORES, self.tamano_segmento,
+                        DIRECTORIO_DIARIO_ANTERIOR)
+
+    def _al_iniciar(self) -> None:
+        """
+        Arranca el hilo de compactación.
+        """
+        os.makedirs(self.directorio, exist_ok=True)
+        if self.intervalo_compactacion > 0:
+            self._compactador = threading.Thread(
+                target=self._compactar_periodicamente, name="DiarioCompactacion", daemon=True
+            )
+            self._compactador.start()
+
+    def _al_cerrar(self) -> None:
+        """
+        Detiene la compactación y cierra el segmento abierto.
+        """
+        self._detener.set()
+        if self._compactador is not None:
+            self._compactador.join()
+        self._sellar()
+
+    def _escribir_lote(self, lote: List[Tuple[int, bytes]]) -> None:
+        """
+        Escribe un lote en el segmento abierto y lo cierra si supera el tamaño máximo.
+        """
+        if self._activo is None:
+            base = _nueva_base(self.directorio)
+            banderas = os.O_APPEND | os.O_CREAT
+            # Lectura y escritura: `leer` usa `os.pread` sobre el mismo descriptor
+            self._fd = os.open(base + SUFIJO_DATOS, banderas | os.O_RDWR, 0o644)
+            self._fd_indice = os.open(base + SUFIJO_INDICE_ABIERTO, banderas | os.O_WRONLY, 0o644)
+            self._activo = base
+
+        posicion = self._tamano_activo
+        entradas = array("Q")
+        nuevas = {}
+        for id_dato, linea in lote:
+            entradas.append(id_dato)
+            entradas.append(posicion)
+            nuevas[id_dato] = (posicion, len(linea) - 1)
+            posicion += len(linea)
+        os.write(self._fd, b"".join([linea for _, linea in lote]))
+        os.write(self._fd_indice, entradas.tobytes())
+        if self.sincronizacion != "ninguna":
+            os.fsync(self._fd)
+            os.fsync(self._fd_indice)
+        # Visibles para `leer` solo cuando ya están en el archivo
+        self._indice_activo.update(nuevas)
+        self._tamano_activo = posicion
+        if posicion >= self.tamano_segmento:
+            self._sellar()
+
+    def _sellar(self) -> None:
+        """
+        Cierra el segmento abierto escribiendo su índice ordenado.
+        """
+        with self._lock_activo:
+            if self._activo is None:
+                return
+            base = self._activo
+            _escribir_indice(base, sorted((id_dato, posicion) for id_dato, (posicion, _)
+                                          in self._indice_activo.items()))
+            os.close(self._fd)
+            os.close(self._fd_indice)
+            os.remove(base + SUFIJO_INDICE_ABIERTO)
+            self._activo = None
+            self._fd = self._fd_indice = -1
+            self._indice_activo = {}
+            self._tamano_activo = 0
+
+    def leer(self, id_dato: int) -> Optional[bytes]:
+        """
+        Busca un registro por id.
+
+        Args:
+            id_dato (int): Id asignado por POST /data.
+
+        Returns:
+            bytes | None: Registro como JSON, o None si no existe.
+        """
+        with self._lock_activo:
+            entrada = self._indice_activo.get(id_dato)
+            if entrada is not None:
+                posicion, longitud = entrada
+                return os.pread(self._fd, longitud, posicion)
+
+        segmentos, primeros, maximos, abiertos = self._catalogo()
+        i = bisect_right(primeros, id_dato)
+        while i > 0 and maximos[i - 1] >= id_dato:
+            i -= 1
+            linea = segmentos[i].buscar(id_dato)
+            if linea is not None:
+                return linea
+        for abierto in abiertos:
+            linea = abierto.buscar(id_dato)
+            if linea is not None:
+                return linea
+        return None
+
+    def _catalogo(self, forzar: bool = False):
+        """
+        Retorna el catálogo de segmentos, releyendo el directorio si ha cambiado.
+
+        El cambio se detecta por la fecha de modificación del directorio (un `stat`). Si
+        la última lectura fue justo después de un cambio se vuelve a leer, porque otro
+        cambio en el mismo instante no movería la fecha.
+        """
+        try:
+            modificado = os.stat(self.directorio).st_mtime_ns
+        except FileNotFoundError:
+            return [], [], [], []
+        with self._lock_catalogo:
+            marca, leido = self._marca_catalogo
+            if forzar or modificado != marca or leido - modificado < 100_000_000:
+                self._cargar_catalogo(modificado)
+            return self._segmentos, self._primeros, self._maximos, self._abiertos
+
+    def _cargar_catalogo(self, modificado: int) -> None:
+        """
+        Lee la lista de segmentos del directorio, reutilizando los ya abiertos.
+        """
+        leido = time.time_ns()
+        conocidos = {segmento.base: segmento for segmento in self._segmentos}
+        abiertos_conocidos = {abierto.base: abierto for abierto in self._abiertos}
+        segmentos, abiertos = [], []
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(SUFIJO_INDICE_ABIERTO):
+                base = os.path.join(self.directorio, nombre[:-len(SUFIJO_INDICE_ABIERTO)])
+                if base != self._activo:
+                    abiertos.append(abiertos_conocidos.get(base) or _IndiceAbierto(base))
+            elif nombre.endswith(SUFIJO_INDICE):
+                base = os.path.join(self.directorio, nombre[:-len(SUFIJO_INDICE)])
+                segmento = conocidos.get(base)
+                if segmento is None:
+                    try:
+                        segmento = _Segmento(base)
+                    except (OSError, ValueError):
+                        continue
+                segmentos.append(segmento)
+        segmentos.sort(key=lambda segmento: segmento.primero)
+        self._segmentos = segmentos
+        self._primeros = [segmento.primero for segmento in segmentos]
+        self._maximos = list(itertools.accumulate((segmento.ultimo for segmento in segmentos), max))
+        self._abiertos = abiertos
+        self._marca_catalogo = (modificado, leido)
+
+    def ultimo_id(self) -> int:
+        """
+        Mayor id guardado en el diario, para que los ids nuevos no repitan los de
+        ejecuciones anteriores.
+
+        Returns:
+            int: Último id, o 0 si el diario está vacío.
+        """
+        _, _, maximos, _ = self._catalogo(forzar=True)
+        return max(maximos[-1] if maximos else 0, max(self._indice_activo, default=0))
+
+    def compactar(self) -> int:
+        """
+        Fusiona segmentos cerrados pequeños (menos de la mitad del tamaño máximo) de la
+        misma generación en uno de la generación siguiente, ordenado por id y sin
+        registros duplicados. Solo un proceso compacta a la vez.
+
+        Si un id aparece en varios segmentos se conserva el registro con el `timestamp`
+        más reciente, y con el mismo `timestamp` el del segmento creado después. El
+        orden de los segmentos no basta: el nombre de uno fusionado lleva la hora de la
+        compactación, no la de sus registros.
+
+        Un segmento fusionado solo vuelve a fusionarse junto a otro de su misma
+        generación, de modo que cada registro se reescribe como mucho una vez por
+        generación (logarítmico en el número de segmentos) y no en cada compactación.
+
+        Returns:
+            int: Segmentos fusionados (0 si no había nada que compactar).
+        """
+        with _bloqueo_compactacion(self.directorio) as obtenido:
+            if not obtenido:
+                return 0
+            generaciones: Dict[int, List[_Segmento]] = {}
+            for segmento in self._catalogo(forzar=True)[0]:
+                if segmento.tamano < self.tamano_segmento // 2:
+                    generaciones.setdefault(segmento.generacion, []).append(segmento)
+            pequenos: List[_Segmento] = []
+            for generacion in sorted(generaciones):
+                if len(generaciones[generacion]) >= 2:
+                    ocupado = 0
+                    for segmento in generaciones[generacion]:
+                        if ocupado >= self.tamano_segmento:
+                            break
+                        pequenos.append(segmento)
+                        ocupado += segmento.tamano
+                    break
+            if len(pequenos) < 2:
+                return 0
+
+            registros: Dict[int, bytes] = {}
+            for segmento in sorted(pequenos, key=lambda segmento: os.path.basename(segmento.base)):
+                for id_dato, linea in segmento.registros():
+                    anterior = registros.get(id_dato)
+                    # Los ids repetidos son raros: solo entonces se leen los `timestamp`
+                    if anterior is None or _marca_registro(linea) >= _marca_registro(anterior):
+                        registros[id_dato] = linea
+            _escribir_segmentos(self.directorio, list(registros.items()), self.tamano_segmento,
+                                pequenos[0].generacion + 1)
+            # Primero el índice: sin él el segmento deja de verse aunque queden los datos
+            for segmento in pequenos:
+                os.remove(segmento.base + SUFIJO_INDICE)
+                os.remove(segmento.base + SUFIJO_DATOS)
+            self.compactaciones += 1
+            logger.info(f"Diario compactado: {len(pequenos)} segmentos, {len(registros)} registros")
+            return len(pequenos)
+
+    def _compactar_periodicamente(self) -> None:
+        """
+        Bucle del hilo de compactación.
+        """
+        while not self._detener.wait(self.intervalo_compactacion):
+            try:
+                self.compactar()
+            except OSError as e:
+                logger.error(f"Error compactando el diario de peticiones: {e}")
+
+    def obtener_stats(self) -> Dict:
+        """
+        Retorna las estadísticas del diario.
+
+        Returns:
+            Dict: Las del escritor más el directorio, los segmentos cerrados y las
+                compactaciones.
+        """
+        stats = super().obtener_stats()
+        stats.update({
+            "directorio": self.directorio,
+            "segmentos": len(self._catalogo()[0]),
+            "compactaciones": self.compactaciones,
+        })
+        return stats
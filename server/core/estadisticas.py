@@ -0,0 +1,203 @@
+import multiprocessing
+import struct
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List
+
+from ..config import logger
+
+# Campos de cada slot. Los contadores acumulados se conservan si el worker se reinicia;
+# los valores instantáneos (datos en memoria, tamaño de la cola) se ponen a cero.
+CAMPOS = ("pid", "total_solicitudes", "datos_almacenados", "tamano_cola", "ultimo_id")
+CAMPOS_ACUMULADOS = ("total_solicitudes", "ultimo_id")
+CAMPOS_SUMADOS = ("total_solicitudes", "datos_almacenados", "tamano_cola")
+_POSICION = {campo: i for i, campo in enumerate(CAMPOS)}
+
+# Formato del segmento de memoria compartida con nombre:
+# cabecera de 64 bytes (firma, versión, número de workers y de campos) seguida de
+# num_workers * len(CAMPOS) enteros de 64 bits.
+FIRMA = b"HTTPSTAT"
+VERSION_FORMATO = 1
+CABECERA = struct.Struct("<8sHHH")
+TAMANO_CABECERA = 64
+
+
+class TablaEstadisticas:
+    """
+    Tabla de contadores por worker en memoria compartida entre procesos.
+
+    Se crea en el proceso supervisor antes de hacer fork, de modo que todos los workers
+    heredan la misma memoria. Cada worker escribe únicamente en su propio slot, por lo
+    que no hace falta un lock entre procesos; la lectura suma los slots de todos.
+    """
+
+    def __init__(self, num_workers: int):
+        """
+        Reserva la memoria compartida para los slots.
+
+        Args:
+            num_workers (int): Número de procesos worker.
+        """
+        self.num_workers = num_workers
+        self._valores = multiprocessing.RawArray("q", num_workers * len(CAMPOS))
+
+    def escribir(self, worker: int, campo: str, valor: int) -> None:
+        """
+        Actualiza un campo del slot de un worker.
+
+        Args:
+            worker (int): Índice del worker.
+            campo (str): Nombre del campo.
+            valor (int): Nuevo valor.
+        """
+        self._valores[worker * len(CAMPOS) + _POSICION[campo]] = valor
+
+    def leer(self, worker: int, campo: str) -> int:
+        """
+        Lee un campo del slot de un worker.
+
+        Args:
+            worker (int): Índice del worker.
+            campo (str): Nombre del campo.
+
+        Returns:
+            int: Valor del campo.
+        """
+        return self._valores[worker * len(CAMPOS) + _POSICION[campo]]
+
+    def reiniciar_worker(self, worker: int) -> None:
+        """
+        Pone a cero los valores instantáneos del slot de un worker que ha terminado,
+        conservando los contadores acumulados.
+
+        Args:
+            worker (int): Índice del worker.
+        """
+        for campo in CAMPOS:
+            if campo not in CAMPOS_ACUMULADOS:
+                self.escribir(worker, campo, 0)
+
+    def por_worker(self) -> List[Dict]:
+        """
+        Retorna el contenido de todos los slots.
+
+        Returns:
+            List[Dict]: Un diccionario por worker con todos sus campos.
+        """
+        return [
+            {"worker": worker, **{campo: self.leer(worker, campo) for campo in CAMPOS}}
+            for worker in range(self.num_workers)
+        ]
+
+    def totales(self) -> Dict:
+        """
+        Suma los contadores de todos los workers.
+
+        Returns:
+            Dict: Total de solicitudes, datos almacenados y tamaño de cola del servidor.
+        """
+        return {
+            campo: sum(self.leer(worker, campo) for worker in range(self.num_workers))
+            for campo in CAMPOS_SUMADOS
+        }
+
+    def cerrar(self, eliminar: bool = False) -> None:
+        """
+        Libera la tabla. La memoria anónima se libera sola al terminar los procesos.
+
+        Args:
+            eliminar (bool): Sin efecto en esta implementación.
+        """
+
+
+class TablaEstadisticasCompartida(TablaEstadisticas):
+    """
+    Tabla de estadísticas sobre un segmento `multiprocessing.shared_memory` con nombre.
+
+    Tiene la misma disposición fija de slots que `TablaEstadisticas`, precedida de una
+    cabecera que describe el formato, de modo que una herramienta externa puede abrir
+    el segmento por su nombre y leer los contadores sin hacer ninguna petición HTTP.
+    """
+
+    def __init__(self, num_workers: int, nombre: str, crear: bool = True):
+        """
+        Crea o abre el segmento de memoria compartida.
+
+        Args:
+            num_workers (int): Número de procesos worker.
+            nombre (str): Nombre del segmento.
+            crear (bool): True para crearlo (servidor), False para abrir uno existente.
+        """
+        self.num_workers = num_workers
+        self.nombre = nombre
+        tamano = TAMANO_CABECERA + num_workers * len(CAMPOS) * 8
+        if crear:
+            try:
+                self._shm = shared_memory.SharedMemory(nombre, create=True, size=tamano)
+            except FileExistsError:
+                logger.warning(f"Sustituyendo segmento de estadísticas previo '{nombre}'")
+                previo = shared_memory.SharedMemory(nombre)
+                previo.close()
+                previo.unlink()
+                self._shm = shared_memory.SharedMemory(nombre, create=True, size=tamano)
+            CABECERA.pack_into(self._shm.buf, 0, FIRMA, VERSION_FORMATO, num_workers, len(CAMPOS))
+        else:
+            self._shm = shared_memory.SharedMemory(nombre)
+            # En Python < 3.13 el resource_tracker eliminaría al salir un segmento que
+            # solo hemos abierto para leer
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        self._vista = self._shm.buf[TAMANO_CABECERA:tamano]
+        self._valores = self._vista.cast("q")
+
+    @classmethod
+    def abrir(cls, nombre: str) -> "TablaEstadisticasCompartida":
+        """
+        Abre para lectura el segmento de estadísticas de un servidor en ejecución.
+
+        Args:
+            nombre (str): Nombre del segmento.
+
+        Returns:
+            TablaEstadisticasCompartida: Tabla asociada al segmento.
+
+        Raises:
+            ValueError: Si el segmento no tiene el formato esperado.
+        """
+        shm = shared_memory.SharedMemory(nombre)
+        try:
+            firma, version, num_workers, num_campos = CABECERA.unpack_from(shm.buf, 0)
+        finally:
+            shm.close()
+            resource_tracker.unregister(shm._name, "shared_memory")
+        if firma != FIRMA or version != VERSION_FORMATO or num_campos != len(CAMPOS):
+            raise ValueError(f"El segmento '{nombre}' no contiene estadísticas del servidor")
+        return cls(num_workers, nombre, crear=False)
+
+    def cerrar(self, eliminar: bool = False) -> None:
+        """
+        Cierra el segmento en este proceso.
+
+        Args:
+            eliminar (bool): True para destruir el segmento (solo el proceso que lo creó).
+        """
+        self._valores.release()
+        self._vista.release()
+        self._shm.close()
+        if eliminar:
+            self._shm.unlink()
+
+
+def crear_tabla_estadisticas(num_workers: int, nombre: str = None) -> TablaEstadisticas:
+    """
+    Crea la tabla de estadísticas con el backend adecuado.
+
+    Args:
+        num_workers (int): Número de procesos worker.
+        nombre (str, optional): Nombre del segmento de memoria compartida. Si no se indica,
+            se usa memoria anónima heredada por fork, no accesible desde fuera.
+
+    Returns:
+        TablaEstadisticas: Tabla creada.
+    """
+    if nombre:
+        return TablaEstadisticasCompartida(num_workers, nombre)
+    return TablaEstadisticas(num_workers)
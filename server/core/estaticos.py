@@ -0,0 +1,366 @@
+import errno
+import fnmatch
+import mimetypes
+import mmap
+import os
+import select
+import socket
+import stat
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+from urllib.parse import unquote
+
+from ..config import CACHE_ESTATICOS_ENTRADAS, CACHE_ESTATICOS_TTL, PATRON_ESTATICOS
+from .parser import ErrorSolicitud
+from .respuesta import enviar_vectores
+
+# Bytes enviados por cada llamada a os.sendfile
+BLOQUE_SENDFILE = 1024 * 1024
+# Bytes de cada sendall desde el mmap; el adaptador del motor asyncio copia cada trozo y
+# espera a que se vacíe su búfer entre uno y otro
+BLOQUE_MMAP = 256 * 1024
+
+
+class ArchivoAbierto:
+    """
+    Archivo abierto y sus metadatos, tal como se guardan en la caché.
+
+    El descriptor se cierra cuando la entrada deja de estar referenciada, de modo que
+    un hilo que está enviando el archivo puede terminar aunque la entrada se haya
+    expulsado de la caché mientras tanto.
+    """
+
+    __slots__ = ("fd", "identidad", "tamano", "etag", "ultima_modificacion", "mtime",
+                 "content_type", "comprobado")
+
+    def __init__(self, ruta: str):
+        """
+        Abre el archivo y lee sus metadatos.
+
+        Args:
+            ruta (str): Ruta absoluta del archivo.
+
+        Raises:
+            OSError: Si el archivo no existe o no es un archivo regular.
+        """
+        self.fd = os.open(ruta, os.O_RDONLY)
+        try:
+            info = os.fstat(self.fd)
+            if not stat.S_ISREG(info.st_mode):
+                raise IsADirectoryError(ruta)
+        except OSError:
+            os.close(self.fd)
+            self.fd = -1
+            raise
+        self.identidad = (info.st_ino, info.st_mtime_ns, info.st_size)
+        self.tamano = info.st_size
+        self.mtime = int(info.st_mtime)
+        self.etag = f'"{info.st_mtime_ns:x}-{info.st_size:x}"'
+        self.ultima_modificacion = formatdate(self.mtime, usegmt=True)
+        tipo, _ = mimetypes.guess_type(ruta)
+        tipo = tipo or "application/octet-stream"
+        if tipo.startswith("text/"):
+            tipo += "; charset=utf-8"
+        self.content_type = tipo
+        self.comprobado = time.monotonic()
+
+    def __del__(self):
+        if getattr(self, "fd", -1) >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class ArchivosEstaticos:
+    """
+    Sirve los archivos de un directorio raíz.
+
+    Con `patron` solo se sirven los archivos situados directamente en la raíz cuyo
+    nombre lo cumple (`fnmatch`); el resto (subdirectorios, archivos ocultos, datos
+    internos que compartan la carpeta) responde 404 como si no existiera.
+
+    El cuerpo se transfiere con `os.sendfile` (sin copiarlo al espacio de usuario) o,
+    si la salida no es un socket, desde un `mmap` del archivo. Admite validación con
+    `ETag`/`Last-Modified` (`304 Not Modified`) y peticiones parciales con `Range`
+    (`206 Partial Content`). Los archivos abiertos y sus metadatos se guardan en una
+    pequeña caché LRU que solo vuelve a hacer `stat` pasado `CACHE_ESTATICOS_TTL`.
+    """
+
+    def __init__(self, raiz: str, max_age: int = 0,
+                 max_entradas: int = CACHE_ESTATICOS_ENTRADAS,
+                 ttl: float = CACHE_ESTATICOS_TTL,
+                 patron: Optional[str] = PATRON_ESTATICOS):
+        """
+        Inicializa el servidor de archivos.
+
+        Args:
+            raiz (str): Directorio raíz de los archivos.
+            max_age (int): Segundos de `Cache-Control: max-age`; 0 para obligar al
+                cliente a revalidar con `ETag` en cada uso.
+            max_entradas (int): Archivos abiertos como máximo en la caché.
+            ttl (float): Segundos durante los que una entrada se usa sin volver a hacer `stat`.
+            patron (str | None): Patrón de los nombres servidos; None para servir todo el
+                árbol de la raíz.
+        """
+        self.raiz = os.path.realpath(raiz)
+        self.patron = patron
+        self.max_age = max_age
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._cache: "OrderedDict[str, ArchivoAbierto]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolver_ruta(self, relativa: str) -> str:
+        """
+        Convierte la ruta de la URL en una ruta absoluta dentro de la raíz.
+
+        Args:
+            relativa (str): Ruta relativa a la raíz.
+
+        Returns:
+            str: Ruta absoluta.
+
+        Raises:
+            ErrorSolicitud: 404 si la ruta sale de la raíz o no cumple el patrón.
+        """
+        try:
+            ruta = os.path.realpath(os.path.join(self.raiz, unquote(relativa).lstrip("/")))
+        except ValueError:
+            raise ErrorSolicitud(404, "Archivo no encontrado")
+        if self.patron is not None:
+            directorio, nombre = os.path.split(ruta)
+            if directorio != self.raiz or not fnmatch.fnmatchcase(nombre, self.patron):
+                raise ErrorSolicitud(404, "Archivo no encontrado")
+        elif ruta != self.raiz and not ruta.startswith(self.raiz + os.sep):
+            raise ErrorSolicitud(404, "Archivo no encontrado")
+        return ruta
+
+    def obtener(self, relativa: str) -> ArchivoAbierto:
+        """
+        Retorna el archivo abierto, desde la caché si sigue siendo válido.
+
+        Args:
+            relativa (str): Ruta relativa a la raíz.
+
+        Returns:
+            ArchivoAbierto: Archivo y metadatos.
+
+        Raises:
+            ErrorSolicitud: 404 si el archivo no existe o no es un archivo regular.
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            archivo = self._cache.get(relativa)
+            if archivo is not None and ahora - archivo.comprobado < self.ttl:
+                self._cache.move_to_end(relativa)
+                return archivo
+
+        ruta = self.resolver_ruta(relativa)
+        try:
+            if archivo is not None:
+                info = os.stat(ruta)
+                if (info.st_ino, info.st_mtime_ns, info.st_size) == archivo.identidad:
+                    archivo.comprobado = ahora
+                    return archivo
+            archivo = ArchivoAbierto(ruta)
+        except OSError:
+            with self._lock:
+                self._cache.pop(relativa, None)
+            raise ErrorSolicitud(404, "Archivo no encontrado")
+
+        with self._lock:
+            self._cache[relativa] = archivo
+            self._cache.move_to_end(relativa)
+            while len(self._cache) > self.max_entradas:
+                self._cache.popitem(last=False)
+        return archivo
+
+    def servir(self, handler, relativa: str) -> None:
+        """
+        Responde a una solicitud GET o HEAD de un archivo.
+
+        Args:
+            handler (HTTPRequestHandler): Manejador de la conexión.
+            relativa (str): Ruta del archivo relativa a la raíz.
+        """
+        solicitud = handler.solicitud
+        archivo = self.obtener(relativa)
+        cabeceras = {
+            "ETag": archivo.etag,
+            "Last-Modified": archivo.ultima_modificacion,
+            "Cache-Control": f"public, max-age={self.max_age}" if self.max_age else "no-cache",
+            "Accept-Ranges": "bytes",
+        }
+
+        if self.no_modificado(solicitud, archivo):
+            enviar_vectores(handler.request, (handler.cabeceras_respuesta(304, None, None, cabeceras),))
+            return
+
+        inicio, longitud, estado = 0, archivo.tamano, 200
+        rango = solicitud.cabecera("range")
+        if rango and self.rango_aplicable(solicitud, archivo):
+            try:
+                limites = self.analizar_rango(rango, archivo.tamano)
+            except ValueError:
+                cabeceras["Content-Range"] = f"bytes */{archivo.tamano}"
+                handler.send_response(
+                    416, "application/json",
+                    '{"error": "Rango no satisfacible", "code": 416}', cabeceras,
+                )
+                return
+            if limites is not None:
+                inicio, fin = limites
+                longitud = fin - inicio + 1
+                estado = 206
+                cabeceras["Content-Range"] = f"bytes {inicio}-{fin}/{archivo.tamano}"
+
+        encabezado = handler.cabeceras_respuesta(estado, archivo.content_type, longitud, cabeceras)
+        if solicitud.metodo == "HEAD" or not longitud:
+            enviar_vectores(handler.request, (encabezado,))
+            return
+        # MSG_MORE: las cabeceras salen en el mismo segmento TCP que el inicio del archivo
+        enviar_vectores(handler.request, (encabezado,), mas=True)
+        enviar_archivo(handler.request, archivo.fd, inicio, longitud)
+
+    @staticmethod
+    def no_modificado(solicitud, archivo: ArchivoAbierto) -> bool:
+        """
+        Evalúa `If-None-Match` y, en su ausencia, `If-Modified-Since`.
+
+        Returns:
+            bool: True si la copia del cliente sigue siendo válida.
+        """
+        etags = solicitud.cabecera("if-none-match")
+        if etags is not None:
+            candidatos = [etag.strip().removeprefix("W/") for etag in etags.split(",")]
+            return "*" in candidatos or archivo.etag in candidatos
+        fecha = solicitud.cabecera("if-modified-since")
+        if fecha is not None:
+            try:
+                return archivo.mtime <= parsedate_to_datetime(fecha).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @staticmethod
+    def rango_aplicable(solicitud, archivo: ArchivoAbierto) -> bool:
+        """
+        Evalúa `If-Range`: el rango solo se aplica si el cliente tiene la versión actual.
+
+        Returns:
+            bool: True si debe atenderse la cabecera `Range`.
+        """
+        condicion = solicitud.cabecera("if-range")
+        if condicion is None:
+            return True
+        if condicion.startswith('"'):
+            return condicion == archivo.etag
+        return condicion == archivo.ultima_modificacion
+
+    @staticmethod
+    def analizar_rango(rango: str, tamano: int) -> Optional[Tuple[int, int]]:
+        """
+        Analiza una cabecera `Range` de un único intervalo de bytes.
+
+        Args:
+            rango (str): Valor de la cabecera, p. ej. `bytes=0-499`, `bytes=500-` o `bytes=-500`.
+            tamano (int): Tamaño del archivo.
+
+        Returns:
+            Optional[Tuple[int, int]]: Primer y último byte (inclusive), o None si la
+                cabecera no es válida o pide varios intervalos y se ignora.
+
+        Raises:
+            ValueError: Si el rango no es satisfacible (respuesta 416).
+        """
+        unidad, _, especificacion = rango.partition("=")
+        if unidad.strip().lower() != "bytes" or "," in especificacion:
+            return None
+        inicio, guion, fin = especificacion.strip().partition("-")
+        if not guion or not (inicio.isdigit() or fin.isdigit()):
+            return None
+        if not inicio:
+            sufijo = int(fin)
+            if sufijo == 0 or tamano == 0:
+                raise ValueError("Rango vacío")
+            return max(tamano - sufijo, 0), tamano - 1
+        if fin and not fin.isdigit():
+            return None
+        inicio = int(inicio)
+        fin = min(int(fin), tamano - 1) if fin else tamano - 1
+        if inicio >= tamano or fin < inicio:
+            raise ValueError("Rango fuera del archivo")
+        return inicio, fin
+
+
+def enviar_archivo(salida, fd: int, inicio: int, longitud: int) -> None:
+    """
+    Envía un intervalo de un archivo por la conexión.
+
+    Usa `os.sendfile` cuando la salida es un socket; si no está disponible (otros
+    sistemas, adaptador del motor asyncio) envía desde un `mmap` del archivo.
+
+    Args:
+        salida: Socket de la conexión u objeto con `sendall()`.
+        fd (int): Descriptor del archivo.
+        inicio (int): Desplazamiento del primer byte.
+        longitud (int): Bytes a enviar.
+    """
+    if hasattr(os, "sendfile") and isinstance(salida, socket.socket):
+        try:
+            _enviar_sendfile(salida, fd, inicio, longitud)
+            return
+        except _SinSendfile:
+            pass
+    _enviar_mmap(salida, fd, inicio, longitud)
+
+
+class _SinSendfile(Exception):
+    """El descriptor o el socket no admiten `os.sendfile`."""
+
+
+def _enviar_sendfile(sock: socket.socket, fd: int, inicio: int, longitud: int) -> None:
+    """
+    Transfiere el archivo del kernel al socket con `os.sendfile`, respetando el
+    tiempo de espera del socket.
+
+    Raises:
+        _SinSendfile: Si `os.sendfile` no admite este archivo antes de enviar nada.
+        socket.timeout: Si el cliente no lee en el tiempo de espera del socket.
+    """
+    timeout = sock.gettimeout()
+    desplazamiento, restantes = inicio, longitud
+    while restantes:
+        try:
+            enviados = os.sendfile(sock.fileno(), fd, desplazamiento, min(restantes, BLOQUE_SENDFILE))
+        except BlockingIOError:
+            # Los sockets con timeout son no bloqueantes a nivel del sistema
+            _, escribibles, _ = select.select([], [sock], [], timeout)
+            if not escribibles:
+                raise socket.timeout("Tiempo de envío agotado")
+            continue
+        except OSError as e:
+            if desplazamiento == inicio and e.errno in (errno.EINVAL, errno.ENOSYS, errno.ENOTSOCK):
+                raise _SinSendfile() from e
+            raise
+        if enviados == 0:
+            # El archivo se ha truncado mientras se enviaba
+            raise ConnectionAbortedError("Archivo truncado durante el envío")
+        desplazamiento += enviados
+        restantes -= enviados
+
+
+def _enviar_mmap(salida, fd: int, inicio: int, longitud: int) -> None:
+    """
+    Envía el intervalo desde una proyección en memoria del archivo, sin leerlo a un
+    búfer, en trozos de `BLOQUE_MMAP` bytes para que una salida que copia los datos
+    no tenga el archivo entero en memoria.
+    """
+    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as proyeccion:
+        with memoryview(proyeccion) as vista:
+            for desplazamiento in range(inicio, inicio + longitud, BLOQUE_MMAP):
+                fin = min(desplazamiento + BLOQUE_MMAP, inicio + longitud)
+                with vista[desplazamiento:fin] as trozo:
+                    salida.sendall(trozo)
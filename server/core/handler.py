@@ -1,34 +1,124 @@
+import asyncio
 import json
-import os
-import platform
 import socket
 import threading
 import time
-import uuid
 import base64
+import zlib
 
 import psutil
 from datetime import datetime
-from http import HTTPStatus
 from socketserver import BaseRequestHandler
-from typing import Tuple, Dict, List
+from typing import Dict, Iterable, List, Optional, Union
 
 import plotly.graph_objs as go
 import plotly.offline as pyo
 
-from ..config import logger
-from .recursos import RecursosCompartidos
+from ..config import (
+    ALMACEN_DATOS,
+    COMPRESION_ACTIVA,
+    DIRECTORIO_ACTIVOS,
+    KEEPALIVE_MAX_SOLICITUDES,
+    KEEPALIVE_TIMEOUT,
+    LIMITE_CONSULTA_SOLICITUDES,
+    MAX_AGE_ACTIVOS,
+    MAX_LIMITE_CONSULTA_SOLICITUDES,
+    PREFIJO_ACTIVOS,
+    PREFIJO_ESTATICOS,
+    RAIZ_ESTATICOS,
+    TAMANO_LECTURA,
+    TIMEOUT_LECTURA,
+    logger,
+)
+from .parser import ErrorSolicitud, ParserHTTP, SolicitudHTTP
+from .compresion import (
+    CacheCompresion,
+    comprimir,
+    crear_compresor,
+    es_comprimible,
+    negociar_codificacion,
+)
+from .almacen import crear_almacen
+from .estaticos import ArchivosEstaticos
+from .recursos import RecursosCompartidos, codificar_cursor, decodificar_cursor
+from .respuesta import (
+    CONEXION_CERRAR,
+    FIN_CHUNKED,
+    Cuerpo,
+    cabecera_keepalive,
+    construir_cabeceras,
+    enviar_vectores,
+)
+from .rutas import RegistroRutas
+from .sistema import MonitorSistema
 from ..utils.helpers import (
     generar_html_index,
     generar_html_status,
-    guardar_peticion_en_archivo,
     obtener_info_recursos_compartidos,
     obtener_info_estadisticas_cliente,
+    obtener_historial_resultados,
     generar_html_estadisticas_cliente,
-    generar_html_recursos
+    generar_html_recursos_streaming,
+    generar_json_streaming,
 )
 
 
+# Búfer de lectura de cada hilo trabajador; el parser copia lo que recibe, así que
+# las conexiones (también las aparcadas) no necesitan uno propio
+_buffers_lectura = threading.local()
+
+# Tabla de rutas compartida por todos los manejadores. Otros módulos pueden registrar
+# sus propios endpoints con `@HTTPRequestHandler.rutas.get("/ruta")`.
+rutas = RegistroRutas()
+
+
+def _parametro(parametros: Dict[str, list], nombre: str) -> Optional[str]:
+    """
+    Último valor de un parámetro de la query string, o None si no está.
+    """
+    valores = parametros.get(nombre)
+    return valores[-1] if valores else None
+
+
+def _leer_instante(parametros: Dict[str, list], nombre: str) -> Optional[float]:
+    """
+    Lee un instante de la query string: segundos desde epoch o fecha ISO 8601 (hora
+    local, como los timestamps).
+
+    Returns:
+        float | None: Segundos desde epoch, o None si el parámetro no está.
+
+    Raises:
+        ErrorSolicitud: 400 si el valor no es válido.
+    """
+    valor = _parametro(parametros, nombre)
+    if not valor:
+        return None
+    try:
+        return float(valor)
+    except ValueError:
+        try:
+            return datetime.fromisoformat(valor).timestamp()
+        except ValueError:
+            raise ErrorSolicitud(400, f"Parámetro {nombre} inválido")
+
+
+def _leer_limite(parametros: Dict[str, list]) -> int:
+    """
+    Lee el parámetro `limit` de una consulta paginada.
+
+    Raises:
+        ErrorSolicitud: 400 si no es un entero entre 1 y MAX_LIMITE_CONSULTA_SOLICITUDES.
+    """
+    try:
+        limite = int(_parametro(parametros, "limit") or LIMITE_CONSULTA_SOLICITUDES)
+    except ValueError:
+        raise ErrorSolicitud(400, "Parámetro limit inválido")
+    if not 1 <= limite <= MAX_LIMITE_CONSULTA_SOLICITUDES:
+        raise ErrorSolicitud(400, f"limit debe estar entre 1 y {MAX_LIMITE_CONSULTA_SOLICITUDES}")
+    return limite
+
+
 class HTTPRequestHandler(BaseRequestHandler):
     """
     Manejador de solicitudes HTTP que procesa peticiones concurrentemente.
@@ -39,8 +129,28 @@ class HTTPRequestHandler(BaseRequestHandler):
 
     # Recursos compartidos para todos los manejadores
     recursos = RecursosCompartidos()
-    # Semáforo para limitar el número máximo de conexiones concurrentes
-    semaforo_conexiones = threading.BoundedSemaphore(20)
+    rutas = rutas
+    # Archivos servidos bajo PREFIJO_ESTATICOS
+    estaticos = ArchivosEstaticos(RAIZ_ESTATICOS)
+    # Hoja de estilos y demás archivos propios, con caché de larga duración
+    activos = ArchivosEstaticos(DIRECTORIO_ACTIVOS, max_age=MAX_AGE_ACTIVOS, patron=None)
+    # Caché de cuerpos comprimidos; None desactiva la compresión
+    compresion = CacheCompresion() if COMPRESION_ACTIVA else None
+    # Almacén en disco de los datos recibidos por POST /data
+    almacen = crear_almacen(ALMACEN_DATOS)
+    # Información del sistema para /status y /api/status
+    sistema = MonitorSistema()
+    # Conexiones persistentes (keep-alive)
+    timeout_keepalive = KEEPALIVE_TIMEOUT
+    max_solicitudes_conexion = KEEPALIVE_MAX_SOLICITUDES
+    mantener_conexion = False
+    solicitudes_restantes = 0
+    # Solicitud en curso; None mientras se lee la siguiente (un error de análisis no
+    # debe responderse con las cabeceras de la anterior)
+    solicitud: Optional[SolicitudHTTP] = None
+    # True cuando ya se han enviado las cabeceras de una respuesta por streaming
+    respuesta_iniciada = False
+    _prefijo_keepalive = (None, b"")
 
     @classmethod
     def generar_grafica_recursos(cls) -> str:
@@ -147,224 +257,379 @@ class HTTPRequestHandler(BaseRequestHandler):
 
     def handle(self) -> None:
         """
-        Procesa una solicitud HTTP.
+        Atiende una conexión HTTP persistente.
+
+        Lee solicitudes sucesivas del mismo socket con el parser incremental hasta que
+        el cliente cierra la conexión, se agota el tiempo de inactividad, se alcanza el
+        máximo de solicitudes por conexión o alguna de las partes pide `Connection: close`.
 
-        Controla el acceso concurrente mediante un semáforo, incrementa el contador
-        de solicitudes, registra la solicitud, y dirige la petición al manejador
-        correspondiente según la ruta y el método HTTP.
+        Antes de la primera solicitud y entre solicitudes, si la siguiente no llega en
+        `espera_inactiva()` segundos, la conexión se aparca en el servidor y el trabajador
+        queda libre; cuando llegan datos, otro manejador la retoma con el mismo parser.
         """
-        with self.semaforo_conexiones:
-            # Incrementar contador de solicitudes de forma segura
-            num_solicitud = self.recursos.incrementar_contador()
-            client_address = self.client_address[0]
-            logger.info(f"Conexión desde {client_address} - Solicitud #{num_solicitud}")
+        client_address = self.client_address[0]
+        estado = self.server.retomar_conexion(self.request)
+        parser, atendidas = estado if estado is not None else (ParserHTTP(), 0)
+        # Una conexión retomada ya tiene datos: se lee sin volver a aparcarla
+        retomada = estado is not None
 
+        while True:
+            self.solicitud = None
+            espera = None
+            if not parser.tiene_datos and not retomada:
+                espera = self.server.espera_inactiva()
+                if espera <= 0 and self.aparcar(parser, atendidas):
+                    return
+            retomada = False
             try:
-                # Recibir datos del cliente
-                data = self.request.recv(1024).strip()
-                if not data:
+                solicitud = self.leer_solicitud(parser, inicial=atendidas == 0, espera=espera)
+                if solicitud is None:
                     return
+            except ErrorSolicitud as e:
+                self.mantener_conexion = False
+                self.send_error(e.codigo, e.mensaje)
+                return
+            except socket.timeout:
+                if parser.tiene_datos:
+                    logger.warning(f"Tiempo de lectura agotado para {client_address}")
+                elif espera is not None:
+                    self.aparcar(parser, atendidas)
+                return
+            except OSError as e:
+                logger.debug(f"Conexión con {client_address} interrumpida: {e}")
+                return
 
-                request_text = data.decode('utf-8')
-                method, path, _ = self.parse_request(request_text)
-
-                # Registrar y encolar la solicitud
-                self.recursos.agregar_solicitud_a_cola(request_text)
-                self.recursos.registrar_solicitud(client_address, method, path)
-
-                # Volver a analizar la solicitud para procesar la petición
-                method, path, _ = self.parse_request(request_text)
-
-                if method == "GET":
-                    if path == "/" or path == "/index":
-                        self.handle_index()
-                    elif path == "/status":
-                        self.handle_status()
-                    elif path == "/api/status":
-                        self.handle_api_status()
-                    elif path == "/data":
-                        self.handle_data()
-                    elif path == "/api/data":
-                        self.handle_api_data()
-                    elif path == "/solicitudes":
-                        self.handle_solicitudes()
-                    elif path == "/api/solicitudes":
-                        self.handle_api_solicitudes()
-                    elif path.startswith("/sleep/"):
-                        try:
-                            seconds = int(path.split("/")[2])
-                            self.handle_sleep(seconds)
-                        except (IndexError, ValueError):
-                            self.send_error(400, "Parámetro inválido")
-                    else:
-                        self.send_error(404, "Ruta no encontrada")
-                elif method == "POST" and path == "/data":
-                    self.handle_post_data(request_text)
-                else:
-                    self.send_error(405, "Método no permitido")
-
-            except Exception as e:
-                logger.error(f"Error al procesar solicitud: {str(e)}")
-                self.send_error(500, "Error interno del servidor")
+            atendidas += 1
+            self.mantener_conexion = self.negociar_conexion(solicitud, atendidas)
+            self.solicitudes_restantes = self.max_solicitudes_conexion - atendidas
+
+            self.procesar_solicitud(solicitud)
+
+            if not self.mantener_conexion:
+                return
 
-    def generar_pagina_html(self, titulo: str, contenido: Dict, endpoint: str = None) -> str:
+    def aparcar(self, parser: ParserHTTP, atendidas: int) -> bool:
         """
-        Genera una página HTML con un estilo definido y enlaces a los endpoints.
+        Aparca la conexión inactiva en el servidor hasta su siguiente solicitud.
 
         Args:
-            titulo (str): Título de la página.
-            contenido (Dict): Contenido adicional (usado en el template).
-            endpoint (str, optional): URL para ver el JSON de la información. Defaults to None.
+            parser (ParserHTTP): Parser de la conexión.
+            atendidas (int): Solicitudes atendidas en la conexión.
 
         Returns:
-            str: Página HTML generada.
-        """
-        html_template = f"""
-<!DOCTYPE html>
-<html lang="es">
-<head>
-    <meta charset="UTF-8">
-    <title>{titulo}</title>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: #ecf0f1;
-            margin: 0;
-            padding: 0;
-        }}
-        header {{
-            background: #2c3e50;
-            color: white;
-            padding: 20px;
-            text-align: center;
-        }}
-        .container {{
-            max-width: 900px;
-            margin: 30px auto;
-            padding: 20px;
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 4px 10px rgba(0, 0, 0, 0.1);
-        }}
-        .endpoint {{
-            border-left: 6px solid #3498db;
-            background: #f9f9f9;
-            padding: 15px 20px;
-            margin-bottom: 20px;
-            border-radius: 6px;
-        }}
-        .endpoint h3 {{
-            margin: 0;
-            color: #2980b9;
-        }}
-        .endpoint p {{
-            margin: 5px 0 0;
-            color: #7f8c8d;
-        }}
-        .json-link {{
-            margin-top: 10px;
-            display: inline-block;
-            color: #27ae60;
-            text-decoration: none;
-        }}
-        nav a {{
-            margin-right: 15px;
-            color: #2980b9;
-            text-decoration: none;
-        }}
-        .timestamp {{
-            font-size: 0.9em;
-            color: #999;
-            margin-top: 30px;
-            text-align: right;
-        }}
-    </style>
-</head>
-<body>
-    <header>
-        <h1>🚀 Servidor HTTP Concurrente</h1>
-        <p>Procesamiento rápido y concurrente con Python</p>
-    </header>
-    <div class="container">
-        <h2>{titulo}</h2>
-        <div class="endpoint">
-            <h3>📄 / (Raíz)</h3>
-            <p>Bienvenida al servidor, muestra información general</p>
-        </div>
-        <div class="endpoint">
-            <h3>📊 /status</h3>
-            <p>Estado en tiempo real y métricas del servidor</p>
-        </div>
-        <div class="endpoint">
-            <h3>🔄 /data (GET & POST)</h3>
-            <p>Obtiene o almacena datos estructurados</p>
-        </div>
-        <div class="endpoint">
-            <h3>⏳ /sleep/[segundos]</h3>
-            <p>Simula tiempo de espera para pruebas de concurrencia</p>
-        </div>
-        <div class="endpoint">
-            <h3>🧾 /solicitudes</h3>
-            <p>Lista de solicitudes recibidas por el servidor</p>
-        </div>
-        <div class="endpoint">
-            <h3>🛠 /api/*</h3>
-            <p>Versiones API en JSON para status, data y solicitudes</p>
-        </div>
-        <nav>
-            <a href="/">🏠 Inicio</a>
-            <a href="/status">📊 Estado</a>
-            <a href="/data">📂 Datos</a>
-            <a href="/solicitudes">🧾 Solicitudes</a>
-            {f'<a class="json-link" href="{endpoint}">Ver JSON 📄</a>' if endpoint else ''}
-        </nav>
-        <div class="timestamp">
-            Generado: {datetime.now().isoformat()}
-        </div>
-    </div>
-</body>
-</html>
-"""
-        return html_template
-
-    def parse_request(self, request_text: str) -> Tuple[str, str, str]:
-        """
-        Analiza la solicitud HTTP para extraer el método, la ruta y la versión.
+            bool: True si la conexión se ha aparcado; el manejador debe terminar sin
+                usar más el socket.
+        """
+        return self.server.aparcar_conexion(
+            self.request, self.client_address, (parser, atendidas), self.timeout_keepalive
+        )
+
+    def negociar_conexion(self, solicitud: SolicitudHTTP, atendidas: int) -> bool:
+        """
+        Decide si la conexión puede reutilizarse tras responder a la solicitud.
+
+        HTTP/1.1 es persistente salvo `Connection: close`; HTTP/1.0 solo lo es si el
+        cliente envía `Connection: keep-alive`.
 
         Args:
-            request_text (str): Texto completo de la solicitud.
+            solicitud (SolicitudHTTP): Solicitud que se va a responder.
+            atendidas (int): Número de solicitudes atendidas en la conexión, incluida esta.
 
         Returns:
-            Tuple[str, str, str]: Método HTTP, ruta y versión.
+            bool: True si la conexión debe mantenerse abierta.
+        """
+        if atendidas >= self.max_solicitudes_conexion:
+            return False
+        conexion = solicitud.cabecera("connection", "").lower()
+        if solicitud.version == "HTTP/1.0":
+            return "keep-alive" in conexion
+        return "close" not in conexion
+
+    def procesar_solicitud(self, solicitud: SolicitudHTTP) -> None:
+        """
+        Incrementa el contador, registra la solicitud y la dirige al manejador
+        registrado en la tabla de rutas para su ruta y método HTTP.
+
+        Args:
+            solicitud (SolicitudHTTP): Solicitud ya analizada.
         """
-        request_line = request_text.split('\r\n')[0]
         try:
-            method, path, version = request_line.split()
-            return method, path, version
-        except ValueError:
-            # En caso de error, retornar valores por defecto
-            return "GET", "/", "HTTP/1.1"
+            self.preparar_solicitud(solicitud)
+            self.rutas.despachar(self, solicitud)
+
+        except ErrorSolicitud as e:
+            if self.respuesta_iniciada:
+                self.mantener_conexion = False
+            else:
+                self.send_error(e.codigo, e.mensaje)
+        except Exception as e:
+            logger.error(f"Error al procesar solicitud: {str(e)}")
+            # La respuesta pudo quedar a medias: no reutilizar la conexión
+            self.mantener_conexion = False
+            if not self.respuesta_iniciada:
+                self.send_error(500, "Error interno del servidor")
+
+    def preparar_solicitud(self, solicitud: SolicitudHTTP, puede_esperar: bool = True) -> None:
+        """
+        Incrementa el contador de solicitudes, registra la solicitud y la encola
+        para el procesador de fondo.
 
-    def send_response(self, status_code: int, content_type: str, content: str) -> None:
+        Args:
+            solicitud (SolicitudHTTP): Solicitud ya analizada.
+            puede_esperar (bool): False si el llamante no puede bloquearse esperando sitio
+                en la cola (política "bloquear").
+        """
+        # Incrementar contador de solicitudes (sin locks: un fragmento por hilo)
+        self.recursos.incrementar_contador()
+        client_address = self.client_address[0]
+        logger.info(f"Conexión desde {client_address} - {solicitud.metodo} {solicitud.ruta}")
+
+        self.solicitud = solicitud
+        self.respuesta_iniciada = False
+        # Registrar y encolar la solicitud
+        self.recursos.agregar_solicitud_a_cola(solicitud, puede_esperar)
+        self.recursos.registrar_solicitud(client_address, solicitud.metodo, solicitud.ruta)
+
+    def resolver_asincrono(self, solicitud: SolicitudHTTP):
+        """
+        Devuelve la corrutina nativa que atiende la solicitud en el motor asyncio.
+
+        Solo las rutas que esperan sin consumir CPU (como /sleep) registran versión
+        asíncrona; el resto se ejecuta con `procesar_solicitud` en el pool de hilos.
+        Las rutas asíncronas no pasan por la cadena de middleware.
+
+        Args:
+            solicitud (SolicitudHTTP): Solicitud ya analizada.
+
+        Returns:
+            Optional[Coroutine]: Corrutina que envía la respuesta, o None.
+        """
+        try:
+            destino, parametros = self.rutas.resolver(solicitud.metodo, solicitud.ruta)
+        except ErrorSolicitud:
+            return None
+        if destino.asincrona is None:
+            return None
+        return destino.asincrona(self, **parametros)
+
+    @classmethod
+    def para_conexion(cls, request, client_address, server) -> "HTTPRequestHandler":
+        """
+        Crea un manejador asociado a una conexión sin atenderla.
+
+        Lo utilizan los motores que gestionan su propio bucle de lectura (asyncio),
+        ya que `BaseRequestHandler.__init__` llama directamente a `handle()`.
+
+        Args:
+            request: Objeto con `sendall()` por el que se envían las respuestas.
+            client_address (tuple): Dirección del cliente.
+            server: Servidor que atiende la conexión.
+
+        Returns:
+            HTTPRequestHandler: Manejador listo para `procesar_solicitud()`.
+        """
+        handler = cls.__new__(cls)
+        handler.request = request
+        handler.client_address = client_address
+        handler.server = server
+        return handler
+
+    def leer_solicitud(self, parser: ParserHTTP, inicial: bool = True,
+                       espera: Optional[float] = None) -> Optional[SolicitudHTTP]:
+        """
+        Lee del socket hasta disponer de una solicitud completa.
+
+        Usa el búfer de lectura del hilo y entrega los bytes al parser incremental, que
+        los copia y respeta Content-Length para no truncar cuerpos grandes. Mientras no
+        se ha recibido ningún byte de la solicitud se aplica `espera` o, si no se indica,
+        el tiempo de inactividad de keep-alive (el de lectura en la primera solicitud);
+        una vez empezada, el tiempo de lectura.
+
+        Args:
+            parser (ParserHTTP): Parser asociado a la conexión.
+            inicial (bool): True si es la primera solicitud de la conexión.
+            espera (float, optional): Segundos de inactividad antes de `socket.timeout`
+                mientras no llega ningún byte de la solicitud.
+
+        Returns:
+            Optional[SolicitudHTTP]: La solicitud leída, o None si el cliente cerró la conexión.
+        """
+        vista = getattr(_buffers_lectura, "vista", None)
+        if vista is None:
+            vista = _buffers_lectura.vista = memoryview(bytearray(TAMANO_LECTURA))
+        while True:
+            solicitud = parser.siguiente()
+            if solicitud is not None:
+                return solicitud
+            if parser.espera_continuar:
+                self.request.sendall(b"HTTP/1.1 100 Continue\r\n\r\n")
+                parser.espera_continuar = False
+
+            if parser.tiene_datos:
+                self.request.settimeout(TIMEOUT_LECTURA)
+            elif espera is not None:
+                self.request.settimeout(espera)
+            else:
+                self.request.settimeout(TIMEOUT_LECTURA if inicial else self.timeout_keepalive)
+            leidos = self.request.recv_into(vista)
+            if not leidos:
+                if parser.tiene_datos:
+                    logger.warning("Conexión cerrada con una solicitud incompleta")
+                return None
+            parser.alimentar(vista[:leidos])
+
+    def send_response(self, status_code: int, content_type: str, content: Union[str, Cuerpo],
+                      cabeceras: Dict[str, str] = None, cacheable: bool = False) -> None:
         """
         Envía una respuesta HTTP al cliente.
 
+        El cuerpo se envía tal cual si ya son bytes; las cabeceras se construyen a partir
+        de bloques precalculados y salen junto al cuerpo con una sola llamada `sendmsg`,
+        sin concatenarlos.
+
+        Args:
+            status_code (int): Código de estado HTTP.
+            content_type (str): Tipo de contenido de la respuesta.
+            content (str | bytes | memoryview): Contenido del mensaje. Un `str` se codifica en UTF-8.
+            cabeceras (Dict[str, str], optional): Cabeceras adicionales.
+            cacheable (bool): True si el mismo cuerpo se repite entre solicitudes y su
+                versión comprimida merece guardarse en la caché de compresión.
+        """
+        # Content-Length debe contar bytes: con keep-alive un valor erróneo corrompe
+        # la siguiente respuesta de la conexión
+        cuerpo = content.encode() if isinstance(content, str) else content
+        cuerpo, cabeceras = self.comprimir_cuerpo(content_type, cuerpo, cabeceras, cacheable)
+        encabezado = self.cabeceras_respuesta(
+            status_code, content_type, memoryview(cuerpo).nbytes, cabeceras
+        )
+        enviar_vectores(self.request, (encabezado, cuerpo))
+
+    def comprimir_cuerpo(self, content_type: str, cuerpo: Cuerpo,
+                         cabeceras: Optional[Dict[str, str]], cacheable: bool = False):
+        """
+        Comprime el cuerpo con gzip o deflate si el cliente lo admite y el contenido
+        es textual y supera el tamaño mínimo.
+
+        Los cuerpos dinámicos se comprimen directamente; solo los marcados como
+        `cacheable` pasan por la caché de compresión.
+
+        Args:
+            content_type (str): Tipo de contenido de la respuesta.
+            cuerpo (bytes | memoryview): Cuerpo sin comprimir.
+            cabeceras (Dict[str, str], optional): Cabeceras adicionales de la respuesta.
+            cacheable (bool): True si el cuerpo se repite entre solicitudes.
+
+        Returns:
+            tuple: Cuerpo a enviar y cabeceras adicionales, con `Content-Encoding` y
+                `Vary` cuando corresponda.
+        """
+        if self.compresion is None or not es_comprimible(content_type, memoryview(cuerpo).nbytes):
+            return cuerpo, cabeceras
+        cabeceras = dict(cabeceras or {}, Vary="Accept-Encoding")
+        if self.solicitud is None:
+            return cuerpo, cabeceras
+        codificacion = negociar_codificacion(self.solicitud.cabecera("accept-encoding"))
+        if codificacion is None:
+            return cuerpo, cabeceras
+        cabeceras["Content-Encoding"] = codificacion
+        if cacheable:
+            return self.compresion.comprimir(cuerpo, codificacion), cabeceras
+        return comprimir(cuerpo, codificacion, self.compresion.nivel), cabeceras
+
+    def send_chunked(self, status_code: int, content_type: str, partes: Iterable[Cuerpo],
+                     cabeceras: Dict[str, str] = None) -> None:
+        """
+        Envía una respuesta cuyo cuerpo se genera por partes, sin tenerlo entero en memoria.
+
+        Cada parte producida por el generador se envía en cuanto está disponible como un
+        trozo de `Transfer-Encoding: chunked` (comprimido de forma incremental si el
+        cliente lo admite). Con clientes HTTP/1.0 el cuerpo se delimita cerrando la conexión.
+
         Args:
             status_code (int): Código de estado HTTP.
             content_type (str): Tipo de contenido de la respuesta.
-            content (str): Contenido del mensaje.
-        """
-        status_message = HTTPStatus(status_code).phrase
-        headers = [
-            f"HTTP/1.1 {status_code} {status_message}",
-            f"Content-Type: {content_type}",
-            f"Content-Length: {len(content)}",
-            "Server: PythonConcurrentServer/1.0",
-            "Connection: close",
-            "\r\n",
-        ]
-        response = "\r\n".join(headers) + content
-        self.request.sendall(response.encode())
+            partes (Iterable[bytes]): Generador de las partes del cuerpo.
+            cabeceras (Dict[str, str], optional): Cabeceras adicionales.
+        """
+        cabeceras = dict(cabeceras or {})
+        compresor = None
+        if self.compresion is not None and es_comprimible(content_type, None):
+            cabeceras["Vary"] = "Accept-Encoding"
+            codificacion = negociar_codificacion(self.solicitud.cabecera("accept-encoding"))
+            if codificacion is not None:
+                cabeceras["Content-Encoding"] = codificacion
+                compresor = crear_compresor(codificacion)
+
+        fragmentado = self.solicitud.version != "HTTP/1.0"
+        if fragmentado:
+            cabeceras["Transfer-Encoding"] = "chunked"
+        else:
+            self.mantener_conexion = False
+
+        # Las cabeceras salen junto con la primera parte
+        pendiente = self.cabeceras_respuesta(status_code, content_type, None, cabeceras)
+        self.respuesta_iniciada = True
+        for parte in partes:
+            if compresor is not None:
+                parte = compresor.compress(parte) + compresor.flush(zlib.Z_SYNC_FLUSH)
+            if not len(parte):
+                continue
+            self._enviar_trozo(pendiente, parte, fragmentado)
+            pendiente = b""
+        final = compresor.flush() if compresor is not None else b""
+        if final:
+            self._enviar_trozo(pendiente, final, fragmentado)
+            pendiente = b""
+        enviar_vectores(self.request, (pendiente, FIN_CHUNKED if fragmentado else b""))
+
+    def _enviar_trozo(self, pendiente: bytes, parte: Cuerpo, fragmentado: bool) -> None:
+        """
+        Envía una parte del cuerpo, con el marco de chunked si corresponde.
+
+        Args:
+            pendiente (bytes): Datos aún no enviados que deben precederla (cabeceras).
+            parte (bytes): Parte del cuerpo.
+            fragmentado (bool): True para enmarcarla como trozo chunked.
+        """
+        if fragmentado:
+            tamano = b"%x\r\n" % memoryview(parte).nbytes
+            enviar_vectores(self.request, (pendiente, tamano, parte, b"\r\n"))
+        else:
+            enviar_vectores(self.request, (pendiente, parte))
+
+    def cabeceras_respuesta(self, status_code: int, content_type: Optional[str],
+                            longitud: Optional[int], cabeceras: Dict[str, str] = None) -> bytes:
+        """
+        Construye la línea de estado y las cabeceras de una respuesta, incluidas las
+        de conexión persistente.
+
+        Args:
+            status_code (int): Código de estado HTTP.
+            content_type (str, optional): Tipo de contenido; None si no hay cuerpo.
+            longitud (int, optional): Longitud del cuerpo en bytes; None si no hay cuerpo.
+            cabeceras (Dict[str, str], optional): Cabeceras adicionales.
+
+        Returns:
+            bytes: Bloque de cabeceras terminado en una línea vacía.
+        """
+        if self.mantener_conexion:
+            conexion = b"%s%d\r\n" % (self.prefijo_keepalive(), self.solicitudes_restantes)
+        else:
+            conexion = CONEXION_CERRAR
+        return construir_cabeceras(status_code, content_type, longitud, conexion, cabeceras)
+
+    @classmethod
+    def prefijo_keepalive(cls) -> bytes:
+        """
+        Retorna las cabeceras de conexión persistente precalculadas para el tiempo de
+        inactividad configurado.
+
+        Returns:
+            bytes: Cabeceras `Connection` y `Keep-Alive` hasta `max=`.
+        """
+        if cls._prefijo_keepalive[0] != cls.timeout_keepalive:
+            cls._prefijo_keepalive = (cls.timeout_keepalive, cabecera_keepalive(cls.timeout_keepalive))
+        return cls._prefijo_keepalive[1]
 
     def send_error(self, status_code: int, mensaje: str) -> None:
         """
@@ -377,158 +642,116 @@ class HTTPRequestHandler(BaseRequestHandler):
         error_data = json.dumps({"error": mensaje, "code": status_code})
         self.send_response(status_code, "application/json", error_data)
 
+    @rutas.get("/")
+    @rutas.get("/index")
     def handle_index(self) -> None:
         """
         Maneja la ruta raíz del servidor.
         """
-        contenido = {
-            "mensaje": "Servidor HTTP Concurrente en Python",
-            "endpoints": [
-                {"ruta": "/", "descripcion": "Información del servidor"},
-                {"ruta": "/status", "descripcion": "Estado y estadísticas del servidor"},
-                {"ruta": "/data", "descripcion": "Acceso a datos (GET/POST)"},
-                {"ruta": "/sleep/{seconds}", "descripcion": "Simula carga con espera"},
-                {"ruta": "/api/status", "descripcion": "Status en formato JSON"},
-                {"ruta": "/api/data", "descripcion": "Datos en formato JSON"},
-                {"ruta": "/api/solicitudes", "descripcion": "Lista de solicitudes realizadas"},
-            ],
-            "timestamp": datetime.now().isoformat(),
-        }
-        html = generar_html_index("Servidor HTTP Concurrente", contenido)
-        self.send_response(200, "text/html", html)
+        html = generar_html_index("Servidor HTTP Concurrente")
+        self.send_response(200, "text/html; charset=utf-8", html)
 
-    def handle_status(self) -> None:
+    def obtener_estado(self) -> Dict:
         """
-        Maneja la ruta /status mostrando información detallada del servidor.
-        """
-        try:
-            # Obtener estadísticas generales
-            stats = self.recursos.obtener_stats()
-
-            # Información del sistema
-            system_info = {
-                "sistema_operativo": platform.platform(),
-                "nombre_host": socket.gethostname(),
-                "arquitectura": platform.machine(),
-                "version_python": platform.python_version(),
-                "timestamp": datetime.now().isoformat(),
-                "uuid_servidor": str(uuid.uuid4()),
-            }
-
-            # Información de threads y procesos
-            thread_info = {
-                "thread_actual": threading.current_thread().name,
-                "threads_activos": threading.active_count(),
-                "threads_daemon": sum(1 for t in threading.enumerate() if t.daemon),
-                "proceso_pid": os.getpid(),
-            }
+        Reúne la información de /status y /api/status. La del sistema sale del monitor
+        (`MonitorSistema`): la fija se calculó al arrancar y la variable es la última
+        muestra del hilo de fondo, así que aquí no se consulta `psutil`.
 
-            # Recursos del sistema
-            recursos_sistema = {
-                "cpu_cores": psutil.cpu_count(),
-                "cpu_frecuencia": f"{psutil.cpu_freq().current:.2f} MHz",
-                "memoria_total": f"{psutil.virtual_memory().total / (1024**3):.2f} GB",
-                "memoria_disponible": f"{psutil.virtual_memory().available / (1024**3):.2f} GB",
-                "memoria_porcentaje": f"{psutil.virtual_memory().percent}%",
-            }
-
-            servidor_info = {
+        Returns:
+            Dict: Estadísticas, sistema, threads, servidor y recursos.
+        """
+        muestra = self.sistema.muestra()
+        return {
+            "estadisticas": self.recursos.obtener_stats(),
+            "sistema": {**self.sistema.sistema, "timestamp": datetime.now().isoformat()},
+            "threads": {"thread_actual": threading.current_thread().name, **muestra.threads},
+            "server": {
                 "ip_servidor": self.server.server_address[0],
                 "puerto_servidor": self.server.server_address[1],
                 "clase_servidor": self.server.__class__.__name__,
                 "tipo_handler": self.__class__.__name__,
-            }
+                "pool": self.server.obtener_stats_pool(),
+            },
+            "recursos": {**muestra.recursos, "muestra": datetime.fromtimestamp(muestra.marca).isoformat()},
+        }
+
+    @rutas.get("/status")
+    def handle_status(self) -> None:
+        """
+        Maneja la ruta /status mostrando información detallada del servidor.
+        """
+        try:
+            estado = self.obtener_estado()
 
             # Generar página HTML con información del servidor
             html = generar_html_status(
                 "Estado Detallado del Servidor",
-                stats,
-                system_info,
-                thread_info,
-                servidor_info,
-                recursos_sistema,
+                estado["estadisticas"],
+                estado["sistema"],
+                estado["threads"],
+                estado["server"],
+                estado["recursos"],
                 "/api/status",
             )
-            self.send_response(200, "text/html", html)
+            self.send_response(200, "text/html; charset=utf-8", html)
 
         except Exception as e:
             logger.error(f"Error en handle_status: {e}")
             self.send_error(500, f"Error interno: {e}")
 
+    @rutas.get("/api/status")
     def handle_api_status(self) -> None:
         """
         Maneja la ruta /api/status devolviendo información en formato JSON.
         """
-        stats = self.recursos.obtener_stats()
-
-        system_info = {
-            "sistema_operativo": platform.platform(),
-            "nombre_host": socket.gethostname(),
-            "arquitectura": platform.machine(),
-            "version_python": platform.python_version(),
-            "timestamp": datetime.now().isoformat(),
-            "uuid_servidor": str(uuid.uuid4()),
-        }
-
-        thread_info = {
-            "thread_actual": threading.current_thread().name,
-            "threads_activos": threading.active_count(),
-            "threads_daemon": sum(1 for t in threading.enumerate() if t.daemon),
-            "proceso_pid": os.getpid(),
-        }
-
-        recursos_sistema = {
-            "cpu_cores": psutil.cpu_count(),
-            "cpu_frecuencia": f"{psutil.cpu_freq().current:.2f} MHz",
-            "memoria_total": f"{psutil.virtual_memory().total / (1024**3):.2f} GB",
-            "memoria_disponible": f"{psutil.virtual_memory().available / (1024**3):.2f} GB",
-            "memoria_porcentaje": f"{psutil.virtual_memory().percent}%",
-        }
-
-        servidor_info = {
-            "ip_servidor": self.server.server_address[0],
-            "puerto_servidor": self.server.server_address[1],
-            "clase_servidor": self.server.__class__.__name__,
-            "tipo_handler": self.__class__.__name__,
-        }
-
         contenido = {
             "servidor": "Servidor HTTP Concurrente en Python",
             "estado": "activo",
-            "estadisticas": stats,
-            "sistema": system_info,
-            "threads": thread_info,
-            "server": servidor_info,
-            "recursos": recursos_sistema,
+            **self.obtener_estado(),
         }
         self.send_response(200, "application/json", json.dumps(contenido, indent=2))
 
+    @rutas.post("/api/procesador")
+    def handle_post_procesador(self) -> None:
+        """
+        Maneja la ruta POST /api/procesador, que cambia en caliente el número de hilos
+        consumidores de la cola de fondo. Cuerpo: `{"consumidores": N}`.
+        """
+        procesador = self.recursos.procesador
+        if procesador is None:
+            raise ErrorSolicitud(503, "El procesador de la cola no está en marcha")
+        try:
+            consumidores = int(json.loads(self.solicitud.cuerpo or b"{}")["consumidores"])
+            procesador.redimensionar(consumidores)
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            raise ErrorSolicitud(400, f"Solicitud inválida: {e}")
+        self.send_response(200, "application/json", json.dumps(procesador.obtener_stats(), indent=2))
+
+    @rutas.get("/data")
     def handle_data(self) -> None:
         """
         Maneja la ruta /data mostrando estadísticas de datos almacenados en HTML.
         """
         try:
             html = generar_html_estadisticas_cliente("Datos Almacenados", carpeta_data="./data")
-            self.send_response(200, "text/html", html)
+            self.send_response(200, "text/html; charset=utf-8", html)
         except Exception as e:
             self.send_error(500, f"Error generando HTML de estadísticas: {e}")
 
-    def handle_post_data(self, request_text: str) -> None:
+    @rutas.post("/data")
+    def handle_post_data(self) -> None:
         """
         Maneja la ruta POST /data para almacenar datos enviados en formato JSON.
-
-        Args:
-            request_text (str): Texto completo de la solicitud HTTP.
         """
         try:
-            headers, _, body = request_text.partition('\r\n\r\n')
+            body = self.solicitud.cuerpo
             if not body:
                 self.send_error(400, "Cuerpo de solicitud vacío")
                 return
 
             data = json.loads(body)
             data["timestamp"] = datetime.now().isoformat()
-            data["id"] = self.recursos.incrementar_contador()
+            data["id"] = self.recursos.generar_id()
 
             self.recursos.agregar_dato(data)
 
@@ -545,7 +768,7 @@ class HTTPRequestHandler(BaseRequestHandler):
                 "data": data,
             }
 
-            guardar_peticion_en_archivo(peticion_archivo)
+            self.almacen.agregar(peticion_archivo)
             self.send_response(201, "application/json", respuesta)
 
         except json.JSONDecodeError:
@@ -554,6 +777,7 @@ class HTTPRequestHandler(BaseRequestHandler):
             logger.error(f"Error al procesar POST /data: {str(e)}")
             self.send_error(500, "Error interno al procesar los datos")
 
+    @rutas.get("/sleep/<int:seconds>")
     def handle_sleep(self, seconds: int) -> None:
         """
         Maneja la ruta /sleep/{seconds} para simular una carga con una espera determinada.
@@ -564,18 +788,153 @@ class HTTPRequestHandler(BaseRequestHandler):
         seconds = min(seconds, 10)
         logger.info(f"Thread {threading.current_thread().name} durmiendo por {seconds}s")
         time.sleep(seconds)
-        content = json.dumps({
+        self.send_response(200, "application/json", self._contenido_sleep(seconds))
+
+    @rutas.get("/sleep/<int:seconds>", asincrona=True)
+    async def handle_sleep_async(self, seconds: int) -> None:
+        """
+        Versión para el motor asyncio de /sleep/{seconds}: espera con `asyncio.sleep`
+        sin ocupar ningún hilo.
+
+        Args:
+            seconds (int): Número de segundos a esperar (máximo 10).
+        """
+        seconds = min(seconds, 10)
+        await asyncio.sleep(seconds)
+        self.send_response(200, "application/json", self._contenido_sleep(seconds))
+
+    def _contenido_sleep(self, seconds: int) -> str:
+        """
+        Genera el JSON de respuesta de /sleep/{seconds}.
+
+        Args:
+            seconds (int): Segundos esperados.
+
+        Returns:
+            str: Contenido JSON.
+        """
+        return json.dumps({
             "mensaje": f"El servidor esperó {seconds} segundos",
             "thread": threading.current_thread().name,
             "timestamp": datetime.now().isoformat(),
         })
-        self.send_response(200, "application/json", content)
 
+    @rutas.ruta(f"{PREFIJO_ESTATICOS}/<path:archivo>", ("GET", "HEAD"))
+    def handle_archivo(self, archivo: str) -> None:
+        """
+        Maneja la ruta de archivos estáticos, sirviendo el archivo indicado desde el
+        directorio raíz configurado (por defecto, los resultados de `data/`).
+
+        Args:
+            archivo (str): Ruta del archivo relativa a la raíz.
+        """
+        self.estaticos.servir(self, archivo)
+
+    @rutas.ruta(f"{PREFIJO_ACTIVOS}/<path:archivo>", ("GET", "HEAD"))
+    def handle_activo(self, archivo: str) -> None:
+        """
+        Maneja la ruta de los archivos propios del servidor (hoja de estilos común de
+        las páginas HTML). Las páginas enlazan una URL versionada con el hash del
+        contenido, por lo que se sirven con `Cache-Control` de larga duración.
+
+        Args:
+            archivo (str): Ruta del archivo relativa a `server/static`.
+        """
+        self.activos.servir(self, archivo)
+
+    @rutas.get("/api/data")
     def handle_api_data(self) -> None:
         """
         Maneja la ruta /api/data devolviendo los datos almacenados en formato JSON.
         """
         contenido = obtener_info_estadisticas_cliente()
+        # Lleva la hora de generación: no se guarda en la caché de compresión
+        self.send_response(200, "application/json", json.dumps(contenido, indent=2))
+
+    @rutas.get("/api/data/historial")
+    def handle_api_data_historial(self) -> None:
+        """
+        Maneja la ruta /api/data/historial?tipo=&desde=&limit= devolviendo las series de
+        tendencia (rendimiento, percentiles, errores...) de las pruebas de `client.py`.
+
+        Raises:
+            ErrorSolicitud: 400 si algún parámetro no es válido.
+        """
+        parametros = self.solicitud.parametros
+        contenido = obtener_historial_resultados(
+            _parametro(parametros, "tipo"),
+            _leer_instante(parametros, "desde"),
+            _leer_limite(parametros),
+        )
+        self.send_response(200, "application/json", json.dumps(contenido), cacheable=True)
+
+    @rutas.get("/api/data/<int:id_dato>")
+    def handle_api_data_id(self, id_dato: int) -> None:
+        """
+        Maneja la ruta /api/data/{id} devolviendo un dato guardado por POST /data, leído
+        del almacén sin cargar el resto.
+
+        Args:
+            id_dato (int): Identificador retornado por POST /data.
+
+        Raises:
+            ErrorSolicitud: 404 si no hay ningún dato con ese identificador.
+        """
+        registro = self.almacen.leer(id_dato)
+        if registro is None:
+            raise ErrorSolicitud(404, "Dato no encontrado")
+        self.send_response(200, "application/json", registro)
+
+    @rutas.get("/api/datos")
+    def handle_api_datos(self) -> None:
+        """
+        Maneja la ruta /api/datos?desde=&hasta=&limit= devolviendo los datos guardados por
+        POST /data con `timestamp` en `[desde, hasta)`, del más antiguo al más reciente.
+
+        Raises:
+            ErrorSolicitud: 400 si algún parámetro no es válido y 501 si el almacén no
+                admite consultas por fecha.
+        """
+        if not self.almacen.admite_consultas:
+            raise ErrorSolicitud(501, "Las consultas de datos requieren el almacén sqlite")
+        parametros = self.solicitud.parametros
+        datos = self.almacen.consultar(
+            _leer_instante(parametros, "desde"),
+            _leer_instante(parametros, "hasta"),
+            _leer_limite(parametros),
+        )
+        # Los registros ya son JSON: se unen sin volver a serializarlos
+        contenido = f'{{"datos": [{", ".join(datos)}], "cantidad": {len(datos)}}}'
+        self.send_response(200, "application/json", contenido)
+
+    def responder_consulta_solicitudes(self, parametros: Dict[str, list]) -> None:
+        """
+        Responde a una consulta filtrada y paginada del registro de solicitudes.
+
+        Args:
+            parametros (Dict[str, list]): Parámetros de la query string.
+
+        Raises:
+            ErrorSolicitud: 400 si algún parámetro no es válido.
+        """
+        filtros = {
+            campo: _parametro(parametros, nombre)
+            for nombre, campo in (("ip", "ip"), ("metodo", "metodo"), ("ruta", "ruta"))
+            if _parametro(parametros, nombre)
+        }
+        if "metodo" in filtros:
+            filtros["metodo"] = filtros["metodo"].upper()
+
+        desde = _leer_instante(parametros, "since")
+        limite = _leer_limite(parametros)
+        cursor = _parametro(parametros, "cursor")
+        posicion = decodificar_cursor(cursor) if cursor else 0
+        solicitudes, siguiente = self.recursos.consultar_solicitudes(filtros, desde, posicion, limite)
+        contenido = {
+            "solicitudes_realizadas": solicitudes,
+            "cantidad": len(solicitudes),
+            "cursor": codificar_cursor(siguiente) if siguiente is not None else None,
+        }
         self.send_response(200, "application/json", json.dumps(contenido, indent=2))
 
     def resolver_ip(self, ip: str) -> Dict[str, str]:
@@ -603,23 +962,43 @@ class HTTPRequestHandler(BaseRequestHandler):
             logger.error(f"Error resolviendo IP {ip}: {e}")
             return {"error": "No se pudo resolver"}
 
+    @rutas.get("/solicitudes")
     def handle_solicitudes(self) -> None:
         """
         Maneja la ruta /solicitudes mostrando información detallada de las solicitudes realizadas.
         """
         try:
-            contenido = obtener_info_recursos_compartidos(self.recursos)
-            html = generar_html_recursos("Detalle de Recursos Compartidos", contenido)
-            self.send_response(200, "text/html", html)
+            contenido = obtener_info_recursos_compartidos(self.recursos, incluir_solicitudes=False)
+            partes = generar_html_recursos_streaming(
+                "Detalle de Recursos Compartidos",
+                contenido,
+                self.recursos.total_solicitudes_registradas(),
+                self.recursos.iterar_solicitudes(),
+            )
+            self.send_chunked(200, "text/html; charset=utf-8", partes)
 
         except Exception as e:
             logger.error(f"Error en handle_solicitudes: {e}")
+            if self.respuesta_iniciada:
+                # Las cabeceras ya salieron: solo queda cortar la conexión
+                raise
             self.send_error(500, f"Error interno: {e}")
 
+    @rutas.get("/api/solicitudes")
     def handle_api_solicitudes(self) -> None:
         """
         Maneja la ruta /api/solicitudes devolviendo la lista de solicitudes en formato JSON.
+
+        Sin parámetros devuelve el registro completo. Con `ip`, `metodo`, `ruta`, `since`,
+        `limit` o `cursor` en la query string devuelve una página de resultados filtrados
+        y el cursor de la página siguiente.
         """
-        contenido = obtener_info_recursos_compartidos(self.recursos)
+        if self.solicitud.query:
+            self.responder_consulta_solicitudes(self.solicitud.parametros)
+            return
 
-        self.send_response(200, "application/json", json.dumps(contenido, indent=2))
+        contenido = obtener_info_recursos_compartidos(self.recursos, incluir_solicitudes=False)
+        partes = generar_json_streaming(
+            contenido, "solicitudes_realizadas", self.recursos.iterar_solicitudes()
+        )
+        self.send_chunked(200, "application/json", partes)
@@ -1,30 +1,378 @@
+import collections
+import json
+import queue
+import selectors
+import socket
 import socketserver
-from ..config import logger
+import threading
+import time
+from typing import Deque, Dict, List, Optional, Tuple
 
+from ..config import (
+    COLA_CONEXIONES,
+    ESPERA_CIERRE_TRABAJADORES,
+    ESPERA_KEEPALIVE_EN_HILO,
+    HILOS_POOL,
+    RETRY_AFTER,
+    logger,
+)
+from ..utils.resultados import detener_caches_resultados
 
-class ThreadingHTTPServer(socketserver.ThreadingTCPServer):
+
+def _respuesta_saturado(retry_after: int) -> bytes:
+    """
+    Construye la respuesta 503 que se envía cuando la cola de conexiones está llena.
+
+    Args:
+        retry_after (int): Segundos que el cliente debería esperar antes de reintentar.
+
+    Returns:
+        bytes: Respuesta HTTP completa.
     """
-    Servidor HTTP concurrente basado en ThreadingTCPServer.
+    cuerpo = json.dumps({"error": "Servidor saturado, reintente más tarde", "code": 503}).encode()
+    cabeceras = (
+        "HTTP/1.1 503 Service Unavailable\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(cuerpo)}\r\n"
+        f"Retry-After: {retry_after}\r\n"
+        "Server: PythonConcurrentServer/1.0\r\n"
+        "Connection: close\r\n"
+        "\r\n"
+    )
+    return cabeceras.encode() + cuerpo
 
+
+class ThreadingHTTPServer(socketserver.TCPServer):
+    """
+    Servidor HTTP concurrente con un pool fijo de hilos trabajadores.
+
+    El hilo de `serve_forever()` acepta conexiones y las deposita en una cola acotada;
+    un número fijo de trabajadores las atiende. Si la cola está llena, la conexión se
+    rechaza al instante con un `503` y `Retry-After` en lugar de acumular hilos bloqueados.
     Permite reutilizar la dirección y configura el manejo de errores de las solicitudes.
+
+    Una conexión keep-alive inactiva no retiene a su trabajador: tras una espera breve
+    (`espera_inactiva`) el manejador la aparca (`aparcar_conexion`) y el trabajador
+    queda libre. Un único hilo vigila las conexiones aparcadas con un `selector` y
+    vuelve a encolar cada una cuando llega su siguiente solicitud, o la cierra al
+    agotarse su tiempo de inactividad. Si la cola está llena en ese momento, la
+    conexión espera en el hilo vigilante a que haya sitio en lugar de recibir un `503`
+    a mitad de sesión.
     """
 
     allow_reuse_address = True
-    daemon_threads = False
+    request_queue_size = 128
 
-    def __init__(self, server_address, RequestHandlerClass, bind_and_activate=True):
+    def __init__(self, server_address, RequestHandlerClass, bind_and_activate=True,
+                 hilos: int = HILOS_POOL, profundidad_cola: int = COLA_CONEXIONES,
+                 socket_escucha=None, espera_cierre: float = ESPERA_CIERRE_TRABAJADORES):
         """
-        Inicializa el servidor y muestra mensajes de inicio.
+        Inicializa el servidor, arranca el pool de trabajadores y muestra mensajes de inicio.
 
         Args:
             server_address (tuple): Tupla con (host, puerto) donde el servidor escuchará.
             RequestHandlerClass: Clase encargada de procesar las solicitudes entrantes.
             bind_and_activate (bool): Si True, enlaza y activa el servidor automáticamente.
+            hilos (int): Número de hilos trabajadores del pool.
+            profundidad_cola (int): Conexiones aceptadas que pueden esperar a un trabajador.
+            socket_escucha (socket.socket, optional): Socket ya enlazado y en escucha
+                (modo multiproceso). Si se indica, no se crea uno nuevo.
+            espera_cierre (float): Segundos que `server_close` espera a los trabajadores.
         """
-        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+        super().__init__(
+            server_address, RequestHandlerClass,
+            bind_and_activate and socket_escucha is None,
+        )
+        if socket_escucha is not None:
+            self.socket.close()
+            self.socket = socket_escucha
+            self.server_address = socket_escucha.getsockname()[:2]
+        self.hilos = hilos
+        self.espera_cierre = espera_cierre
+        self.cola_conexiones = queue.Queue(maxsize=profundidad_cola)
+        self.conexiones_rechazadas = 0
+        self.conexiones_aparcadas = 0
+        self._ocupados = 0
+        self._lock_ocupados = threading.Lock()
+        self._respuesta_saturado = _respuesta_saturado(RETRY_AFTER)
+        # Conexiones keep-alive aparcadas: las nuevas esperan en `_por_aparcar` hasta
+        # que el hilo vigilante las registra en su selector
+        self._local = threading.local()
+        self._estados_conexion: Dict[socket.socket, tuple] = {}
+        self._por_aparcar: List[tuple] = []
+        self._lock_aparcadas = threading.Lock()
+        self._cerrando = False
+        self._despertador = socket.socketpair()
+        for extremo in self._despertador:
+            extremo.setblocking(False)
+        self._vigilante = threading.Thread(target=self._vigilar_aparcadas,
+                                           name="HTTPKeepAlive", daemon=True)
+        self._vigilante.start()
+        self._trabajadores = [
+            threading.Thread(target=self._trabajador, name=f"HTTPWorker-{i}", daemon=True)
+            for i in range(hilos)
+        ]
+        for trabajador in self._trabajadores:
+            trabajador.start()
         logger.info(f"Servidor iniciado en {server_address[0]}:{server_address[1]}")
+        logger.info(f"Pool de {hilos} hilos, cola de {profundidad_cola} conexiones")
         logger.info("Presione Ctrl+C para detener el servidor")
 
+    def process_request(self, request, client_address):
+        """
+        Encola la conexión aceptada para el pool o la rechaza si la cola está llena.
+
+        Args:
+            request: Socket de la conexión aceptada.
+            client_address: Dirección del cliente.
+        """
+        try:
+            self.cola_conexiones.put_nowait((request, client_address))
+        except queue.Full:
+            self.rechazar_conexion(request, client_address)
+
+    def rechazar_conexion(self, request, client_address) -> None:
+        """
+        Responde `503 Service Unavailable` y cierra la conexión sin ocupar un trabajador.
+
+        Args:
+            request: Socket de la conexión aceptada.
+            client_address: Dirección del cliente.
+        """
+        # Se llama desde el hilo que acepta conexiones y desde el vigilante
+        with self._lock_ocupados:
+            self.conexiones_rechazadas += 1
+        self._estados_conexion.pop(request, None)
+        logger.warning(f"Cola de conexiones llena, rechazando {client_address[0]} con 503")
+        try:
+            request.settimeout(0)
+            request.sendall(self._respuesta_saturado)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def _trabajador(self) -> None:
+        """
+        Bucle de un hilo del pool: atiende conexiones de la cola hasta recibir None.
+        """
+        while True:
+            elemento = self.cola_conexiones.get()
+            if elemento is None:
+                break
+            request, client_address = elemento
+            with self._lock_ocupados:
+                self._ocupados += 1
+            self._local.aparcada = False
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                # Una conexión aparcada sigue abierta: ya la tiene el hilo vigilante
+                if not self._local.aparcada:
+                    self._estados_conexion.pop(request, None)
+                    self.shutdown_request(request)
+                with self._lock_ocupados:
+                    self._ocupados -= 1
+
+    def hay_conexiones_en_espera(self) -> bool:
+        """
+        Indica si hay conexiones aceptadas esperando a un trabajador libre.
+
+        Los manejadores lo consultan para no retener un trabajador con una conexión
+        keep-alive inactiva mientras otras esperan.
+
+        Returns:
+            bool: True si la cola de conexiones no está vacía.
+        """
+        return not self.cola_conexiones.empty()
+
+    def espera_inactiva(self) -> float:
+        """
+        Segundos que un trabajador espera la siguiente solicitud de una conexión
+        keep-alive antes de aparcarla: `ESPERA_KEEPALIVE_EN_HILO`, o 0 si hay
+        conexiones esperando a un trabajador.
+
+        Returns:
+            float: Segundos de espera.
+        """
+        return 0.0 if self.hay_conexiones_en_espera() else ESPERA_KEEPALIVE_EN_HILO
+
+    def aparcar_conexion(self, request, client_address, estado: tuple, timeout: float) -> bool:
+        """
+        Deja una conexión keep-alive inactiva al hilo vigilante y libera al trabajador.
+        Se llama desde el manejador, en el hilo del trabajador, justo antes de terminar.
+
+        Args:
+            request: Socket de la conexión.
+            client_address: Dirección del cliente.
+            estado (tuple): Estado del manejador, que recupera `retomar_conexion` cuando
+                la conexión vuelve a la cola.
+            timeout (float): Segundos de inactividad antes de cerrar la conexión.
+
+        Returns:
+            bool: False si el servidor se está cerrando y la conexión no se ha aparcado.
+        """
+        with self._lock_aparcadas:
+            if self._cerrando:
+                return False
+            self._por_aparcar.append((request, client_address, estado, time.monotonic() + timeout))
+        self._local.aparcada = True
+        self._despertar()
+        return True
+
+    def retomar_conexion(self, request) -> Optional[tuple]:
+        """
+        Recupera el estado guardado al aparcar una conexión.
+
+        Args:
+            request: Socket de la conexión.
+
+        Returns:
+            tuple | None: Estado del manejador, o None si la conexión es nueva.
+        """
+        return self._estados_conexion.pop(request, None)
+
+    def _despertar(self) -> None:
+        """
+        Interrumpe la espera del selector del hilo vigilante.
+        """
+        try:
+            self._despertador[1].send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # El buffer lleno ya garantiza que el vigilante despertará
+
+    def _vigilar_aparcadas(self) -> None:
+        """
+        Bucle del hilo vigilante: registra las conexiones aparcadas, encola las que
+        reciben datos y cierra las que agotan su tiempo de inactividad.
+        """
+        selector = selectors.DefaultSelector()
+        selector.register(self._despertador[0], selectors.EVENT_READ)
+        # Todas las conexiones usan el mismo tiempo de inactividad, así que se aparcan
+        # en orden de vencimiento: basta con mirar el principio de la cola
+        vencimientos: Deque[Tuple[float, socket.socket]] = collections.deque()
+        # Conexiones con una solicitud nueva que no cupieron en la cola de trabajadores
+        reanudadas: Deque[Tuple[socket.socket, tuple]] = collections.deque()
+        try:
+            while True:
+                with self._lock_aparcadas:
+                    nuevas, self._por_aparcar = self._por_aparcar, []
+                    cerrando = self._cerrando
+                for request, client_address, estado, limite in nuevas:
+                    selector.register(request, selectors.EVENT_READ, (client_address, estado, limite))
+                    vencimientos.append((limite, request))
+                if cerrando:
+                    break
+
+                while reanudadas:
+                    try:
+                        self.cola_conexiones.put_nowait(reanudadas[0])
+                    except queue.Full:
+                        break
+                    reanudadas.popleft()
+
+                ahora = time.monotonic()
+                while vencimientos and vencimientos[0][0] <= ahora:
+                    limite, request = vencimientos.popleft()
+                    # El vencimiento de una conexión que volvió a la cola queda obsoleto:
+                    # puede estar ya cerrada, o aparcada de nuevo con otro límite
+                    if request.fileno() < 0:
+                        continue
+                    try:
+                        clave = selector.get_map().get(request)
+                        if clave is None or clave.data[2] != limite:
+                            continue
+                        selector.unregister(request)
+                    except (KeyError, ValueError):
+                        continue
+                    self.shutdown_request(request)
+                self.conexiones_aparcadas = len(selector.get_map()) - 1
+                espera = vencimientos[0][0] - ahora if vencimientos else None
+                if reanudadas:
+                    espera = min(espera, ESPERA_KEEPALIVE_EN_HILO) if espera is not None \
+                        else ESPERA_KEEPALIVE_EN_HILO
+
+                for clave, _ in selector.select(espera):
+                    if clave.fileobj is self._despertador[0]:
+                        try:
+                            while self._despertador[0].recv(4096):
+                                pass
+                        except (BlockingIOError, OSError):
+                            pass
+                        continue
+                    selector.unregister(clave.fileobj)
+                    client_address, estado, _ = clave.data
+                    self._estados_conexion[clave.fileobj] = estado
+                    if reanudadas:
+                        reanudadas.append((clave.fileobj, client_address))
+                        continue
+                    try:
+                        self.cola_conexiones.put_nowait((clave.fileobj, client_address))
+                    except queue.Full:
+                        reanudadas.append((clave.fileobj, client_address))
+        except Exception:
+            logger.error("Error en el hilo de conexiones keep-alive", exc_info=True)
+        finally:
+            for clave in list(selector.get_map().values()):
+                if clave.fileobj is not self._despertador[0]:
+                    self.shutdown_request(clave.fileobj)
+            selector.close()
+            for request, _ in reanudadas:
+                self._estados_conexion.pop(request, None)
+                self.shutdown_request(request)
+
+    def obtener_stats_pool(self) -> Dict:
+        """
+        Retorna el estado del pool de trabajadores y de la cola de conexiones.
+
+        Returns:
+            Dict: Tamaño del pool, trabajadores ocupados, profundidad y ocupación de la cola,
+                  conexiones rechazadas con 503 y conexiones keep-alive aparcadas.
+        """
+        return {
+            "hilos": self.hilos,
+            "hilos_ocupados": self._ocupados,
+            "profundidad_cola": self.cola_conexiones.maxsize,
+            "conexiones_en_cola": self.cola_conexiones.qsize(),
+            "conexiones_rechazadas": self.conexiones_rechazadas,
+            "conexiones_aparcadas": self.conexiones_aparcadas,
+        }
+
+    def server_close(self):
+        """
+        Cierra el socket de escucha, detiene los trabajadores del pool y los hilos
+        vigilantes de los resultados.
+
+        Las conexiones que aún esperaban en la cola se cierran sin atender, y se espera
+        hasta `espera_cierre` segundos a que los trabajadores terminen la suya.
+        """
+        super().server_close()
+        with self._lock_aparcadas:
+            self._cerrando = True
+        self._despertar()
+        self._vigilante.join(timeout=1)
+        for extremo in self._despertador:
+            extremo.close()
+        while True:
+            try:
+                elemento = self.cola_conexiones.get_nowait()
+            except queue.Empty:
+                break
+            if elemento is not None:
+                self._estados_conexion.pop(elemento[0], None)
+                self.shutdown_request(elemento[0])
+        limite = time.monotonic() + self.espera_cierre
+        for _ in self._trabajadores:
+            try:
+                # Con la cola vacía solo bloquea si es más corta que el pool
+                self.cola_conexiones.put(None, timeout=max(0.0, limite - time.monotonic()))
+            except queue.Full:
+                break
+        for trabajador in self._trabajadores:
+            trabajador.join(max(0.0, limite - time.monotonic()))
+        detener_caches_resultados()
+
     def handle_error(self, request, client_address):
         """
         Maneja errores durante la atención de solicitudes.
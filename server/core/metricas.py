@@ -0,0 +1,204 @@
+import threading
+import weakref
+from typing import Callable, Dict, List, Optional, Union
+
+Numero = Union[int, float]
+
+
+class _Testigo:
+    """
+    Objeto vacío cuya liberación avisa de que el hilo de un fragmento ha terminado.
+    """
+
+    __slots__ = ("__weakref__",)
+
+
+class Contador:
+    """
+    Contador monótono sin contención entre hilos.
+
+    Cada hilo incrementa su propio fragmento (una lista de un elemento guardada en un
+    `threading.local`), de modo que incrementar no toma ningún lock ni comparte memoria
+    escrita con otros hilos. La lectura suma todos los fragmentos; como cada uno solo lo
+    escribe su hilo, el total es exacto en el momento de leerlo. Cuando un hilo termina,
+    su fragmento se suma a `base` y se descarta, así que la lista no crece con los hilos
+    que el servidor crea y destruye.
+    """
+
+    def __init__(self, nombre: str, descripcion: str = ""):
+        """
+        Inicializa el contador a cero.
+
+        Args:
+            nombre (str): Nombre de la métrica.
+            descripcion (str): Descripción para humanos.
+        """
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.base: Numero = 0
+        self._local = threading.local()
+        self._fragmentos: List[List[Numero]] = []
+        # Solo al crear o plegar el fragmento de un hilo y al leer el total
+        self._lock_fragmentos = threading.Lock()
+
+    def incrementar(self, cantidad: Numero = 1) -> None:
+        """
+        Suma una cantidad al fragmento del hilo actual.
+
+        Args:
+            cantidad (int | float): Cantidad a sumar.
+        """
+        try:
+            self._local.fragmento[0] += cantidad
+        except AttributeError:
+            fragmento = [cantidad]
+            with self._lock_fragmentos:
+                self._fragmentos.append(fragmento)
+            # El testigo solo vive en el `threading.local`: se libera al terminar el hilo
+            testigo = _Testigo()
+            weakref.finalize(testigo, self._plegar, fragmento).atexit = False
+            self._local.testigo = testigo
+            self._local.fragmento = fragmento
+
+    def _plegar(self, fragmento: List[Numero]) -> None:
+        """
+        Suma a `base` el fragmento de un hilo que ha terminado y lo descarta.
+
+        Args:
+            fragmento (list): Fragmento del hilo.
+        """
+        with self._lock_fragmentos:
+            self.base += fragmento[0]
+            self._fragmentos = [otro for otro in self._fragmentos if otro is not fragmento]
+
+    def fijar(self, total: Numero) -> None:
+        """
+        Ajusta la base para que el total del contador pase a ser `total`.
+
+        Args:
+            total (int | float): Nuevo total.
+        """
+        with self._lock_fragmentos:
+            self.base = total - sum([fragmento[0] for fragmento in self._fragmentos])
+
+    @property
+    def valor(self) -> Numero:
+        """
+        Total del contador: la base más la suma de los fragmentos de todos los hilos.
+        """
+        with self._lock_fragmentos:
+            return self.base + sum([fragmento[0] for fragmento in self._fragmentos])
+
+
+class Indicador:
+    """
+    Valor instantáneo (gauge): se fija con `establecer` o se calcula al leerlo con una
+    función, por ejemplo el tamaño actual de una cola.
+    """
+
+    def __init__(self, nombre: str, descripcion: str = "",
+                 funcion: Optional[Callable[[], Numero]] = None):
+        """
+        Inicializa el indicador.
+
+        Args:
+            nombre (str): Nombre de la métrica.
+            descripcion (str): Descripción para humanos.
+            funcion (Callable, optional): Función que calcula el valor al leerlo.
+        """
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.funcion = funcion
+        self._valor: Numero = 0
+
+    def establecer(self, valor: Numero) -> None:
+        """
+        Fija el valor del indicador (una asignación, atómica para los lectores).
+
+        Args:
+            valor (int | float): Nuevo valor.
+        """
+        self._valor = valor
+
+    @property
+    def valor(self) -> Numero:
+        """
+        Valor actual del indicador.
+        """
+        return self.funcion() if self.funcion is not None else self._valor
+
+
+class RegistroMetricas:
+    """
+    Registro de métricas con nombre del servidor.
+
+    Los manejadores registran sus contadores e indicadores una vez (normalmente al
+    importar el módulo) y después los actualizan sin locks:
+
+        errores = HTTPRequestHandler.recursos.metricas.contador("errores_api")
+        errores.incrementar()
+
+    Registrar dos veces el mismo nombre retorna la misma métrica.
+    """
+
+    def __init__(self):
+        self._metricas: Dict[str, Union[Contador, Indicador]] = {}
+        self._lock = threading.Lock()
+
+    def contador(self, nombre: str, descripcion: str = "") -> Contador:
+        """
+        Retorna el contador con ese nombre, creándolo si no existe.
+
+        Args:
+            nombre (str): Nombre de la métrica.
+            descripcion (str): Descripción para humanos.
+
+        Returns:
+            Contador: Contador registrado.
+
+        Raises:
+            TypeError: Si el nombre ya está registrado como indicador.
+        """
+        return self._registrar(Contador, nombre, descripcion)
+
+    def indicador(self, nombre: str, descripcion: str = "",
+                  funcion: Optional[Callable[[], Numero]] = None) -> Indicador:
+        """
+        Retorna el indicador con ese nombre, creándolo si no existe.
+
+        Args:
+            nombre (str): Nombre de la métrica.
+            descripcion (str): Descripción para humanos.
+            funcion (Callable, optional): Función que calcula el valor al leerlo.
+
+        Returns:
+            Indicador: Indicador registrado.
+
+        Raises:
+            TypeError: Si el nombre ya está registrado como contador.
+        """
+        indicador = self._registrar(Indicador, nombre, descripcion)
+        if funcion is not None:
+            indicador.funcion = funcion
+        return indicador
+
+    def _registrar(self, tipo, nombre: str, descripcion: str):
+        """
+        Busca o crea una métrica del tipo indicado.
+        """
+        with self._lock:
+            metrica = self._metricas.get(nombre)
+            if metrica is None:
+                metrica = self._metricas[nombre] = tipo(nombre, descripcion)
+            elif not isinstance(metrica, tipo):
+                raise TypeError(f"La métrica {nombre} ya está registrada como {type(metrica).__name__}")
+            return metrica
+
+    def instantanea(self) -> Dict[str, Numero]:
+        """
+        Lee el valor actual de todas las métricas.
+
+        Returns:
+            Dict[str, int | float]: Valor por nombre de métrica.
+        """
+        return {nombre: metrica.valor for nombre, metrica in list(self._metricas.items())}
@@ -0,0 +1,203 @@
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+from ..config import MAX_TAMANO_CABECERAS, MAX_TAMANO_CUERPO
+
+FIN_CABECERAS = b"\r\n\r\n"
+METODOS_VALIDOS = frozenset({"GET", "HEAD", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"})
+
+
+class ErrorSolicitud(Exception):
+    """
+    Error producido al analizar una solicitud HTTP mal formada.
+
+    Incluye el código de estado HTTP con el que debe responderse al cliente.
+    """
+
+    def __init__(self, codigo: int, mensaje: str):
+        super().__init__(mensaje)
+        self.codigo = codigo
+        self.mensaje = mensaje
+
+
+class SolicitudHTTP:
+    """
+    Solicitud HTTP ya analizada: método, ruta, query, versión, cabeceras y cuerpo.
+
+    Las cabeceras se almacenan con el nombre en minúsculas para poder consultarlas
+    sin volver a recorrer el texto de la solicitud.
+    """
+
+    __slots__ = ("metodo", "ruta", "query", "version", "cabeceras", "cuerpo", "_parametros")
+
+    def __init__(self, metodo: str, ruta: str, query: str, version: str,
+                 cabeceras: Dict[str, str], cuerpo: bytes = b""):
+        self.metodo = metodo
+        self.ruta = ruta
+        self.query = query
+        self.version = version
+        self.cabeceras = cabeceras
+        self.cuerpo = cuerpo
+        self._parametros = None
+
+    @property
+    def linea(self) -> str:
+        """
+        Línea de petición reconstruida (por ejemplo, "GET /status HTTP/1.1").
+        """
+        destino = f"{self.ruta}?{self.query}" if self.query else self.ruta
+        return f"{self.metodo} {destino} {self.version}"
+
+    @property
+    def parametros(self) -> Dict[str, list]:
+        """
+        Parámetros de la query string, analizados solo la primera vez que se piden.
+        """
+        if self._parametros is None:
+            self._parametros = parse_qs(self.query, keep_blank_values=True)
+        return self._parametros
+
+    def cabecera(self, nombre: str, defecto: Optional[str] = None) -> Optional[str]:
+        """
+        Obtiene el valor de una cabecera sin distinguir mayúsculas y minúsculas.
+
+        Args:
+            nombre (str): Nombre de la cabecera.
+            defecto (str, optional): Valor devuelto si la cabecera no existe.
+
+        Returns:
+            Optional[str]: Valor de la cabecera.
+        """
+        return self.cabeceras.get(nombre.lower(), defecto)
+
+
+class ParserHTTP:
+    """
+    Parser incremental de solicitudes HTTP/1.1 que trabaja directamente sobre bytes.
+
+    Los datos recibidos del socket se acumulan en un búfer con `alimentar()` y
+    `siguiente()` devuelve la próxima solicitud completa (cabeceras más el cuerpo
+    indicado por Content-Length) o None si todavía faltan datos. Los bytes sobrantes
+    se conservan para la siguiente solicitud de la misma conexión.
+    """
+
+    def __init__(self, max_cabeceras: int = MAX_TAMANO_CABECERAS,
+                 max_cuerpo: int = MAX_TAMANO_CUERPO):
+        """
+        Inicializa el parser.
+
+        Args:
+            max_cabeceras (int): Tamaño máximo en bytes de la línea de petición más cabeceras.
+            max_cuerpo (int): Tamaño máximo en bytes del cuerpo de la solicitud.
+        """
+        self.max_cabeceras = max_cabeceras
+        self.max_cuerpo = max_cuerpo
+        self._buffer = bytearray()
+        self._inicio_busqueda = 0
+        self._pendiente: Optional[SolicitudHTTP] = None
+        self._longitud_cuerpo = 0
+        self.espera_continuar = False
+
+    @property
+    def tiene_datos(self) -> bool:
+        """
+        Indica si hay bytes recibidos que aún no forman una solicitud completa.
+        """
+        return bool(self._buffer) or self._pendiente is not None
+
+    def alimentar(self, datos) -> None:
+        """
+        Añade bytes recibidos del socket al búfer interno.
+
+        Args:
+            datos (bytes | memoryview): Datos recibidos.
+        """
+        self._buffer += datos
+
+    def siguiente(self) -> Optional[SolicitudHTTP]:
+        """
+        Extrae la siguiente solicitud completa del búfer.
+
+        Returns:
+            Optional[SolicitudHTTP]: La solicitud, o None si faltan datos.
+
+        Raises:
+            ErrorSolicitud: Si la solicitud está mal formada o supera los límites.
+        """
+        if self._pendiente is None:
+            fin = self._buffer.find(FIN_CABECERAS, self._inicio_busqueda)
+            if fin < 0:
+                if len(self._buffer) > self.max_cabeceras:
+                    raise ErrorSolicitud(431, "Cabeceras demasiado grandes")
+                # Continuar la búsqueda donde se quedó, sin volver a recorrer el búfer
+                self._inicio_busqueda = max(0, len(self._buffer) - len(FIN_CABECERAS) + 1)
+                return None
+            if fin > self.max_cabeceras:
+                raise ErrorSolicitud(431, "Cabeceras demasiado grandes")
+
+            self._pendiente = self._analizar_cabeceras(memoryview(self._buffer)[:fin])
+            del self._buffer[:fin + len(FIN_CABECERAS)]
+            self._inicio_busqueda = 0
+
+        if len(self._buffer) < self._longitud_cuerpo:
+            return None
+
+        solicitud = self._pendiente
+        if self._longitud_cuerpo:
+            solicitud.cuerpo = bytes(self._buffer[:self._longitud_cuerpo])
+            del self._buffer[:self._longitud_cuerpo]
+        self._pendiente = None
+        self._longitud_cuerpo = 0
+        self.espera_continuar = False
+        return solicitud
+
+    def _analizar_cabeceras(self, bloque: memoryview) -> SolicitudHTTP:
+        """
+        Analiza la línea de petición y las cabeceras de una solicitud.
+
+        Args:
+            bloque (memoryview): Bytes anteriores al separador de cabeceras.
+
+        Returns:
+            SolicitudHTTP: Solicitud sin cuerpo.
+        """
+        # Las cabeceras HTTP son ISO-8859-1; latin-1 decodifica cualquier byte sin errores
+        lineas = str(bloque, "latin-1").split("\r\n")
+        try:
+            metodo, destino, version = lineas[0].split()
+        except ValueError:
+            raise ErrorSolicitud(400, "Línea de petición inválida")
+        if metodo not in METODOS_VALIDOS:
+            raise ErrorSolicitud(405, "Método no permitido")
+        if not version.startswith("HTTP/1."):
+            raise ErrorSolicitud(505, "Versión HTTP no soportada")
+
+        cabeceras = {}
+        for linea in lineas[1:]:
+            nombre, separador, valor = linea.partition(":")
+            if not separador:
+                raise ErrorSolicitud(400, "Cabecera mal formada")
+            nombre = nombre.strip().lower()
+            valor = valor.strip()
+            if nombre in cabeceras:
+                cabeceras[nombre] = f"{cabeceras[nombre]}, {valor}"
+            else:
+                cabeceras[nombre] = valor
+
+        if "transfer-encoding" in cabeceras:
+            raise ErrorSolicitud(411, "Se requiere Content-Length")
+        try:
+            longitud = int(cabeceras.get("content-length", 0))
+        except ValueError:
+            raise ErrorSolicitud(400, "Content-Length inválido")
+        if longitud < 0:
+            raise ErrorSolicitud(400, "Content-Length inválido")
+        if longitud > self.max_cuerpo:
+            raise ErrorSolicitud(413, "Cuerpo de solicitud demasiado grande")
+        self._longitud_cuerpo = longitud
+        self.espera_continuar = (
+            longitud > 0 and cabeceras.get("expect", "").lower() == "100-continue"
+        )
+
+        ruta, _, query = destino.partition("?")
+        return SolicitudHTTP(metodo, ruta, query, version, cabeceras)
@@ -1,60 +1,419 @@
+import multiprocessing
+import os
 import threading
 import queue
 import time
-from ..config import logger
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
 
+from ..config import (
+    CONSUMIDORES_COLA,
+    LOTE_COLA,
+    MAX_CONSUMIDORES_COLA,
+    MAX_LOTES_EN_VUELO,
+    MODO_PROCESADOR,
+    PROCESOS_PROCESADOR,
+    RESULTADOS_RETENIDOS,
+    logger,
+)
 
-class ProcesadorCola(threading.Thread):
+
+def procesar_lote_simulado(lote: List) -> None:
+    """
+    Función de procesamiento por defecto: simula el trabajo de un lote de solicitudes.
+
+    Como cualquier función de procesamiento, en el modo "procesos" se ejecuta en otro
+    proceso, por lo que debe estar definida a nivel de módulo (se envía con pickle).
+
+    Args:
+        lote (List[SolicitudHTTP]): Solicitudes extraídas de la cola.
     """
-    Hilo de fondo que procesa la cola de solicitudes.
+    # Simulación del procesamiento: el coste fijo se paga una vez por lote
+    time.sleep(0.1)
+    for solicitud in lote:
+        # Registrar la solicitud procesada (se muestra solo los primeros 50 caracteres)
+        logger.debug(f"Procesada solicitud: {solicitud.linea[:50]}...")
+
 
-    Este thread se encarga de obtener solicitudes de la cola, simular su procesamiento
-    y registrar la operación realizada, demostrando el uso de colas para la comunicación
-    entre threads.
+class _Consumidor(threading.Thread):
     """
+    Hilo del pool de `ProcesadorCola` con sus propias métricas.
+
+    Solo este hilo escribe sus contadores, por lo que no necesitan lock; los lectores
+    pueden ver un valor de hace un instante.
+    """
+
+    def __init__(self, procesador: "ProcesadorCola", numero: int):
+        super().__init__(daemon=True, name=f"ProcesadorCola-{numero}")
+        self.procesador = procesador
+        self.activo = True
+        self.inicio = time.monotonic()
+        self.procesadas = 0
+        self.lotes = 0
+        self.errores = 0
+        self.espera_ultima = 0.0  # Segundos que esperó en la cola el elemento más antiguo del último lote
+
+    def run(self):
+        """
+        Extrae lotes de la cola y los procesa hasta que el consumidor se retira o el
+        pool se detiene y la cola queda vacía.
+        """
+        logger.info(f"Iniciando {self.name}")
+        while True:
+            lote = self.procesador.extraer_lote()
+            if not lote:
+                if not self.activo or not self.procesador.running:
+                    break
+                continue
+            self.procesar(lote)
+            if not self.activo:
+                break
+        logger.info(f"Finalizado {self.name}")
 
-    def __init__(self, recursos):
+    def procesar(self, lote: List[tuple]) -> None:
+        """
+        Procesa un lote en este hilo o lo envía al pool de procesos.
+
+        Args:
+            lote (List[tuple]): Elementos `(marca, solicitud)` extraídos de la cola.
+        """
+        self.espera_ultima = time.monotonic() - lote[0][0]
+        solicitudes = [solicitud for _, solicitud in lote]
+        if self.procesador.modo == "procesos":
+            self.procesador.enviar_lote(self, solicitudes)
+            return
+        try:
+            resultado = self.procesador.funcion(solicitudes)
+        except Exception as e:
+            logger.error(f"Error en {self.name}: {str(e)}")
+            self.terminar_lote(len(lote), error=True)
+        else:
+            self.terminar_lote(len(lote))
+            self.procesador.entregar_resultado(resultado)
+
+    def terminar_lote(self, cantidad: int, error: bool = False) -> None:
+        """
+        Marca como completadas las tareas de un lote y actualiza las métricas.
+
+        En el modo "procesos" lo llama el hilo que recoge los resultados del pool; sigue
+        habiendo un único hilo que escribe cada contador.
+
+        Args:
+            cantidad (int): Elementos del lote.
+            error (bool): True si el procesamiento falló.
+        """
+        cola = self.procesador.recursos.cola_solicitudes
+        for _ in range(cantidad):
+            # Marcar la tarea como completada
+            cola.task_done()
+        if error:
+            self.errores += 1
+        self.procesadas += cantidad
+        self.lotes += 1
+        self.procesador.procesadas.incrementar(cantidad)
+
+    def obtener_stats(self) -> Dict:
+        """
+        Retorna las métricas del consumidor.
+
+        Returns:
+            Dict: Solicitudes procesadas, lotes, errores, rendimiento medio y espera en
+                cola del último lote.
+        """
+        duracion = max(time.monotonic() - self.inicio, 1e-9)
+        return {
+            "nombre": self.name,
+            "procesadas": self.procesadas,
+            "lotes": self.lotes,
+            "errores": self.errores,
+            "procesadas_por_segundo": round(self.procesadas / duracion, 2),
+            "espera_ultima_ms": round(self.espera_ultima * 1000, 2),
+        }
+
+
+class ProcesadorCola:
+    """
+    Pool de hilos de fondo que procesa la cola de solicitudes.
+
+    Cada consumidor espera a que haya al menos un elemento en la cola y se lleva en el
+    mismo despertar hasta `lote` elementos, que procesa juntos con la función de
+    procesamiento (por defecto una simulación con un coste fijo por lote). El número de
+    consumidores puede cambiarse en caliente con `redimensionar`, y `stop` termina de
+    vaciar la cola antes de detener los hilos.
+
+    En el modo "procesos" los consumidores no ejecutan la función: envían cada lote a
+    un `ProcessPoolExecutor`, de modo que el trabajo de CPU no compite por el GIL con
+    los hilos que atienden solicitudes. Como mucho hay `max_en_vuelo` lotes enviados a
+    la vez; si se alcanza el límite los consumidores esperan, la cola se llena y se
+    aplica su política de desbordamiento. Si un proceso del pool muere, el pool se
+    recrea y el lote se reintenta una vez.
+
+    El resultado de cada lote se pasa a `al_completar` o, si no se indica, se guarda en
+    `resultados` (los últimos `RESULTADOS_RETENIDOS`).
+    """
+
+    def __init__(self, recursos, consumidores: int = CONSUMIDORES_COLA, lote: int = LOTE_COLA,
+                 funcion: Callable[[List], Any] = procesar_lote_simulado,
+                 modo: str = MODO_PROCESADOR, procesos: Optional[int] = PROCESOS_PROCESADOR,
+                 max_en_vuelo: int = MAX_LOTES_EN_VUELO,
+                 al_completar: Optional[Callable[[Any], None]] = None):
         """
         Inicializa el procesador de cola.
 
         Args:
             recursos: Objeto que contiene la cola de solicitudes y otros recursos compartidos.
+            consumidores (int): Hilos consumidores iniciales.
+            lote (int): Elementos máximos que un consumidor extrae en cada despertar.
+            funcion (Callable[[List], Any]): Procesa una lista de solicitudes y retorna
+                opcionalmente un resultado.
+            modo (str): "hilos" (la función se ejecuta en los consumidores) o "procesos".
+            procesos (int, optional): Procesos del pool en el modo "procesos"; None para
+                uno por núcleo.
+            max_en_vuelo (int): Lotes enviados al pool de procesos a la vez como máximo.
+            al_completar (Callable, optional): Recibe el resultado de cada lote.
+
+        Raises:
+            ValueError: Si el modo no existe.
         """
-        super().__init__(daemon=True)
+        if modo not in ("hilos", "procesos"):
+            raise ValueError(f"Modo de procesador desconocido: {modo}")
         self.recursos = recursos
-        self.running = True
+        self.consumidores_iniciales = consumidores
+        self.lote = lote
+        self.funcion = funcion
+        self.modo = modo
+        self.procesos = procesos
+        self.al_completar = al_completar
+        self.resultados: deque = deque(maxlen=RESULTADOS_RETENIDOS)
+        self.ejecutor: Optional[ProcessPoolExecutor] = None
+        self.caidas = 0  # Veces que un proceso del pool murió
+        self._en_vuelo = threading.BoundedSemaphore(max_en_vuelo)
+        self.max_en_vuelo = max_en_vuelo
+        self._lotes_en_vuelo = 0
+        self._lock_ejecutor = threading.Lock()
+        self.running = False
         self.name = "ProcesadorCola"
+        self._consumidores: List[_Consumidor] = []
+        # Consumidores retirados por `redimensionar` que aún pueden estar terminando un lote
+        self._retirados: List[_Consumidor] = []
+        self._numerados = 0
+        self._lock = threading.Lock()
+        self.procesadas = recursos.metricas.contador(
+            "cola_procesadas", "Solicitudes procesadas por el procesador de fondo"
+        )
+        recursos.metricas.indicador(
+            "procesador_consumidores", "Hilos consumidores activos", lambda: len(self._consumidores)
+        )
+        recursos.procesador = self
 
-    def run(self):
+    def start(self) -> None:
+        """
+        Arranca los consumidores iniciales.
         """
-        Ejecuta el procesamiento continuo de la cola de solicitudes.
+        logger.info(f"Iniciando {self.name} con {self.consumidores_iniciales} consumidores "
+                    f"en modo {self.modo}")
+        self.running = True
+        if self.modo == "procesos":
+            self.ejecutor = self._crear_ejecutor()
+        self.redimensionar(self.consumidores_iniciales)
 
-        Obtiene elementos de la cola con un timeout, simula el procesamiento y marca
-        cada tarea como completada.
+    def _crear_ejecutor(self) -> ProcessPoolExecutor:
         """
-        logger.info(f"Iniciando {self.name}")
-        while self.running:
-            try:
-                # Obtener un elemento de la cola con timeout para permitir la finalización
-                solicitud = self.recursos.cola_solicitudes.get(timeout=1)
+        Crea el pool de procesos. Se usa el método "spawn": hacer fork de un proceso con
+        hilos en marcha puede copiar locks tomados por otros hilos.
 
-                # Simulación del procesamiento de la solicitud
-                time.sleep(0.1)
+        Returns:
+            ProcessPoolExecutor: Pool de procesos.
+        """
+        return ProcessPoolExecutor(self.procesos, mp_context=multiprocessing.get_context("spawn"))
 
-                # Registrar la solicitud procesada (se muestra solo los primeros 50 caracteres)
-                logger.debug(f"Procesada solicitud: {solicitud[:50]}...")
+    def enviar_lote(self, consumidor: _Consumidor, solicitudes: List, reintento: bool = False) -> None:
+        """
+        Envía un lote al pool de procesos, esperando si ya hay `max_en_vuelo` en curso.
 
-                # Marcar la tarea como completada
-                self.recursos.cola_solicitudes.task_done()
-            except queue.Empty:
-                # No hay solicitudes en la cola, continuar esperando
-                continue
-            except Exception as e:
-                logger.error(f"Error en {self.name}: {str(e)}")
+        Args:
+            consumidor (_Consumidor): Consumidor que extrajo el lote.
+            solicitudes (List[SolicitudHTTP]): Solicitudes del lote.
+            reintento (bool): True si es el reintento tras la caída de un proceso.
+        """
+        if not reintento:
+            self._en_vuelo.acquire()
+            with self._lock_ejecutor:
+                self._lotes_en_vuelo += 1
+        ejecutor = self.ejecutor
+        try:
+            futuro = ejecutor.submit(self.funcion, solicitudes)
+        except BrokenProcessPool:
+            self._reiniciar_ejecutor(ejecutor)
+            futuro = Future()
+            futuro.set_exception(BrokenProcessPool("El pool de procesos estaba roto"))
+        except RuntimeError as e:
+            # El pool ya se cerró (parada del servidor)
+            futuro = Future()
+            futuro.set_exception(e)
+        futuro.add_done_callback(
+            lambda f: self._lote_terminado(consumidor, solicitudes, f, reintento, ejecutor)
+        )
 
-    def stop(self):
+    def _lote_terminado(self, consumidor: _Consumidor, solicitudes: List, futuro: Future,
+                        reintento: bool, ejecutor: ProcessPoolExecutor) -> None:
         """
-        Detiene el procesador de la cola.
+        Recoge el resultado de un lote enviado al pool de procesos.
+
+        Args:
+            consumidor (_Consumidor): Consumidor que extrajo el lote.
+            solicitudes (List[SolicitudHTTP]): Solicitudes del lote.
+            futuro (Future): Futuro del lote.
+            reintento (bool): True si ya era un reintento.
+            ejecutor (ProcessPoolExecutor): Pool al que se envió.
+        """
+        error = futuro.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._reiniciar_ejecutor(ejecutor)
+            if not reintento and self.running:
+                self.enviar_lote(consumidor, solicitudes, reintento=True)
+                return
+
+        with self._lock_ejecutor:
+            self._lotes_en_vuelo -= 1
+        self._en_vuelo.release()
+        if error is not None:
+            logger.error(f"Error en {consumidor.name}: {error}")
+            consumidor.terminar_lote(len(solicitudes), error=True)
+        else:
+            consumidor.terminar_lote(len(solicitudes))
+            self.entregar_resultado(futuro.result())
+
+    def _reiniciar_ejecutor(self, roto: ProcessPoolExecutor) -> None:
+        """
+        Sustituye un pool de procesos roto por uno nuevo, una sola vez aunque varios
+        lotes fallen a la vez.
+
+        Args:
+            roto (ProcessPoolExecutor): Pool que dejó de funcionar.
+        """
+        with self._lock_ejecutor:
+            if self.ejecutor is roto and self.running:
+                self.caidas += 1
+                logger.error(f"Un proceso de {self.name} terminó inesperadamente; se recrea el pool")
+                self.ejecutor = self._crear_ejecutor()
+        roto.shutdown(wait=False)
+
+    def entregar_resultado(self, resultado: Any) -> None:
+        """
+        Pasa el resultado de un lote a `al_completar` o lo guarda en `resultados`.
+
+        Args:
+            resultado: Valor retornado por la función de procesamiento.
+        """
+        if resultado is None:
+            return
+        if self.al_completar is None:
+            self.resultados.append(resultado)
+            return
+        try:
+            self.al_completar(resultado)
+        except Exception as e:
+            logger.error(f"Error entregando el resultado de {self.name}: {e}")
+
+    def extraer_lote(self, espera: float = 0.5) -> List[tuple]:
+        """
+        Espera un elemento de la cola y toma además los que ya estén disponibles, hasta
+        completar el tamaño de lote.
+
+        Args:
+            espera (float): Segundos de espera máxima por el primer elemento, para poder
+                comprobar periódicamente si hay que detenerse.
+
+        Returns:
+            List[tuple]: Elementos `(marca, solicitud)` extraídos; vacía si no llegó ninguno.
+        """
+        cola = self.recursos.cola_solicitudes
+        try:
+            lote = [cola.get(timeout=espera)]
+        except queue.Empty:
+            return []
+        try:
+            while len(lote) < self.lote:
+                lote.append(cola.get_nowait())
+        except queue.Empty:
+            pass
+        return lote
+
+    def redimensionar(self, consumidores: int) -> int:
+        """
+        Cambia el número de hilos consumidores en caliente.
+
+        Los consumidores retirados terminan el lote que estén procesando antes de salir.
+
+        Args:
+            consumidores (int): Número de consumidores deseado.
+
+        Returns:
+            int: Número de consumidores tras el cambio.
+
+        Raises:
+            ValueError: Si el número está fuera de 1..MAX_CONSUMIDORES_COLA.
+        """
+        if not 1 <= consumidores <= MAX_CONSUMIDORES_COLA:
+            raise ValueError(f"El número de consumidores debe estar entre 1 y {MAX_CONSUMIDORES_COLA}")
+        with self._lock:
+            while len(self._consumidores) < consumidores:
+                self._numerados += 1
+                consumidor = _Consumidor(self, self._numerados)
+                self._consumidores.append(consumidor)
+                consumidor.start()
+            self._retirados = [consumidor for consumidor in self._retirados if consumidor.is_alive()]
+            while len(self._consumidores) > consumidores:
+                consumidor = self._consumidores.pop()
+                consumidor.activo = False
+                self._retirados.append(consumidor)
+            return len(self._consumidores)
+
+    def obtener_stats(self) -> Dict:
+        """
+        Retorna la configuración del pool y las métricas de cada consumidor.
+
+        Returns:
+            Dict: Consumidores, tamaño de lote, total procesado y detalle por consumidor.
+        """
+        consumidores = list(self._consumidores)
+        stats = {
+            "modo": self.modo,
+            "consumidores": len(consumidores),
+            "lote": self.lote,
+            "procesadas": self.procesadas.valor,
+            "por_consumidor": [consumidor.obtener_stats() for consumidor in consumidores],
+        }
+        if self.modo == "procesos":
+            stats.update({
+                "procesos": self.procesos or os.cpu_count(),
+                "lotes_en_vuelo": self._lotes_en_vuelo,
+                "max_en_vuelo": self.max_en_vuelo,
+                "caidas": self.caidas,
+            })
+        return stats
+
+    def stop(self, timeout: float = 5) -> None:
+        """
+        Detiene el procesador: los consumidores vacían la cola y terminan. También se
+        espera a los retirados que aún estén terminando su último lote.
+
+        Args:
+            timeout (float): Segundos de espera máxima por todos los consumidores.
         """
-        self.running = False
         logger.info(f"Deteniendo {self.name}")
+        self.running = False
+        with self._lock:
+            consumidores = self._consumidores + self._retirados
+        limite = time.monotonic() + timeout
+        for consumidor in consumidores:
+            consumidor.join(max(0.0, limite - time.monotonic()))
+        if self.ejecutor is not None:
+            # Esperar a los lotes que ya se enviaron al pool
+            self.ejecutor.shutdown(wait=True)
+        pendientes = self.recursos.cola_solicitudes.qsize()
+        if pendientes:
+            logger.warning(f"{self.name} detenido con {pendientes} solicitudes sin procesar")
@@ -1,26 +1,152 @@
-from datetime import datetime
+import base64
+import binascii
+import os
 import threading
+import time
 import queue
-from typing import Dict, List
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from ..config import logger
+from ..config import (
+    CAPACIDAD_REGISTRO_SOLICITUDES,
+    ESPERA_COLA,
+    INTERVALO_PUBLICACION_ESTADISTICAS,
+    LOTE_STREAMING,
+    PENDIENTES_REGISTRO_SOLICITUDES,
+    POLITICA_COLA,
+    POLITICAS_COLA,
+    logger,
+)
+from .metricas import RegistroMetricas
+from .parser import ErrorSolicitud
+from .registro import RegistroSolicitudes
+
+
+def codificar_cursor(posicion: int) -> str:
+    """
+    Convierte una posición del registro de solicitudes en un cursor opaco para la API.
+
+    Args:
+        posicion (int): Número de secuencia de la siguiente solicitud a retornar.
+
+    Returns:
+        str: Cursor apto para la query string.
+    """
+    return base64.urlsafe_b64encode(b"s%d" % posicion).rstrip(b"=").decode("ascii")
+
+
+def decodificar_cursor(cursor: str) -> int:
+    """
+    Obtiene la posición del registro a partir de un cursor de `codificar_cursor`.
+
+    Args:
+        cursor (str): Cursor recibido en la query string.
+
+    Returns:
+        int: Número de secuencia.
+
+    Raises:
+        ErrorSolicitud: 400 si el cursor no es válido.
+    """
+    try:
+        valor = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        if valor[:1] == b"s" and valor[1:].isdigit():
+            return int(valor[1:])
+    except (binascii.Error, ValueError):
+        pass
+    raise ErrorSolicitud(400, "Cursor inválido")
 
 
 class RecursosCompartidos:
     """
     Gestiona los recursos compartidos del servidor, incluyendo el contador de solicitudes,
     almacenamiento de datos, cola de solicitudes y registro de solicitudes realizadas.
+
+    El camino de cada solicitud no toma ningún lock global: el contador es una métrica
+    con un fragmento por hilo y las solicitudes se anotan en una cola de pendientes
+    (`deque.append` es atómico) que se vuelca al registro en lotes, bajo `self.lock`,
+    cuando crece o cuando alguien lo lee.
     """
 
-    def __init__(self):
-        self.lock = threading.Lock()
+    def __init__(self, capacidad_registro: int = CAPACIDAD_REGISTRO_SOLICITUDES,
+                 politica_cola: str = POLITICA_COLA, espera_cola: float = ESPERA_COLA):
+        """
+        Inicializa los recursos compartidos.
+
+        Args:
+            capacidad_registro (int): Solicitudes que conserva el registro de solicitudes.
+            politica_cola (str): Qué hacer cuando la cola de procesamiento está llena
+                (ver `POLITICAS_COLA`).
+            espera_cola (float): Segundos de espera máxima con la política "bloquear".
+
+        Raises:
+            ValueError: Si la política no existe.
+        """
+        if politica_cola not in POLITICAS_COLA:
+            raise ValueError(f"Política de cola desconocida: {politica_cola}")
+        self.lock = threading.Lock()  # Protege el registro de solicitudes
         self.semaforo_datos = threading.Semaphore(1)
-        self.contador_solicitudes = 0
+        self.metricas = RegistroMetricas()
+        self.solicitudes_totales = self.metricas.contador(
+            "solicitudes_totales", "Solicitudes recibidas por este proceso"
+        )
         self.datos = []
         self.max_datos = 100
         self.cola_solicitudes = queue.Queue(maxsize=50)
-        self.solicitudes_realizadas = []  # Lista para rastrear solicitudes
-        self.max_solicitudes = 1000  # Límite para evitar consumo excesivo de memoria
+        self.politica_cola = politica_cola
+        self.espera_cola = espera_cola
+        self.procesador = None  # ProcesadorCola que consume la cola, si está en marcha
+        # Registro de solicitudes en un buffer circular: la memoria no crece con el tráfico
+        self.registro = RegistroSolicitudes(capacidad_registro)
+        self.max_solicitudes = capacidad_registro
+        self._pendientes: deque = deque()
+        self._ultimo_id = 0
+        self._lock_ids = threading.Lock()
+        self.metricas.indicador("tamano_cola", "Solicitudes en la cola de procesamiento",
+                                self.cola_solicitudes.qsize)
+        self.metricas.indicador("datos_almacenados", "Datos recibidos en memoria",
+                                lambda: len(self.datos))
+        self.cola_aceptadas = self.metricas.contador(
+            "cola_aceptadas", "Solicitudes encoladas para el procesador"
+        )
+        self.cola_descartadas = self.metricas.contador(
+            "cola_descartadas", "Solicitudes no encoladas por estar la cola llena"
+        )
+        self.cola_desalojadas = self.metricas.contador(
+            "cola_desalojadas", "Solicitudes sacadas de la cola para hacer sitio a otras nuevas"
+        )
+        # Tabla compartida entre procesos cuando el servidor se ejecuta con varios workers
+        self.estadisticas = None
+        self.indice_worker = 0
+        self.num_workers = 1
+        self._publicador: Optional[threading.Thread] = None
+
+    def conectar_estadisticas(self, tabla, indice_worker: int,
+                              intervalo: float = INTERVALO_PUBLICACION_ESTADISTICAS) -> None:
+        """
+        Asocia estos recursos al slot de un worker en la tabla de estadísticas compartida.
+
+        Si el worker sustituye a otro que terminó, continúa sus contadores acumulados.
+        Se llama en el proceso del worker, que arranca aquí su hilo de publicación.
+
+        Args:
+            tabla (TablaEstadisticas): Tabla compartida creada por el supervisor.
+            indice_worker (int): Índice del worker en la tabla.
+            intervalo (float): Segundos entre publicaciones de los contadores.
+        """
+        with self.lock:
+            self.estadisticas = tabla
+            self.indice_worker = indice_worker
+            self.num_workers = tabla.num_workers
+            self.solicitudes_totales.fijar(tabla.leer(indice_worker, "total_solicitudes"))
+            self._ultimo_id = tabla.leer(indice_worker, "ultimo_id")
+            tabla.escribir(indice_worker, "pid", os.getpid())
+            if self._publicador is None:
+                self._publicador = threading.Thread(
+                    target=self._publicar_periodicamente, args=(intervalo,),
+                    name="PublicadorEstadisticas", daemon=True,
+                )
+                self._publicador.start()
 
     def registrar_solicitud(self, ip: str, metodo: str, ruta: str) -> None:
         """
@@ -31,18 +157,48 @@ class RecursosCompartidos:
             metodo (str): Método HTTP utilizado.
             ruta (str): Ruta solicitada.
         """
-        solicitud = {
-            "timestamp": datetime.now().isoformat(),
-            "ip": ip,
-            "metodo": metodo,
-            "ruta": ruta
-        }
+        pendientes = self._pendientes
+        pendientes.append((time.time(), ip, metodo, ruta))
+        # Volcar solo si nadie más lo está haciendo: nunca se espera al lock
+        if len(pendientes) >= PENDIENTES_REGISTRO_SOLICITUDES and self.lock.acquire(blocking=False):
+            try:
+                self._volcar_pendientes()
+            finally:
+                self.lock.release()
+
+    def _volcar_pendientes(self) -> None:
+        """
+        Pasa al registro las solicitudes pendientes, en orden de llegada. Debe llamarse
+        con `self.lock` adquirido.
+        """
+        pendientes = self._pendientes
+        agregar = self.registro.agregar
+        try:
+            while True:
+                agregar(*pendientes.popleft())
+        except IndexError:
+            pass
+
+    def consultar_solicitudes(self, filtros: Dict[str, str] = None, desde: Optional[float] = None,
+                              posicion: int = 0, limite: int = 100) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Busca solicitudes registradas con filtros, por páginas.
 
+        Args:
+            filtros (Dict[str, str], optional): Valor exacto por campo (`ip`, `metodo`, `ruta`).
+            desde (float, optional): Segundos desde epoch; solo solicitudes posteriores o iguales.
+            posicion (int): Número de secuencia desde el que continuar (cursor de la página anterior).
+            limite (int): Máximo de solicitudes a retornar.
+
+        Returns:
+            Tuple[List[Dict], Optional[int]]: Solicitudes encontradas, de la más antigua a
+                la más reciente, y posición de la página siguiente (None si no hay más).
+        """
         with self.lock:
-            if len(self.solicitudes_realizadas) >= self.max_solicitudes:
-                # Eliminar la solicitud más antigua si se supera el límite
-                self.solicitudes_realizadas.pop(0)
-            self.solicitudes_realizadas.append(solicitud)
+            self._volcar_pendientes()
+            if desde is not None:
+                posicion = max(posicion, self.registro.buscar_marca(desde))
+            return self.registro.consultar(filtros or {}, posicion, limite)
 
     def obtener_solicitudes(self) -> List[Dict]:
         """
@@ -52,18 +208,119 @@ class RecursosCompartidos:
             List[Dict]: Lista de solicitudes.
         """
         with self.lock:
-            return self.solicitudes_realizadas.copy()
+            self._volcar_pendientes()
+            return self.registro.leer(0, self.registro.total)
 
-    def incrementar_contador(self) -> int:
+    def total_solicitudes_registradas(self) -> int:
         """
-        Incrementa el contador de solicitudes de forma segura.
+        Retorna el número de solicitudes que hay en el registro.
 
         Returns:
-            int: El nuevo valor del contador.
+            int: Solicitudes registradas.
+        """
+        with self.lock:
+            self._volcar_pendientes()
+            return len(self.registro)
+
+    def iterar_solicitudes(self, lote: int = LOTE_STREAMING) -> Iterator[List[Dict]]:
+        """
+        Recorre las solicitudes registradas por lotes, sin copiar el registro entero.
+
+        El lock se toma solo para leer cada lote, de modo que un recorrido largo no
+        bloquea a los hilos que registran solicitudes. Se recorren las solicitudes que
+        había al empezar; las que se sobrescriben mientras tanto se omiten.
+
+        Args:
+            lote (int): Solicitudes por lote.
+
+        Yields:
+            List[Dict]: Lote de solicitudes, de la más antigua a la más reciente.
         """
         with self.lock:
-            self.contador_solicitudes += 1
-            return self.contador_solicitudes
+            self._volcar_pendientes()
+            siguiente = self.registro.primera
+            fin = self.registro.total
+        while siguiente < fin:
+            with self.lock:
+                siguiente = max(siguiente, self.registro.primera)
+                solicitudes = self.registro.leer(siguiente, min(siguiente + lote, fin))
+            if not solicitudes:
+                return
+            siguiente += len(solicitudes)
+            yield solicitudes
+
+    def incrementar_contador(self) -> None:
+        """
+        Incrementa el contador de solicitudes sin tomar ningún lock.
+
+        El total (la suma de los fragmentos) no se calcula aquí: lo publica en la tabla
+        compartida el hilo de `_publicar_periodicamente`.
+        """
+        self.solicitudes_totales.incrementar()
+
+    def publicar_estadisticas(self) -> None:
+        """
+        Escribe los contadores de este worker en su slot de la tabla compartida.
+
+        Cada worker escribe solo su slot. Lo llama el hilo de publicación cada
+        `INTERVALO_PUBLICACION_ESTADISTICAS` segundos, así que lo que leen los demás
+        workers puede ir ese tiempo por detrás; `obtener_stats` vuelve a publicar antes
+        de leer, de modo que el total del worker que responde siempre es exacto.
+        """
+        self.estadisticas.escribir(
+            self.indice_worker, "total_solicitudes", self.solicitudes_totales.valor
+        )
+        self.estadisticas.escribir(
+            self.indice_worker, "tamano_cola", self.cola_solicitudes.qsize()
+        )
+
+    def _publicar_periodicamente(self, intervalo: float) -> None:
+        """
+        Bucle del hilo de publicación de las estadísticas.
+
+        Args:
+            intervalo (float): Segundos entre publicaciones.
+        """
+        while True:
+            time.sleep(intervalo)
+            try:
+                self.publicar_estadisticas()
+            except Exception as e:
+                logger.error(f"Error publicando las estadísticas del worker: {e}")
+
+    @property
+    def contador_solicitudes(self) -> int:
+        """
+        Total de solicitudes recibidas por este proceso.
+        """
+        return self.solicitudes_totales.valor
+
+    def generar_id(self) -> int:
+        """
+        Genera un identificador para un dato almacenado, único entre todos los workers.
+
+        Cada worker usa los identificadores congruentes con su índice, de modo que no
+        necesitan coordinarse.
+
+        Returns:
+            int: El nuevo identificador.
+        """
+        with self._lock_ids:
+            self._ultimo_id += 1
+            if self.estadisticas is not None:
+                self.estadisticas.escribir(self.indice_worker, "ultimo_id", self._ultimo_id)
+            return self._ultimo_id * self.num_workers + self.indice_worker
+
+    def continuar_ids(self, ultimo_id: int) -> None:
+        """
+        Hace que los identificadores nuevos sean mayores que uno ya usado, por ejemplo el
+        último guardado en el diario en una ejecución anterior.
+
+        Args:
+            ultimo_id (int): Identificador ya usado.
+        """
+        with self._lock_ids:
+            self._ultimo_id = max(self._ultimo_id, ultimo_id // self.num_workers)
 
     def agregar_dato(self, dato: Dict) -> bool:
         """
@@ -79,6 +336,8 @@ class RecursosCompartidos:
             if len(self.datos) >= self.max_datos:
                 self.datos.pop(0)
             self.datos.append(dato)
+            if self.estadisticas is not None:
+                self.estadisticas.escribir(self.indice_worker, "datos_almacenados", len(self.datos))
             return True
 
     def obtener_datos(self) -> List[Dict]:
@@ -91,34 +350,118 @@ class RecursosCompartidos:
         with self.semaforo_datos:
             return self.datos.copy()
 
-    def agregar_solicitud_a_cola(self, solicitud: str) -> bool:
+    def agregar_solicitud_a_cola(self, solicitud, puede_esperar: bool = True) -> bool:
         """
-        Intenta agregar una solicitud a la cola con un timeout para evitar bloqueos indefinidos.
+        Agrega una solicitud a la cola del procesador según la política de desbordamiento.
+
+        Con la cola llena, "descartar_nueva" descarta la solicitud sin esperar,
+        "descartar_antigua" desaloja la más antigua de la cola y "bloquear" espera a que
+        haya sitio como máximo `espera_cola` segundos.
 
         Args:
-            solicitud (str): Solicitud a agregar.
+            solicitud (SolicitudHTTP): Solicitud ya analizada a agregar.
+            puede_esperar (bool): False si el llamante no puede bloquearse (por ejemplo,
+                el bucle de eventos); la política "bloquear" se comporta entonces como
+                "descartar_nueva".
 
         Returns:
-            bool: True si se agregó la solicitud, False si la cola está llena.
+            bool: True si se agregó la solicitud, False si se descartó.
         """
+        cola = self.cola_solicitudes
+        # Con la marca de tiempo el procesador mide cuánto esperó cada elemento
+        elemento = (time.monotonic(), solicitud)
         try:
-            self.cola_solicitudes.put(solicitud, timeout=2)
-            return True
+            if self.politica_cola == "bloquear" and puede_esperar:
+                cola.put(elemento, timeout=self.espera_cola)
+            else:
+                cola.put_nowait(elemento)
         except queue.Full:
-            logger.warning("Cola de solicitudes llena, descartando solicitud")
-            return False
+            if self.politica_cola != "descartar_antigua" or not self._desalojar_y_encolar(elemento):
+                self.cola_descartadas.incrementar()
+                logger.warning("Cola de solicitudes llena, descartando solicitud")
+                return False
+        self.cola_aceptadas.incrementar()
+        return True
+
+    def _desalojar_y_encolar(self, elemento: tuple) -> bool:
+        """
+        Saca la solicitud más antigua de la cola y encola la nueva en su lugar.
+
+        Args:
+            elemento (tuple): `(marca, solicitud)` a encolar.
+
+        Returns:
+            bool: True si se encoló; False si otros hilos volvieron a llenar la cola.
+        """
+        cola = self.cola_solicitudes
+        for _ in range(3):
+            try:
+                cola.get_nowait()
+            except queue.Empty:
+                pass
+            else:
+                # La desalojada no se procesará: cuenta como terminada para join()
+                cola.task_done()
+                self.cola_desalojadas.incrementar()
+            try:
+                cola.put_nowait(elemento)
+                return True
+            except queue.Full:
+                continue
+        return False
 
     def obtener_stats(self) -> Dict:
         """
         Retorna estadísticas del servidor.
 
+        Con varios workers, los totales suman los contadores de todos los procesos y se
+        incluye el detalle por worker.
+
         Returns:
             Dict: Estadísticas que incluyen total de solicitudes, cantidad de datos almacenados
                   y tamaño actual de la cola.
         """
-        with self.lock:
+        metricas = self.metricas.instantanea()
+        if self.estadisticas is not None:
+            self.publicar_estadisticas()
             return {
-                "total_solicitudes": self.contador_solicitudes,
-                "datos_almacenados": len(self.datos),
-                "tamano_cola": self.cola_solicitudes.qsize()
+                **self.estadisticas.totales(),
+                "worker_actual": self.indice_worker,
+                "workers": self.estadisticas.por_worker(),
+                "cola": self._stats_cola(metricas),
+                "procesador": self._stats_procesador(),
+                "metricas": metricas,
             }
+        return {
+            "total_solicitudes": metricas["solicitudes_totales"],
+            "datos_almacenados": metricas["datos_almacenados"],
+            "tamano_cola": metricas["tamano_cola"],
+            "cola": self._stats_cola(metricas),
+            "procesador": self._stats_procesador(),
+            "metricas": metricas,
+        }
+
+    def _stats_procesador(self) -> Optional[Dict]:
+        """
+        Retorna las métricas del procesador de la cola, o None si no está en marcha.
+        """
+        return self.procesador.obtener_stats() if self.procesador is not None else None
+
+    def _stats_cola(self, metricas: Dict) -> Dict:
+        """
+        Resume la política de la cola de procesamiento y sus contadores.
+
+        Args:
+            metricas (Dict): Instantánea de las métricas.
+
+        Returns:
+            Dict: Política, capacidad y contadores de solicitudes aceptadas,
+                descartadas y desalojadas.
+        """
+        return {
+            "politica": self.politica_cola,
+            "capacidad": self.cola_solicitudes.maxsize,
+            "aceptadas": metricas["cola_aceptadas"],
+            "descartadas": metricas["cola_descartadas"],
+            "desalojadas": metricas["cola_desalojadas"],
+        }
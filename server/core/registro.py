@@ -0,0 +1,230 @@
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Campos del registro de solicitudes con índice secundario
+CAMPOS_INDEXADOS = ("ip", "metodo", "ruta")
+
+
+class _Secuencias:
+    """
+    Números de secuencia de un valor indexado, en orden creciente.
+
+    Se guardan en un `array` con un desplazamiento al primero vigente: descartar el más
+    antiguo solo avanza el desplazamiento, y el hueco del principio se libera cuando
+    ocupa la mitad del array (coste amortizado O(1)). A diferencia de un `deque`, el
+    acceso por posición es O(1), así que buscar una secuencia es una búsqueda binaria
+    y recorrer desde ella no pasa por las anteriores.
+    """
+
+    __slots__ = ("datos", "inicio")
+
+    def __init__(self):
+        self.datos = array("q")
+        self.inicio = 0
+
+    def __len__(self) -> int:
+        return len(self.datos) - self.inicio
+
+    def agregar(self, secuencia: int) -> None:
+        """
+        Añade una secuencia, mayor que todas las anteriores.
+
+        Args:
+            secuencia (int): Número de secuencia.
+        """
+        self.datos.append(secuencia)
+
+    def descartar_primera(self) -> None:
+        """
+        Descarta la secuencia más antigua.
+        """
+        self.inicio += 1
+        if self.inicio * 2 >= len(self.datos):
+            del self.datos[:self.inicio]
+            self.inicio = 0
+
+    def desde(self, secuencia: int) -> Iterator[int]:
+        """
+        Recorre las secuencias iguales o posteriores a una dada.
+
+        Args:
+            secuencia (int): Secuencia inicial.
+
+        Returns:
+            Iterator[int]: Secuencias en orden creciente.
+        """
+        datos = self.datos
+        posicion = bisect_left(datos, secuencia, self.inicio)
+        return (datos[i] for i in range(posicion, len(datos)))
+
+
+class RegistroSolicitudes:
+    """
+    Registro de solicitudes en un buffer circular de capacidad fija.
+
+    Cada solicitud ocupa una posición de columnas paralelas preasignadas: la marca de
+    tiempo como `float` en un `array` y la IP, el método y la ruta como referencias a
+    cadenas internadas, compartidas entre todas las solicitudes con el mismo valor.
+    Insertar es O(1) y sin asignar memoria; al llenarse, la solicitud nueva sobrescribe
+    la más antigua. Los registros se convierten en diccionarios solo al leerlos.
+
+    Cada solicitud tiene un número de secuencia (el total de solicitudes registradas
+    antes que ella), que no cambia al descartar otras y sirve de cursor. Los índices
+    secundarios guardan, para cada valor de IP, método y ruta, los números de secuencia
+    de sus solicitudes en orden.
+
+    No es thread-safe: `RecursosCompartidos` lo protege con su lock.
+    """
+
+    def __init__(self, capacidad: int):
+        """
+        Reserva el buffer.
+
+        Args:
+            capacidad (int): Solicitudes que se conservan como máximo.
+
+        Raises:
+            ValueError: Si la capacidad no es positiva.
+        """
+        if capacidad < 1:
+            raise ValueError("La capacidad del registro debe ser positiva")
+        self.capacidad = capacidad
+        self.marcas = array("d", bytes(8 * capacidad))
+        self.ips: List[Optional[str]] = [None] * capacidad
+        self.metodos: List[Optional[str]] = [None] * capacidad
+        self.rutas: List[Optional[str]] = [None] * capacidad
+        self.total = 0  # Solicitudes registradas desde el inicio: secuencia de la siguiente
+        self.indices: Dict[str, Dict[str, _Secuencias]] = {campo: {} for campo in CAMPOS_INDEXADOS}
+        self._columnas = {"ip": self.ips, "metodo": self.metodos, "ruta": self.rutas}
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacidad)
+
+    @property
+    def primera(self) -> int:
+        """
+        Número de secuencia de la solicitud más antigua que se conserva.
+        """
+        return max(0, self.total - self.capacidad)
+
+    def agregar(self, marca: float, ip: str, metodo: str, ruta: str) -> None:
+        """
+        Registra una solicitud, sobrescribiendo la más antigua si el buffer está lleno.
+
+        Args:
+            marca (float): Instante de la solicitud, en segundos desde epoch.
+            ip (str): Dirección IP del cliente.
+            metodo (str): Método HTTP.
+            ruta (str): Ruta solicitada.
+        """
+        secuencia = self.total
+        posicion = secuencia % self.capacidad
+        if secuencia >= self.capacidad:
+            # La solicitud sobrescrita es la primera de cada una de sus listas
+            for campo, columna in self._columnas.items():
+                indice = self.indices[campo]
+                secuencias = indice[columna[posicion]]
+                secuencias.descartar_primera()
+                if not secuencias:
+                    del indice[columna[posicion]]
+
+        valores = (sys.intern(ip), sys.intern(metodo), sys.intern(ruta))
+        self.marcas[posicion] = marca
+        for campo, valor in zip(CAMPOS_INDEXADOS, valores):
+            self._columnas[campo][posicion] = valor
+            secuencias = self.indices[campo].get(valor)
+            if secuencias is None:
+                secuencias = self.indices[campo][valor] = _Secuencias()
+            secuencias.agregar(secuencia)
+        self.total = secuencia + 1
+
+    def como_dict(self, secuencia: int) -> Dict:
+        """
+        Convierte una solicitud registrada al formato de diccionario de la API.
+
+        Args:
+            secuencia (int): Número de secuencia de una solicitud que se conserva.
+
+        Returns:
+            Dict: Solicitud con `timestamp` (ISO 8601), `ip`, `metodo` y `ruta`.
+        """
+        posicion = secuencia % self.capacidad
+        return {
+            "timestamp": datetime.fromtimestamp(self.marcas[posicion]).isoformat(),
+            "ip": self.ips[posicion],
+            "metodo": self.metodos[posicion],
+            "ruta": self.rutas[posicion],
+        }
+
+    def leer(self, inicio: int, fin: int) -> List[Dict]:
+        """
+        Retorna como diccionarios las solicitudes con secuencia en `[inicio, fin)`.
+
+        Args:
+            inicio (int): Primera secuencia; si ya se descartó se empieza por la más antigua.
+            fin (int): Secuencia final, excluida.
+
+        Returns:
+            List[Dict]: Solicitudes, de la más antigua a la más reciente.
+        """
+        return [self.como_dict(s) for s in range(max(inicio, self.primera), min(fin, self.total))]
+
+    def buscar_marca(self, desde: float) -> int:
+        """
+        Búsqueda binaria de la primera solicitud registrada en `desde` o después.
+
+        Args:
+            desde (float): Instante en segundos desde epoch.
+
+        Returns:
+            int: Número de secuencia (igual a `total` si no hay ninguna).
+        """
+        bajo, alto = self.primera, self.total
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self.marcas[medio % self.capacidad] < desde:
+                bajo = medio + 1
+            else:
+                alto = medio
+        return bajo
+
+    def consultar(self, filtros: Dict[str, str], inicio: int,
+                  limite: int) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Busca las solicitudes que cumplen todos los filtros a partir de una secuencia.
+
+        Si hay filtros se recorre solo el índice del más selectivo, de modo que el coste
+        depende del número de resultados y no del tamaño del registro.
+
+        Args:
+            filtros (Dict[str, str]): Valor exacto por campo (`ip`, `metodo`, `ruta`).
+            inicio (int): Primera secuencia a considerar.
+            limite (int): Máximo de solicitudes a retornar.
+
+        Returns:
+            Tuple[List[Dict], Optional[int]]: Solicitudes encontradas y secuencia de la
+                siguiente coincidencia (None si no hay más).
+        """
+        inicio = max(inicio, self.primera)
+        candidatos: Iterable[int]
+        if filtros:
+            try:
+                indice = min((self.indices[campo][valor] for campo, valor in filtros.items()), key=len)
+            except KeyError:
+                return [], None
+            candidatos = indice.desde(inicio)
+        else:
+            candidatos = range(inicio, self.total)
+
+        columnas = [(self._columnas[campo], valor) for campo, valor in filtros.items()]
+        resultado = []
+        for secuencia in candidatos:
+            posicion = secuencia % self.capacidad
+            if all(columna[posicion] == valor for columna, valor in columnas):
+                if len(resultado) == limite:
+                    return resultado, secuencia
+                resultado.append(self.como_dict(secuencia))
+        return resultado, None
@@ -0,0 +1,121 @@
+import socket
+import time
+from email.utils import formatdate
+from http import HTTPStatus
+from typing import Dict, Optional, Sequence, Union
+
+Cuerpo = Union[bytes, bytearray, memoryview]
+
+# Líneas de estado precalculadas para todos los códigos conocidos
+LINEAS_ESTADO: Dict[int, bytes] = {
+    estado.value: f"HTTP/1.1 {estado.value} {estado.phrase}\r\n".encode("ascii")
+    for estado in HTTPStatus
+}
+
+# Bloque de cabeceras que no cambia entre respuestas
+CABECERA_SERVIDOR = b"Server: PythonConcurrentServer/1.0\r\n"
+CONEXION_CERRAR = b"Connection: close\r\n"
+# Último trozo de una respuesta con Transfer-Encoding: chunked
+FIN_CHUNKED = b"0\r\n\r\n"
+
+MSG_MORE = getattr(socket, "MSG_MORE", 0)
+
+# Cabecera Date de la última marca de segundo: (segundo, bytes)
+_fecha_cache = (0, b"")
+
+
+def cabecera_fecha() -> bytes:
+    """
+    Retorna la cabecera `Date`, que se formatea como máximo una vez por segundo.
+
+    Returns:
+        bytes: Línea `Date: ...` terminada en CRLF.
+    """
+    global _fecha_cache
+    segundo = int(time.time())
+    cache = _fecha_cache
+    if cache[0] != segundo:
+        # La tupla se sustituye entera, por lo que otro hilo nunca ve un estado a medias
+        cache = (segundo, f"Date: {formatdate(segundo, usegmt=True)}\r\n".encode("ascii"))
+        _fecha_cache = cache
+    return cache[1]
+
+
+def cabecera_keepalive(timeout: float) -> bytes:
+    """
+    Precalcula el prefijo de las cabeceras de una conexión persistente; solo falta
+    añadir el número de solicitudes restantes.
+
+    Args:
+        timeout (float): Segundos de inactividad permitidos.
+
+    Returns:
+        bytes: Cabeceras `Connection` y `Keep-Alive` hasta `max=`.
+    """
+    return f"Connection: keep-alive\r\nKeep-Alive: timeout={timeout:g}, max=".encode("ascii")
+
+
+def construir_cabeceras(status_code: int, content_type: Optional[str], longitud: Optional[int],
+                        conexion: bytes, extra: Dict[str, str] = None) -> bytes:
+    """
+    Construye el bloque de cabeceras de una respuesta.
+
+    Args:
+        status_code (int): Código de estado HTTP.
+        content_type (str, optional): Tipo de contenido del cuerpo; None para omitirlo.
+        longitud (int, optional): Longitud del cuerpo en bytes; None para omitirla
+            (respuestas sin cuerpo como `304`).
+        conexion (bytes): Cabeceras de conexión ya formateadas, terminadas en CRLF.
+        extra (Dict[str, str], optional): Cabeceras adicionales.
+
+    Returns:
+        bytes: Línea de estado y cabeceras, incluida la línea vacía final.
+    """
+    linea = LINEAS_ESTADO.get(status_code)
+    if linea is None:
+        linea = f"HTTP/1.1 {status_code} Unknown\r\n".encode("ascii")
+    partes = [linea]
+    if content_type is not None:
+        partes += (b"Content-Type: ", content_type.encode("latin-1"), b"\r\n")
+    if longitud is not None:
+        partes += (b"Content-Length: ", str(longitud).encode("ascii"), b"\r\n")
+    partes += (cabecera_fecha(), CABECERA_SERVIDOR, conexion)
+    if extra:
+        for nombre, valor in extra.items():
+            partes.append(f"{nombre}: {valor}\r\n".encode("latin-1"))
+    partes.append(b"\r\n")
+    return b"".join(partes)
+
+
+def enviar_vectores(salida, partes: Sequence[Cuerpo], mas: bool = False) -> None:
+    """
+    Envía varios búferes con una sola llamada `sendmsg` (scatter-gather), de modo que
+    cabeceras y cuerpo salen juntos sin concatenarlos ni copiar el cuerpo.
+
+    Repite la llamada si el kernel acepta solo una parte. Las salidas sin `sendmsg`
+    (como el adaptador del motor asyncio en otros sistemas) usan `sendall` por búfer.
+
+    Args:
+        salida: Socket de la conexión u objeto con `sendall()`.
+        partes (Sequence[Cuerpo]): Búferes a enviar en orden.
+        mas (bool): Indica al kernel que siguen más datos (`MSG_MORE`), para que no
+            envíe un segmento TCP solo con las cabeceras.
+    """
+    pendientes = [memoryview(parte).cast("B") for parte in partes if len(parte)]
+    sendmsg = getattr(salida, "sendmsg", None)
+    if sendmsg is None:
+        for parte in pendientes:
+            salida.sendall(parte)
+        return
+
+    flags = MSG_MORE if mas else 0
+    while pendientes:
+        enviados = sendmsg(pendientes, (), flags)
+        while enviados:
+            primero = pendientes[0]
+            if enviados >= len(primero):
+                enviados -= len(primero)
+                pendientes.pop(0)
+            else:
+                pendientes[0] = primero[enviados:]
+                enviados = 0
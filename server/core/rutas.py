@@ -0,0 +1,303 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .parser import ErrorSolicitud
+
+
+def _entero(segmento: str) -> int:
+    """
+    Conversor de `<int:nombre>`: solo dígitos ASCII, sin signo ni espacios.
+
+    Raises:
+        ValueError: Si el segmento no es un entero no negativo.
+    """
+    if not (segmento.isascii() and segmento.isdigit()):
+        raise ValueError(f"Entero inválido: {segmento}")
+    return int(segmento)
+
+
+# Conversores de los parámetros de ruta: <nombre>, <int:nombre> y <path:nombre>
+CONVERSORES = {
+    "str": str,
+    "int": _entero,
+    "path": str,
+}
+
+
+class Ruta:
+    """
+    Destino de una ruta para un método HTTP: función síncrona y, opcionalmente,
+    su versión asíncrona para el motor asyncio.
+    """
+
+    __slots__ = ("funcion", "asincrona")
+
+    def __init__(self):
+        self.funcion: Optional[Callable] = None
+        self.asincrona: Optional[Callable] = None
+
+
+class _Nodo:
+    """
+    Nodo del árbol (trie) de rutas con parámetros, indexado por segmentos de la ruta.
+    """
+
+    __slots__ = ("hijos", "parametro", "resto", "metodos")
+
+    def __init__(self):
+        self.hijos: Dict[str, "_Nodo"] = {}
+        self.parametro: Optional[Tuple[str, Callable, "_Nodo"]] = None
+        self.resto: Optional[Tuple[str, "_Nodo"]] = None
+        self.metodos: Dict[str, Ruta] = {}
+
+
+class RegistroRutas:
+    """
+    Tabla de rutas del servidor con despacho en tiempo constante.
+
+    Las rutas sin parámetros se guardan en un diccionario; las que tienen parámetros
+    (`/sleep/<int:seconds>`) en un árbol de segmentos, de modo que el coste de resolver
+    una ruta no depende del número de endpoints registrados. Los manejadores se registran
+    con decoradores y reciben el `HTTPRequestHandler` como primer argumento y los
+    parámetros de la ruta como argumentos con nombre. Opcionalmente puede añadirse una
+    cadena de middleware, que no tiene coste alguno mientras esté vacía.
+
+    Orden de resolución:
+
+    1. Ruta exacta en el diccionario de rutas fijas.
+    2. Árbol de segmentos: en cada nivel un segmento literal tiene prioridad sobre un
+       parámetro `<nombre>`/`<int:nombre>`; si la rama literal no llega a una ruta
+       registrada se prueba la del parámetro.
+    3. Parámetro `<path:nombre>` del nivel, que recoge el resto de la ruta.
+
+    Errores (`ErrorSolicitud`): 404 si ninguna ruta coincide, 400 si la única
+    coincidencia es un parámetro cuyo conversor rechaza el segmento (`/sleep/abc` o
+    `/sleep/-1`: `<int:...>` solo admite dígitos) y 405 si la ruta existe pero no tiene
+    manejador para el método, o solo tiene la versión asíncrona y atiende el motor con
+    hilos. La cadena de middleware se ejecuta antes de resolver la ruta, así que
+    también ve las solicitudes que terminan en 404 o 405.
+    """
+
+    def __init__(self):
+        self._exactas: Dict[str, Dict[str, Ruta]] = {}
+        self._arbol = _Nodo()
+        self.middlewares: List[Callable] = []
+        self._cadena: Optional[Callable] = None
+
+    def ruta(self, patron: str, metodos=("GET",), asincrona: bool = False) -> Callable:
+        """
+        Decorador que registra un manejador para un patrón de ruta.
+
+        Args:
+            patron (str): Ruta, con parámetros opcionales (`/api/data/<int:id>`).
+            metodos (tuple): Métodos HTTP que atiende el manejador.
+            asincrona (bool): True si es la versión asíncrona (corrutina) para el motor asyncio.
+
+        Returns:
+            Callable: Decorador que devuelve la función sin modificarla.
+        """
+        def decorador(funcion: Callable) -> Callable:
+            for metodo in metodos:
+                self.agregar(metodo, patron, funcion, asincrona)
+            return funcion
+        return decorador
+
+    def get(self, patron: str, asincrona: bool = False) -> Callable:
+        """
+        Decorador que registra un manejador GET.
+
+        Args:
+            patron (str): Ruta a registrar.
+            asincrona (bool): True si es la versión asíncrona del manejador.
+
+        Returns:
+            Callable: Decorador.
+        """
+        return self.ruta(patron, ("GET",), asincrona)
+
+    def post(self, patron: str) -> Callable:
+        """
+        Decorador que registra un manejador POST.
+
+        Args:
+            patron (str): Ruta a registrar.
+
+        Returns:
+            Callable: Decorador.
+        """
+        return self.ruta(patron, ("POST",))
+
+    def agregar(self, metodo: str, patron: str, funcion: Callable, asincrona: bool = False) -> None:
+        """
+        Registra un manejador para un método y un patrón de ruta.
+
+        Args:
+            metodo (str): Método HTTP.
+            patron (str): Ruta, con parámetros opcionales.
+            funcion (Callable): Manejador.
+            asincrona (bool): True si es la versión asíncrona del manejador.
+        """
+        if "<" not in patron:
+            destinos = self._exactas.setdefault(patron, {})
+        else:
+            destinos = self._compilar(patron).metodos
+        ruta = destinos.setdefault(metodo, Ruta())
+        if asincrona:
+            ruta.asincrona = funcion
+        else:
+            ruta.funcion = funcion
+
+    def _compilar(self, patron: str) -> _Nodo:
+        """
+        Inserta un patrón con parámetros en el árbol de rutas.
+
+        Args:
+            patron (str): Ruta con parámetros.
+
+        Returns:
+            _Nodo: Nodo final del patrón.
+        """
+        nodo = self._arbol
+        segmentos = patron.strip("/").split("/")
+        for i, segmento in enumerate(segmentos):
+            if not (segmento.startswith("<") and segmento.endswith(">")):
+                nodo = nodo.hijos.setdefault(segmento, _Nodo())
+                continue
+
+            tipo, _, nombre = segmento[1:-1].rpartition(":")
+            tipo = tipo or "str"
+            if tipo not in CONVERSORES:
+                raise ValueError(f"Conversor de ruta desconocido: {tipo}")
+            if tipo == "path":
+                if i != len(segmentos) - 1:
+                    raise ValueError("Un parámetro <path:...> debe ser el último segmento")
+                if nodo.resto is None:
+                    nodo.resto = (nombre, _Nodo())
+                return nodo.resto[1]
+            if nodo.parametro is None:
+                nodo.parametro = (nombre, CONVERSORES[tipo], _Nodo())
+            elif nodo.parametro[0] != nombre or nodo.parametro[1] is not CONVERSORES[tipo]:
+                raise ValueError(f"Parámetro incompatible en el patrón {patron}")
+            nodo = nodo.parametro[2]
+        return nodo
+
+    def resolver(self, metodo: str, ruta: str) -> Tuple[Ruta, Dict]:
+        """
+        Busca el destino de una solicitud.
+
+        Args:
+            metodo (str): Método HTTP.
+            ruta (str): Ruta solicitada, sin query string.
+
+        Returns:
+            Tuple[Ruta, Dict]: Destino registrado y parámetros extraídos de la ruta.
+
+        Raises:
+            ErrorSolicitud: 404 si la ruta no existe, 405 si no admite el método y
+                400 si un parámetro no tiene el tipo esperado.
+        """
+        destinos = self._exactas.get(ruta)
+        parametros = {}
+        if destinos is None:
+            resultado = self._buscar(self._arbol, ruta.strip("/").split("/"), 0, parametros)
+            if resultado is None:
+                raise ErrorSolicitud(404, "Ruta no encontrada")
+            if resultado is False:
+                raise ErrorSolicitud(400, "Parámetro inválido")
+            destinos = resultado
+        destino = destinos.get(metodo)
+        if destino is None:
+            raise ErrorSolicitud(405, "Método no permitido")
+        return destino, parametros
+
+    def _buscar(self, nodo: _Nodo, segmentos: List[str], i: int, parametros: Dict):
+        """
+        Recorre el árbol de rutas; los segmentos literales tienen prioridad sobre los
+        parámetros.
+
+        Returns:
+            Dict | None | bool: Métodos del nodo encontrado, None si no hay coincidencia o
+                False si solo coincide con un parámetro de tipo incorrecto.
+        """
+        if i == len(segmentos):
+            return nodo.metodos or None
+
+        segmento = segmentos[i]
+        invalido = False
+        hijo = nodo.hijos.get(segmento)
+        if hijo is not None:
+            resultado = self._buscar(hijo, segmentos, i + 1, parametros)
+            if resultado:
+                return resultado
+            invalido = resultado is False
+
+        if nodo.parametro is not None and segmento:
+            nombre, conversor, hijo = nodo.parametro
+            try:
+                valor = conversor(segmento)
+            except ValueError:
+                invalido = True
+            else:
+                resultado = self._buscar(hijo, segmentos, i + 1, parametros)
+                if resultado:
+                    parametros[nombre] = valor
+                    return resultado
+                invalido = invalido or resultado is False
+
+        if nodo.resto is not None:
+            nombre, hijo = nodo.resto
+            if hijo.metodos:
+                parametros[nombre] = "/".join(segmentos[i:])
+                return hijo.metodos
+
+        return False if invalido else None
+
+    def usar(self, middleware: Callable) -> Callable:
+        """
+        Añade un middleware a la cadena. Puede usarse como decorador.
+
+        Un middleware recibe `(handler, solicitud, siguiente)` y llama a `siguiente()`
+        para continuar con el resto de la cadena y el manejador de la ruta.
+
+        Args:
+            middleware (Callable): Función middleware.
+
+        Returns:
+            Callable: El mismo middleware.
+        """
+        self.middlewares.append(middleware)
+        cadena = self._ejecutar
+        for actual in reversed(self.middlewares):
+            cadena = self._enlazar(actual, cadena)
+        self._cadena = cadena
+        return middleware
+
+    @staticmethod
+    def _enlazar(middleware: Callable, siguiente: Callable) -> Callable:
+        """
+        Envuelve un eslabón de la cadena de middleware.
+        """
+        def eslabon(handler, solicitud):
+            return middleware(handler, solicitud, lambda: siguiente(handler, solicitud))
+        return eslabon
+
+    def despachar(self, handler, solicitud) -> None:
+        """
+        Resuelve la solicitud y ejecuta su manejador a través de la cadena de middleware.
+
+        Args:
+            handler (HTTPRequestHandler): Manejador de la conexión.
+            solicitud (SolicitudHTTP): Solicitud ya analizada.
+        """
+        if self._cadena is None:
+            self._ejecutar(handler, solicitud)
+        else:
+            self._cadena(handler, solicitud)
+
+    def _ejecutar(self, handler, solicitud) -> None:
+        """
+        Resuelve la solicitud y llama al manejador síncrono de la ruta.
+        """
+        destino, parametros = self.resolver(solicitud.metodo, solicitud.ruta)
+        if destino.funcion is None:
+            raise ErrorSolicitud(405, "Método no permitido")
+        destino.funcion(handler, **parametros)
@@ -0,0 +1,125 @@
+import os
+import platform
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, NamedTuple, Optional
+
+import psutil
+
+from ..config import INTERVALO_MUESTREO_SISTEMA, logger
+
+
+class MuestraSistema(NamedTuple):
+    """
+    Métricas del sistema tomadas en un instante. El monitor no la modifica nunca: la
+    reemplaza por una nueva, así que un manejador puede usarla sin bloqueos.
+    """
+
+    marca: float  # time.time() de la muestra
+    recursos: Dict  # CPU y memoria, ya formateados para /status
+    threads: Dict  # Hilos del proceso
+
+
+class MonitorSistema:
+    """
+    Información del sistema para /status y /api/status.
+
+    Los datos que no cambian (sistema operativo, host, arquitectura, versión de Python,
+    núcleos y memoria total) se calculan una sola vez, al crear el monitor durante el
+    arranque. Los que cambian (memoria disponible, uso y
+    frecuencia de CPU, hilos) los toma un hilo de fondo cada `intervalo` segundos en
+    una `MuestraSistema` inmutable, de modo que responder a /status no llama a
+    `psutil` ni recorre los hilos.
+
+    El hilo arranca con la primera consulta de cada proceso, así cada worker pre-fork
+    tiene el suyo; esa primera consulta toma la muestra inicial en el momento y genera
+    el identificador del servidor, distinto en cada worker.
+    """
+
+    def __init__(self, intervalo: float = INTERVALO_MUESTREO_SISTEMA):
+        """
+        Calcula la información fija del sistema.
+
+        Args:
+            intervalo (float): Segundos entre muestras de las métricas.
+
+        Raises:
+            ValueError: Si el intervalo no es positivo.
+        """
+        if not intervalo > 0:
+            raise ValueError(f"El intervalo de muestreo debe ser positivo: {intervalo}")
+        self.intervalo = intervalo
+        self.muestras = 0
+        memoria_total = psutil.virtual_memory().total
+        psutil.cpu_percent(interval=None)  # Referencia para el uso de CPU de la primera muestra
+        self.sistema = {
+            "sistema_operativo": platform.platform(),
+            "nombre_host": socket.gethostname(),
+            "arquitectura": platform.machine(),
+            "version_python": platform.python_version(),
+        }
+        self._recursos_fijos = {
+            "cpu_cores": psutil.cpu_count(),
+            "memoria_total": f"{memoria_total / (1024**3):.2f} GB",
+        }
+        self._muestra: Optional[MuestraSistema] = None
+        self._lock = threading.Lock()
+        self._hilo: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None  # Proceso que lanzó el hilo
+
+    def muestra(self) -> MuestraSistema:
+        """
+        Retorna la última muestra de las métricas.
+
+        Returns:
+            MuestraSistema: Muestra más reciente; como mucho `intervalo` segundos antigua.
+        """
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # Primera consulta en este proceso: un fork no hereda el hilo
+                    self.sistema["uuid_servidor"] = str(uuid.uuid4())
+                    self.muestrear()
+                    self._hilo = threading.Thread(target=self._vigilar, name="MonitorSistema",
+                                                  daemon=True)
+                    self._hilo.start()
+                    self._pid = os.getpid()
+        return self._muestra
+
+    def muestrear(self) -> None:
+        """
+        Toma una muestra nueva y reemplaza la anterior.
+        """
+        memoria = psutil.virtual_memory()
+        frecuencia = psutil.cpu_freq()  # None si la plataforma no la expone
+        hilos = threading.enumerate()
+        self._muestra = MuestraSistema(
+            marca=time.time(),
+            recursos={
+                **self._recursos_fijos,
+                "cpu_frecuencia": f"{frecuencia.current:.2f} MHz" if frecuencia else "N/A",
+                # Uso desde la muestra anterior; sin bloquear
+                "cpu_porcentaje": f"{psutil.cpu_percent(interval=None)}%",
+                "memoria_disponible": f"{memoria.available / (1024**3):.2f} GB",
+                "memoria_porcentaje": f"{memoria.percent}%",
+            },
+            threads={
+                "threads_activos": len(hilos),
+                "threads_daemon": sum(1 for hilo in hilos if hilo.daemon),
+                "proceso_pid": os.getpid(),
+            },
+        )
+        self.muestras += 1
+
+    def _vigilar(self) -> None:
+        """
+        Bucle del hilo de muestreo.
+        """
+        while True:
+            time.sleep(self.intervalo)
+            try:
+                self.muestrear()
+            except Exception as e:
+                logger.error(f"Error muestreando las métricas del sistema: {e}")
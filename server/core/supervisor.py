@@ -0,0 +1,166 @@
+import os
+import signal
+import socket
+import time
+from typing import Callable, Dict
+
+from ..config import logger
+from .estadisticas import TablaEstadisticas
+
+# En Linux el kernel reparte las conexiones entre sockets con SO_REUSEPORT;
+# en otros sistemas los workers comparten el socket heredado del supervisor.
+REPARTO_KERNEL = hasattr(socket, "SO_REUSEPORT") and os.uname().sysname == "Linux"
+
+
+def crear_socket_escucha(direccion: tuple, reuse_port: bool = False) -> socket.socket:
+    """
+    Crea un socket TCP enlazado y en escucha.
+
+    Args:
+        direccion (tuple): Tupla con (host, puerto).
+        reuse_port (bool): Activa SO_REUSEPORT para compartir el puerto entre procesos.
+
+    Returns:
+        socket.socket: Socket en escucha.
+    """
+    return socket.create_server(direccion, backlog=1024, reuse_port=reuse_port)
+
+
+class Supervisor:
+    """
+    Proceso supervisor del modo pre-fork.
+
+    Lanza N procesos worker con `os.fork()`, cada uno con su propio servidor HTTP
+    escuchando en el mismo puerto, y los relanza si terminan inesperadamente. Crea
+    antes del fork la tabla de estadísticas compartida en la que cada worker publica
+    sus contadores, para que `/api/status` pueda informar de los totales del servidor.
+    """
+
+    def __init__(self, direccion: tuple, num_workers: int,
+                 objetivo: Callable[[int, socket.socket, TablaEstadisticas], None],
+                 estadisticas: TablaEstadisticas = None):
+        """
+        Inicializa el supervisor.
+
+        Args:
+            direccion (tuple): Tupla con (host, puerto) donde escucharán los workers.
+            num_workers (int): Número de procesos worker.
+            objetivo (Callable): Función que ejecuta cada worker; recibe su índice, el
+                socket en escucha y la tabla de estadísticas compartida.
+            estadisticas (TablaEstadisticas, optional): Tabla ya creada (por ejemplo, en
+                memoria compartida con nombre). Por defecto, memoria anónima.
+        """
+        self.direccion = direccion
+        self.num_workers = num_workers
+        self.objetivo = objetivo
+        self.estadisticas = estadisticas or TablaEstadisticas(num_workers)
+        self.workers: Dict[int, int] = {}  # pid -> índice de worker
+        self._inicios: Dict[int, float] = {}  # índice -> instante del último arranque
+        self._socket_compartido = None
+        self._activo = False
+
+    def ejecutar(self) -> None:
+        """
+        Lanza los workers y los supervisa hasta recibir Ctrl+C o SIGTERM.
+        """
+        if REPARTO_KERNEL:
+            # Comprobar que el puerto está libre antes de lanzar workers que fallarían en bucle
+            crear_socket_escucha(self.direccion, reuse_port=True).close()
+        else:
+            self._socket_compartido = crear_socket_escucha(self.direccion)
+
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        self._activo = True
+        logger.info(f"Supervisor {os.getpid()} lanzando {self.num_workers} workers")
+        for indice in range(self.num_workers):
+            self._lanzar(indice)
+
+        try:
+            while self._activo:
+                pid, estado = os.waitpid(-1, 0)
+                indice = self.workers.pop(pid, None)
+                if indice is None:
+                    continue
+                logger.warning(
+                    f"Worker {indice} (pid {pid}) terminó con código "
+                    f"{os.waitstatus_to_exitcode(estado)}, relanzando"
+                )
+                self.estadisticas.reiniciar_worker(indice)
+                # Evitar relanzar en bucle un worker que falla nada más arrancar
+                if time.monotonic() - self._inicios[indice] < 1:
+                    time.sleep(1)
+                self._lanzar(indice)
+        except KeyboardInterrupt:
+            logger.info("Detención solicitada, parando workers.")
+        finally:
+            self.detener()
+
+    def _lanzar(self, indice: int) -> None:
+        """
+        Crea un proceso worker con `os.fork()`.
+
+        Args:
+            indice (int): Índice del worker a lanzar.
+        """
+        pid = os.fork()
+        if pid == 0:
+            codigo = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.default_int_handler)
+                if self._socket_compartido is not None:
+                    sock = self._socket_compartido
+                    # Otro worker puede aceptar primero la conexión: accept() no debe bloquear
+                    sock.setblocking(False)
+                else:
+                    sock = crear_socket_escucha(self.direccion, reuse_port=True)
+                self.objetivo(indice, sock, self.estadisticas)
+            except KeyboardInterrupt:
+                pass
+            except BaseException:
+                logger.error(f"Error en el worker {indice}", exc_info=True)
+                codigo = 1
+            finally:
+                os._exit(codigo)
+
+        self.workers[pid] = indice
+        self._inicios[indice] = time.monotonic()
+        logger.info(f"Worker {indice} iniciado con pid {pid}")
+
+    def detener(self, espera: float = 5.0) -> None:
+        """
+        Envía SIGTERM a los workers y espera a que terminen; los que no lo hagan
+        en el plazo indicado reciben SIGKILL.
+
+        Args:
+            espera (float): Segundos de espera antes de forzar la terminación.
+        """
+        self._activo = False
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        limite = time.monotonic() + espera
+        while self.workers and time.monotonic() < limite:
+            for pid in list(self.workers):
+                try:
+                    terminado, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    terminado = pid
+                if terminado:
+                    self.workers.pop(pid)
+            time.sleep(0.05)
+
+        for pid in self.workers:
+            logger.warning(f"Worker con pid {pid} no terminó a tiempo, forzando")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.workers.clear()
+
+        if self._socket_compartido is not None:
+            self._socket_compartido.close()
+        logger.info("Supervisor detenido.")
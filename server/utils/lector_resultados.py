@@ -0,0 +1,363 @@
+import json
+import math
+import re
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+from ..config import PRECISION_PERCENTILES, TAMANO_BLOQUE_RESULTADOS
+
+_ESPACIOS = re.compile(r"[ \t\n\r]*")
+_SEPARADOR = re.compile(r"[ \t\n\r]*,?[ \t\n\r]*")
+_DECODIFICADOR = json.JSONDecoder()
+
+
+class LectorResultados:
+    """
+    Lector incremental de un archivo de resultados de `client.py`.
+
+    El archivo es un único objeto JSON cuyo campo `resultados_detallados` es una lista
+    con un registro por solicitud; en las pruebas largas ocupa casi todo el archivo.
+    El lector lo recorre por bloques de `tamano_bloque` caracteres y decodifica cada
+    valor con `json.JSONDecoder.raw_decode`: los campos de primer nivel (`timestamp`,
+    `configuracion`, `analisis`...) se guardan en `campos` y los registros de
+    `resultados_detallados` se entregan de uno en uno, de modo que la memoria usada
+    no depende del tamaño del archivo.
+
+    Uso:
+        with LectorResultados(ruta) as lector:
+            for resultado in lector.resultados():
+                ...
+            analisis = lector.campos["analisis"]
+
+    `client.py` escribe `analisis` antes que los resultados, así que `leer_campos`
+    lo obtiene sin recorrer la lista. Los campos que aparezcan después de la lista
+    solo están en `campos` una vez recorrida.
+
+    Los archivos cuyo primer nivel es una lista de pruebas (formato antiguo) se leen
+    enteros y se toma la última prueba.
+    """
+
+    def __init__(self, ruta: str, tamano_bloque: int = TAMANO_BLOQUE_RESULTADOS):
+        """
+        Abre el archivo de resultados.
+
+        Args:
+            ruta (str): Archivo de resultados.
+            tamano_bloque (int): Caracteres leídos de cada vez.
+
+        Raises:
+            OSError: Si el archivo no puede abrirse.
+        """
+        self.ruta = ruta
+        self.tamano_bloque = tamano_bloque
+        self.campos: Dict = {}
+        self._archivo = open(ruta, "r", encoding="utf-8")
+        self._buffer = ""
+        self._pos = 0
+        self._agotado = False
+        self._estado = "inicio"  # inicio -> campos -> detalles -> campos -> fin
+        self._detalles_antiguos: List[Dict] = []
+
+    def __enter__(self) -> "LectorResultados":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.cerrar()
+
+    def cerrar(self) -> None:
+        """
+        Cierra el archivo.
+        """
+        self._archivo.close()
+
+    def leer_campos(self) -> Dict:
+        """
+        Lee los campos de primer nivel hasta llegar a `resultados_detallados` (o al
+        final del objeto).
+
+        Returns:
+            Dict: Campos leídos hasta el momento, sin `resultados_detallados`.
+
+        Raises:
+            ValueError: Si el archivo no es JSON válido o está incompleto.
+        """
+        if self._estado == "inicio":
+            self._abrir()
+        while self._estado == "campos":
+            caracter = self._caracter()
+            if caracter == "}":
+                self._pos += 1
+                self._estado = "fin"
+            elif caracter == ",":
+                self._pos += 1
+            elif caracter == "":
+                raise ValueError(f"Archivo de resultados incompleto: {self.ruta}")
+            else:
+                clave = self._valor()
+                if not isinstance(clave, str):
+                    raise ValueError(f"Clave no válida en {self.ruta}: {clave!r}")
+                self._esperar(":")
+                if clave == "resultados_detallados" and self._caracter() == "[":
+                    self._pos += 1
+                    self._estado = "detalles"
+                else:
+                    self.campos[clave] = self._valor()
+        return self.campos
+
+    def resultados(self) -> Iterator[Dict]:
+        """
+        Recorre `resultados_detallados` sin cargar la lista entera.
+
+        Yields:
+            Dict: Registro de cada solicitud (`url`, `metodo`, `status_code`,
+                `tiempo_segundos`, `exito`...).
+
+        Raises:
+            ValueError: Si el archivo no es JSON válido o está incompleto.
+        """
+        self.leer_campos()
+        if self._detalles_antiguos:
+            yield from self._detalles_antiguos
+            self._detalles_antiguos = []
+        decodificar = _DECODIFICADOR.raw_decode
+        while self._estado == "detalles":
+            # Camino rápido: separador y registro completo dentro del buffer (el cierre
+            # de un objeto nunca queda cortado, así que no hace falta leer más)
+            inicio = _SEPARADOR.match(self._buffer, self._pos).end()
+            if inicio < len(self._buffer) and self._buffer[inicio] == "{":
+                try:
+                    valor, self._pos = decodificar(self._buffer, inicio)
+                except json.JSONDecodeError:
+                    pass
+                else:
+                    yield valor
+                    continue
+            caracter = self._caracter()
+            if caracter == "]":
+                self._pos += 1
+                self._estado = "campos"
+                self.leer_campos()
+            elif caracter == ",":
+                self._pos += 1
+            elif caracter == "":
+                raise ValueError(f"Archivo de resultados incompleto: {self.ruta}")
+            else:
+                yield self._valor()
+
+    def _abrir(self) -> None:
+        """
+        Consume el inicio del objeto de primer nivel.
+        """
+        caracter = self._caracter()
+        if caracter == "[":
+            # Formato antiguo: lista de pruebas; se decodifica entera
+            pruebas = json.loads(self._buffer[self._pos:] + self._archivo.read())
+            prueba = pruebas[-1] if pruebas and isinstance(pruebas[-1], dict) else {}
+            self._detalles_antiguos = prueba.pop("resultados_detallados", None) or []
+            self.campos.update(prueba)
+            self._estado = "fin"
+        elif caracter == "{":
+            self._pos += 1
+            self._estado = "campos"
+        else:
+            raise ValueError(f"No es un archivo de resultados: {self.ruta}")
+
+    def _rellenar(self) -> bool:
+        """
+        Descarta lo ya consumido del buffer y añade un bloque del archivo. Cada bloque
+        es al menos tan grande como lo pendiente, para que un valor muy largo no se
+        decodifique desde el principio una vez por bloque.
+
+        Returns:
+            bool: False si el archivo ya se ha leído entero.
+        """
+        if self._agotado:
+            return False
+        pendiente = self._buffer[self._pos:]
+        bloque = self._archivo.read(max(self.tamano_bloque, len(pendiente)))
+        if not bloque:
+            self._agotado = True
+            return False
+        self._buffer = pendiente + bloque
+        self._pos = 0
+        return True
+
+    def _caracter(self) -> str:
+        """
+        Salta los espacios y retorna el siguiente carácter sin consumirlo ("" al final).
+        """
+        while True:
+            self._pos = _ESPACIOS.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._rellenar():
+                return ""
+
+    def _esperar(self, esperado: str) -> None:
+        """
+        Consume un carácter de puntuación.
+        """
+        if self._caracter() != esperado:
+            raise ValueError(f"Se esperaba {esperado!r} en {self.ruta}")
+        self._pos += 1
+
+    def _valor(self):
+        """
+        Decodifica el siguiente valor JSON, leyendo más bloques si está cortado.
+        """
+        self._caracter()
+        while True:
+            try:
+                valor, fin = _DECODIFICADOR.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._rellenar():
+                    continue
+                raise
+            # Un número al final del buffer puede seguir en el bloque siguiente
+            if fin == len(self._buffer) and self._rellenar():
+                continue
+            self._pos = fin
+            return valor
+
+
+class HistogramaLatencias:
+    """
+    Histograma logarítmico de tiempos para calcular percentiles con memoria acotada.
+
+    Cada cubeta cubre un intervalo `[b^i, b^(i+1))` con `b = (1 + p) / (1 - p)`,
+    donde `p` es `precision`; el percentil se aproxima con el punto medio de su
+    cubeta, así que el error relativo es como mucho `p` (1 % por defecto). Solo se
+    guardan las cubetas con algún valor: unas pocas decenas para tiempos de entre
+    milisegundos y segundos, con independencia del número de valores.
+    """
+
+    __slots__ = ("cubetas", "cantidad", "suma", "minimo", "maximo", "_log_base")
+
+    def __init__(self, precision: float = PRECISION_PERCENTILES):
+        """
+        Crea un histograma vacío.
+
+        Args:
+            precision (float): Error relativo máximo de los percentiles.
+        """
+        self.cubetas: Dict[int, int] = {}
+        self.cantidad = 0
+        self.suma = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self._log_base = math.log((1 + precision) / (1 - precision))
+
+    def agregar(self, valor: float) -> None:
+        """
+        Añade un tiempo al histograma.
+
+        Args:
+            valor (float): Tiempo en segundos.
+        """
+        # Los tiempos nulos o negativos van a la cubeta del microsegundo
+        indice = math.floor(math.log(valor if valor > 1e-6 else 1e-6) / self._log_base)
+        self.cubetas[indice] = self.cubetas.get(indice, 0) + 1
+        self.cantidad += 1
+        self.suma += valor
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def percentil(self, fraccion: float) -> Optional[float]:
+        """
+        Aproxima un percentil con el mismo criterio que `client.py`: el valor en la
+        posición `int(n * fraccion)` de los tiempos ordenados.
+
+        Args:
+            fraccion (float): Percentil entre 0 y 1 (0.99 para el p99).
+
+        Returns:
+            float | None: Tiempo en segundos, o None si el histograma está vacío.
+        """
+        if not self.cantidad:
+            return None
+        posicion = min(int(self.cantidad * fraccion), self.cantidad - 1)
+        acumulado = 0
+        for indice in sorted(self.cubetas):
+            acumulado += self.cubetas[indice]
+            if acumulado > posicion:
+                valor = math.exp((indice + 0.5) * self._log_base)
+                return min(max(valor, self.minimo), self.maximo)
+        return self.maximo
+
+    def resumen(self) -> Dict:
+        """
+        Retorna el número de valores, el promedio, los extremos y los percentiles.
+
+        Returns:
+            Dict: `solicitudes`, `promedio`, `minimo`, `maximo`, `p50`, `p90`, `p95`
+                y `p99` en segundos.
+        """
+        if not self.cantidad:
+            return {"solicitudes": 0}
+        return {
+            "solicitudes": self.cantidad,
+            "promedio": self.suma / self.cantidad,
+            "minimo": self.minimo,
+            "maximo": self.maximo,
+            "p50": self.percentil(0.5),
+            "p90": self.percentil(0.9),
+            "p95": self.percentil(0.95),
+            "p99": self.percentil(0.99),
+        }
+
+
+def resumir_por_url(resultados: Iterable[Dict]) -> Dict[str, Dict]:
+    """
+    Calcula tiempos y percentiles por endpoint recorriendo los resultados una sola vez.
+
+    Las solicitudes se agrupan por método y ruta, sin la query string (todas las
+    `/sleep?segundos=N` cuentan como `GET /sleep`). La memoria usada depende del
+    número de endpoints, no del de solicitudes.
+
+    Los registros que no son un objeto se descartan; los que no tienen un
+    `tiempo_segundos` numérico y finito cuentan en `exitosas` y `codigos_respuesta`
+    pero no en los tiempos, y se suman en `sin_tiempo`.
+
+    Args:
+        resultados (Iterable[Dict]): Registros de `resultados_detallados`, por ejemplo
+            los de `LectorResultados.resultados()`.
+
+    Returns:
+        Dict[str, Dict]: Para cada "MÉTODO /ruta", el resumen de su histograma más
+            `exitosas`, `sin_tiempo` y `codigos_respuesta`.
+    """
+    # Endpoint -> [histograma, exitosas, sin tiempo, códigos de respuesta]
+    acumulados: Dict[str, list] = {}
+    endpoints: Dict[tuple, str] = {}  # (método, url) -> endpoint, para no analizar cada URL
+    for resultado in resultados:
+        if not isinstance(resultado, dict):
+            continue
+        clave = (str(resultado.get("metodo", "?")), str(resultado.get("url", "")))
+        endpoint = endpoints.get(clave)
+        if endpoint is None:
+            endpoint = f"{clave[0]} {urlsplit(clave[1]).path or '/'}"
+            if len(endpoints) < 4096:
+                endpoints[clave] = endpoint
+        acumulado = acumulados.get(endpoint)
+        if acumulado is None:
+            acumulado = acumulados[endpoint] = [HistogramaLatencias(), 0, 0, {}]
+        tiempo = resultado.get("tiempo_segundos")
+        if type(tiempo) in (float, int) and math.isfinite(tiempo):
+            acumulado[0].agregar(tiempo)
+        else:
+            acumulado[2] += 1
+        if resultado.get("exito"):
+            acumulado[1] += 1
+        codigo = str(resultado.get("status_code"))
+        acumulado[3][codigo] = acumulado[3].get(codigo, 0) + 1
+
+    resumen = {}
+    for endpoint in sorted(acumulados):
+        histograma, exitosas, sin_tiempo, codigos = acumulados[endpoint]
+        resumen[endpoint] = histograma.resumen()
+        resumen[endpoint]["exitosas"] = exitosas
+        resumen[endpoint]["sin_tiempo"] = sin_tiempo
+        resumen[endpoint]["codigos_respuesta"] = codigos
+    return resumen
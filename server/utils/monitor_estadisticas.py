@@ -0,0 +1,79 @@
+"""
+Monitor de estadísticas del servidor
+------------------------------------
+Lee los contadores que el servidor publica en memoria compartida (opción `--stats-shm`
+de main.py) sin hacer ninguna petición HTTP.
+
+Uso:
+    python -m server.utils.monitor_estadisticas --nombre servidor_http_stats --intervalo 1
+"""
+
+import argparse
+import json
+import time
+
+from ..core.estadisticas import TablaEstadisticasCompartida
+
+
+def mostrar(tabla: TablaEstadisticasCompartida, formato_json: bool = False) -> None:
+    """
+    Imprime los totales y el detalle por worker.
+
+    Args:
+        tabla (TablaEstadisticasCompartida): Tabla abierta en modo lectura.
+        formato_json (bool): Si True, imprime una línea JSON en lugar de una tabla.
+    """
+    totales = tabla.totales()
+    workers = tabla.por_worker()
+    if formato_json:
+        print(json.dumps({"timestamp": time.time(), **totales, "workers": workers}))
+        return
+
+    print(time.strftime("%Y-%m-%d %H:%M:%S"), " ".join(f"{k}={v}" for k, v in totales.items()))
+    for worker in workers:
+        print("   ", " ".join(f"{k}={v}" for k, v in worker.items()))
+
+
+def main():
+    """Función principal del monitor."""
+    parser = argparse.ArgumentParser(
+        description="Lee las estadísticas del servidor desde memoria compartida"
+    )
+    parser.add_argument(
+        "--nombre",
+        required=True,
+        help="Nombre del segmento indicado con --stats-shm al arrancar el servidor",
+    )
+    parser.add_argument(
+        "--intervalo",
+        type=float,
+        default=0,
+        help="Segundos entre lecturas; 0 para leer una sola vez (por defecto: 0)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Imprime cada lectura como una línea JSON",
+    )
+    args = parser.parse_args()
+
+    try:
+        tabla = TablaEstadisticasCompartida.abrir(args.nombre)
+    except FileNotFoundError:
+        parser.exit(1, f"No existe el segmento '{args.nombre}': ¿está el servidor en marcha?\n")
+    except ValueError as e:
+        parser.exit(1, f"{e}\n")
+
+    try:
+        mostrar(tabla, args.json)
+        while args.intervalo > 0:
+            time.sleep(args.intervalo)
+            mostrar(tabla, args.json)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        tabla.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import hashlib
+import html
+import os
+import re
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from ..config import DIRECTORIO_ACTIVOS, DIRECTORIO_PLANTILLAS, PREFIJO_ACTIVOS
+
+# Huecos de las plantillas: {{ nombre }} se escapa; {{ nombre|safe }} se inserta tal cual
+_HUECO = re.compile(r"\{\{\s*(\w+)\s*(\|\s*safe\s*)?\}\}")
+# Caracteres que html.escape sustituye
+_ESPECIALES = "&<>\"'"
+_ESPECIALES_BYTES = _ESPECIALES.encode()
+_hay_especiales = re.compile("[" + re.escape(_ESPECIALES) + "]").search
+
+
+def escapar(valor) -> str:
+    """
+    Convierte un valor en texto escapado para HTML.
+
+    Args:
+        valor: Valor a insertar en la página.
+
+    Returns:
+        str: Texto escapado.
+    """
+    return html.escape(str(valor))
+
+
+def a_bytes(fragmento) -> bytes:
+    """
+    Codifica un fragmento HTML ya renderizado (hueco `|safe`).
+
+    Args:
+        fragmento (str | bytes): Fragmento HTML.
+
+    Returns:
+        bytes: Fragmento codificado en UTF-8.
+    """
+    return fragmento if type(fragmento) is bytes else str(fragmento).encode()
+
+
+class Plantilla:
+    """
+    Plantilla HTML precompilada.
+
+    Al crearla, el texto se divide en segmentos estáticos ya codificados en UTF-8 y en
+    huecos con nombre, y se compila una función de Python que intercala los segmentos
+    con los valores codificados y une los bytes, de modo que renderizar no vuelve a
+    analizar, formatear ni codificar el HTML fijo. Los valores se escapan para HTML
+    solo si alguno contiene caracteres especiales, salvo los huecos marcados con
+    `|safe`, que reciben fragmentos ya renderizados.
+    """
+
+    __slots__ = ("huecos", "renderizar", "_formato", "_especiales")
+
+    def __init__(self, texto: str):
+        """
+        Compila la plantilla.
+
+        Args:
+            texto (str): HTML con huecos `{{ nombre }}` o `{{ nombre|safe }}`.
+        """
+        trozos = _HUECO.split(texto)
+        segmentos = trozos[0::3]
+        self.huecos: List[str] = trozos[1::3]
+        seguros = [bool(marca) for marca in trozos[2::3]]
+        self.renderizar: Callable[..., bytes] = self._compilar(segmentos, seguros)
+        # Versión con formato % para renderizar muchas filas de una vez
+        self._formato = "%s".join(segmento.replace("%", "%%") for segmento in segmentos)
+        self._especiales = sum("".join(segmentos).count(c) for c in _ESPECIALES)
+
+    def _compilar(self, segmentos: List[str], seguros: List[bool]) -> Callable[..., bytes]:
+        """
+        Genera la función que renderiza la plantilla.
+
+        La función recibe el valor de cada hueco por nombre y devuelve el HTML en
+        bytes. Para `<h1>{{ titulo }}</h1>` el código generado equivale a:
+
+            def renderizar(**v):
+                h0 = v["titulo"]
+                if _hay_especiales(f"{h0}"):
+                    h0 = _escapar(h0)
+                return b"".join((s0, f"{h0}".encode(), s1))
+
+        Args:
+            segmentos (List[str]): Texto fijo entre huecos.
+            seguros (List[bool]): Si cada hueco se inserta sin escapar.
+
+        Returns:
+            Callable[..., bytes]: Función de renderizado.
+
+        Raises:
+            KeyError: (en la función generada) si falta el valor de algún hueco.
+        """
+        entorno = {"_hay_especiales": _hay_especiales, "_escapar": escapar, "_a_bytes": a_bytes}
+        entorno.update({f"s{i}": segmento.encode() for i, segmento in enumerate(segmentos)})
+        escapables = [f"h{i}" for i, seguro in enumerate(seguros) if not seguro]
+
+        codigo = ["def renderizar(**v):"]
+        codigo += [f"    h{i} = v[{nombre!r}]" for i, nombre in enumerate(self.huecos)]
+        if escapables:
+            codigo.append(f"    if _hay_especiales(f\"{''.join('{%s}' % h for h in escapables)}\"):")
+            codigo += [f"        {h} = _escapar({h})" for h in escapables]
+        partes = ["s0"]
+        for i, seguro in enumerate(seguros):
+            partes.append(f"_a_bytes(h{i})" if seguro else f"f\"{{h{i}}}\".encode()")
+            partes.append(f"s{i + 1}")
+        codigo.append(f"    return b\"\".join(({', '.join(partes)},))")
+        exec(compile("\n".join(codigo), "<plantilla>", "exec"), entorno)
+        return entorno["renderizar"]
+
+    def renderizar_filas(self, filas: Iterable[tuple]) -> bytes:
+        """
+        Renderiza la plantilla una vez por fila y une el resultado.
+
+        Pensado para tablas largas: todas las filas se formatean en una sola pasada y,
+        en lugar de revisar cada valor, se comprueba si el resultado contiene más
+        caracteres especiales que los de los segmentos fijos; solo entonces se escapa
+        valor a valor.
+
+        Args:
+            filas (Iterable[tuple]): Valores de los huecos de cada fila, en el orden en
+                que aparecen en la plantilla.
+
+        Returns:
+            bytes: Fragmento HTML con todas las filas, para un hueco `|safe`.
+        """
+        filas = filas if isinstance(filas, list) else list(filas)
+        formato = self._formato
+        html_filas = "".join([formato % fila for fila in filas]).encode()
+        # Una sola pasada en C: bytes eliminados al quitar los caracteres especiales
+        especiales = len(html_filas) - len(html_filas.translate(None, _ESPECIALES_BYTES))
+        if especiales != self._especiales * len(filas):
+            html_filas = "".join([formato % tuple(map(escapar, fila)) for fila in filas]).encode()
+        return html_filas
+
+    def dividir(self, hueco: str, **valores) -> Tuple[bytes, bytes]:
+        """
+        Renderiza la plantilla partida en dos por un hueco `|safe`, para enviar la
+        cabecera de la página antes de generar el contenido de ese hueco (streaming).
+
+        Args:
+            hueco (str): Nombre del hueco por el que se divide.
+            **valores: Valores del resto de huecos.
+
+        Returns:
+            Tuple[bytes, bytes]: HTML anterior y posterior al hueco.
+        """
+        marca = b"\0%s\0" % hueco.encode()
+        cabeza, _, cola = self.renderizar(**valores, **{hueco: marca}).partition(marca)
+        return cabeza, cola
+
+
+def cargar_plantilla(nombre: str) -> Plantilla:
+    """
+    Lee y compila una plantilla del directorio de plantillas.
+
+    Args:
+        nombre (str): Nombre del archivo, por ejemplo "status.html".
+
+    Returns:
+        Plantilla: Plantilla compilada.
+    """
+    with open(os.path.join(DIRECTORIO_PLANTILLAS, nombre), encoding="utf-8") as f:
+        return Plantilla(f.read())
+
+
+def url_activo(nombre: str) -> str:
+    """
+    Retorna la URL de un archivo de `server/static` con su versión en la query string.
+
+    La versión es el hash del contenido, de modo que el navegador puede guardar el
+    archivo en caché indefinidamente y aun así recibe la versión nueva si cambia.
+
+    Args:
+        nombre (str): Nombre del archivo, por ejemplo "app.css".
+
+    Returns:
+        str: URL versionada, por ejemplo "/static/app.css?v=1a2b3c4d".
+    """
+    with open(os.path.join(DIRECTORIO_ACTIVOS, nombre), "rb") as f:
+        version = hashlib.blake2b(f.read(), digest_size=4).hexdigest()
+    return f"{PREFIJO_ACTIVOS}/{nombre}?v={version}"
+
+
+# Valores comunes a todas las páginas
+GLOBALES: Dict[str, str] = {"css": url_activo("app.css")}
@@ -0,0 +1,395 @@
+import fnmatch
+import json
+import math
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from ..config import (
+    INDICE_RESULTADOS,
+    INTERVALO_VIGILANCIA_RESULTADOS,
+    PATRON_RESULTADOS,
+    logger,
+)
+from .lector_resultados import LectorResultados, resumir_por_url
+
+# (ruta, mtime en ns, tamaño): identifica una versión concreta de un archivo
+ClaveArchivo = Tuple[str, int, int]
+
+# Versión de las entradas del índice; las de otra versión se recalculan
+VERSION_INDICE = 2
+
+
+def leer_resumen(ruta: str) -> Dict:
+    """
+    Lee el resumen (`analisis`) de un archivo de resultados de `client.py`. Con los
+    archivos de `client.py` solo se lee el principio, no los resultados detallados.
+
+    Args:
+        ruta (str): Archivo de resultados.
+
+    Returns:
+        Dict: Resumen de la prueba; vacío si el archivo no lo tiene.
+
+    Raises:
+        OSError, ValueError: Si el archivo no puede leerse o no es JSON válido.
+    """
+    with LectorResultados(ruta) as lector:
+        campos = lector.leer_campos()
+        if "analisis" not in campos:
+            for _ in lector.resultados():
+                pass
+    return lector.campos.get("analisis", {})
+
+
+def resumir_archivo(ruta: str) -> Dict:
+    """
+    Lee un archivo de resultados de `client.py` y retorna la entrada que se guarda en
+    el índice: el `analisis`, la configuración de la prueba, los tiempos por endpoint
+    (`resumir_por_url`) y la identidad del archivo.
+
+    El archivo se recorre una sola vez con `LectorResultados`, sin cargar los
+    resultados detallados en memoria, y se valida entero: uno a medio escribir, o
+    cuyos `timestamp`, `analisis` o `configuracion` no tienen el tipo esperado, lanza
+    ValueError.
+
+    Los archivos anteriores a que `client.py` guardase su configuración no tienen
+    `configuracion` (tipo de prueba y concurrencia) ni `solicitudes_por_segundo`.
+
+    Args:
+        ruta (str): Archivo de resultados.
+
+    Returns:
+        Dict: Entrada del índice.
+
+    Raises:
+        OSError, ValueError: Si el archivo no puede leerse o no es JSON válido.
+    """
+    estado = os.stat(ruta)
+    with LectorResultados(ruta) as lector:
+        por_url = resumir_por_url(lector.resultados())
+    campos = lector.campos
+    timestamp = campos.get("timestamp", estado.st_mtime)
+    analisis = campos.get("analisis", {})
+    configuracion = campos.get("configuracion")
+    if type(timestamp) not in (float, int) or not math.isfinite(timestamp):
+        raise ValueError(f"timestamp no válido: {timestamp!r}")
+    if not isinstance(analisis, dict) or not isinstance(configuracion, (dict, type(None))):
+        raise ValueError("analisis o configuracion no son objetos")
+    return {
+        "version": VERSION_INDICE,
+        "archivo": os.path.basename(ruta),
+        "mtime_ns": estado.st_mtime_ns,
+        "tamano": estado.st_size,
+        "timestamp": timestamp,
+        "configuracion": configuracion,
+        "analisis": analisis,
+        "por_url": por_url,
+    }
+
+
+class CacheResultados:
+    """
+    Índice de los archivos de resultados de una carpeta y resumen precalculado del
+    más reciente.
+
+    Un hilo de fondo recorre la carpeta con `os.scandir` cada `intervalo` segundos. Cada
+    archivo nuevo o modificado se lee una sola vez y su resumen (`resumir_archivo`) se
+    añade como una línea JSON al índice `INDICE_RESULTADOS` de la misma carpeta; al
+    arrancar se carga el índice, de modo que los archivos ya vistos no vuelven a
+    leerse nunca, ni siquiera entre reinicios del servidor. Un archivo se identifica
+    por su nombre, mtime y tamaño. El índice conserva los resúmenes de los archivos
+    borrados, así que los archivos grandes pueden archivarse sin perder el historial.
+
+    Si el archivo más reciente no es JSON válido (por ejemplo, porque `client.py` aún
+    lo está escribiendo) se usa el anterior que sí lo sea, y no se indexa hasta que
+    cambie.
+
+    `obtener` e `historial` solo leen lo último que ha publicado el hilo y nunca
+    analizan un archivo. Además comprueban con un `stat` si la fecha de modificación
+    de la carpeta ha cambiado (se ha creado o borrado un archivo) y en ese caso
+    despiertan al hilo, para que un archivo recién creado se vea sin esperar al
+    siguiente recorrido. `detener` termina el hilo.
+    """
+
+    def __init__(self, carpeta: str, patron: str = PATRON_RESULTADOS,
+                 intervalo: float = INTERVALO_VIGILANCIA_RESULTADOS,
+                 indice: str = INDICE_RESULTADOS):
+        """
+        Configura la caché; la carpeta no se recorre hasta la primera consulta.
+
+        Args:
+            carpeta (str): Carpeta de los archivos de resultados.
+            patron (str): Patrón de nombre (`fnmatch`) de los archivos.
+            intervalo (float): Segundos entre recorridos de la carpeta.
+            indice (str): Nombre del archivo de índice dentro de la carpeta.
+        """
+        self.carpeta = carpeta
+        self.patron = patron
+        self.intervalo = intervalo
+        self.ruta_indice = os.path.join(carpeta, indice)
+        self.recorridos = 0
+        self.lecturas = 0  # Archivos de resultados leídos y analizados
+        self._indice: Optional[Dict[str, Dict]] = None  # Nombre de archivo -> entrada
+        self._invalidos: set = set()  # Versiones de archivos que no son JSON válido
+        self._actual: Tuple[Optional[str], Dict] = (None, {})
+        self._mtime_carpeta: Optional[int] = None
+        self._lock = threading.Lock()  # Protege el índice publicado y el arranque del hilo
+        self._lock_recorrido = threading.Lock()  # Un solo recorrido a la vez
+        self._aviso = threading.Event()
+        self._detenida = False
+        self._hilo: Optional[threading.Thread] = None
+
+    def obtener(self) -> Tuple[Optional[str], Dict]:
+        """
+        Retorna el resumen del archivo de resultados más reciente.
+
+        Returns:
+            Tuple[str | None, Dict]: Ruta del archivo (None si no hay ninguno) y su
+                entrada del índice (`analisis`, `por_url`, `configuracion`...; vacía
+                si no hay ninguno).
+        """
+        self._comprobar()
+        return self._actual
+
+    def historial(self, tipo: Optional[str] = None, desde: Optional[float] = None,
+                  limite: Optional[int] = None) -> Dict:
+        """
+        Retorna las series de tendencia de todas las pruebas indexadas, de la más
+        antigua a la más reciente.
+
+        Args:
+            tipo (str, optional): Solo las pruebas de este tipo (get, sleep, post, mixed).
+            desde (float, optional): Solo las pruebas desde este instante (segundos
+                desde epoch).
+            limite (int, optional): Máximo de pruebas; se toman las más recientes.
+
+        Returns:
+            Dict: Número de pruebas y una serie (lista alineada por prueba) por métrica.
+        """
+        self._comprobar()
+        with self._lock:
+            entradas = list((self._indice or {}).values())
+        entradas.sort(key=lambda entrada: (entrada["timestamp"], entrada["archivo"]))
+        if tipo is not None:
+            entradas = [e for e in entradas if (e["configuracion"] or {}).get("tipo") == tipo]
+        if desde is not None:
+            entradas = [e for e in entradas if e["timestamp"] >= desde]
+        if limite is not None:
+            entradas = entradas[-limite:]
+
+        series: Dict[str, List] = {
+            nombre: [] for nombre in (
+                "fecha", "archivo", "tipo", "concurrencia", "solicitudes",
+                "solicitudes_por_segundo", "tasa_exito", "errores", "promedio",
+                "p50", "p90", "p99", "codigos_respuesta",
+            )
+        }
+        for entrada in entradas:
+            configuracion = entrada["configuracion"] or {}
+            analisis = entrada["analisis"]
+            tiempos = analisis.get("tiempos", {})
+            total = analisis.get("total_solicitudes")
+            exitosas = analisis.get("solicitudes_exitosas")
+            series["fecha"].append(datetime.fromtimestamp(entrada["timestamp"]).isoformat())
+            series["archivo"].append(entrada["archivo"])
+            series["tipo"].append(configuracion.get("tipo"))
+            series["concurrencia"].append(configuracion.get("concurrencia"))
+            series["solicitudes"].append(total)
+            series["solicitudes_por_segundo"].append(analisis.get("solicitudes_por_segundo"))
+            series["tasa_exito"].append(analisis.get("tasa_exito"))
+            series["errores"].append(
+                total - exitosas if total is not None and exitosas is not None else None
+            )
+            for percentil in ("promedio", "p50", "p90", "p99"):
+                series[percentil].append(tiempos.get(percentil))
+            series["codigos_respuesta"].append(analisis.get("codigos_respuesta", {}))
+        return {"pruebas": len(entradas), "series": series}
+
+    def _comprobar(self) -> None:
+        """
+        Arranca el hilo vigilante la primera vez y lo despierta si la carpeta ha cambiado.
+        """
+        if self._hilo is None:
+            with self._lock:
+                if self._hilo is None and not self._detenida:
+                    # Arranca al usarse por primera vez, así cada worker pre-fork tiene el suyo
+                    self._hilo = threading.Thread(target=self._vigilar, name="CacheResultados",
+                                                  daemon=True)
+                    self._hilo.start()
+            return
+        try:
+            cambiada = os.stat(self.carpeta).st_mtime_ns != self._mtime_carpeta
+        except OSError:
+            cambiada = False
+        if cambiada:
+            self._aviso.set()
+
+    def detener(self, espera: float = 5.0) -> None:
+        """
+        Detiene el hilo vigilante; las consultas siguen devolviendo lo ya publicado.
+
+        Args:
+            espera (float): Segundos máximos que se espera a que termine el recorrido en curso.
+        """
+        with self._lock:
+            self._detenida = True
+            hilo = self._hilo
+        self._aviso.set()
+        if hilo is not None and hilo is not threading.current_thread():
+            hilo.join(espera)
+
+    def _vigilar(self) -> None:
+        """
+        Bucle del hilo vigilante.
+        """
+        while not self._detenida:
+            try:
+                self.actualizar()
+            except Exception as e:
+                logger.error(f"Error vigilando los resultados de {self.carpeta}: {e}")
+            self._aviso.wait(self.intervalo)
+            self._aviso.clear()
+
+    def _cargar_indice(self) -> Dict[str, Dict]:
+        """
+        Lee el índice de la carpeta. Si un archivo aparece varias veces (se reescribió)
+        vale la última línea; si hay demasiadas líneas repetidas, el índice se reescribe.
+        """
+        indice: Dict[str, Dict] = {}
+        lineas = 0
+        try:
+            with open(self.ruta_indice, "r", encoding="utf-8") as f:
+                for linea in f:
+                    try:
+                        entrada = json.loads(linea)
+                        indice[entrada["archivo"]] = entrada
+                    except (ValueError, KeyError, TypeError):
+                        # Línea a medio escribir si el proceso terminó durante un append
+                        continue
+                    lineas += 1
+        except FileNotFoundError:
+            return indice
+        except OSError as e:
+            logger.error(f"Error leyendo el índice de resultados {self.ruta_indice}: {e}")
+            return indice
+        if lineas > 2 * len(indice):
+            self._reescribir_indice(indice)
+        return indice
+
+    def _reescribir_indice(self, indice: Dict[str, Dict]) -> None:
+        """
+        Reemplaza el índice por uno con una sola línea por archivo.
+        """
+        temporal = f"{self.ruta_indice}.{os.getpid()}.tmp"
+        try:
+            with open(temporal, "w", encoding="utf-8") as f:
+                f.writelines(_linea_indice(entrada) for entrada in indice.values())
+            os.replace(temporal, self.ruta_indice)
+        except OSError as e:
+            logger.error(f"Error compactando el índice de resultados {self.ruta_indice}: {e}")
+
+    def _indexar(self, entrada: Dict) -> None:
+        """
+        Añade una entrada al índice en memoria y al archivo de índice.
+        """
+        with self._lock:
+            self._indice[entrada["archivo"]] = entrada
+        try:
+            # Una sola escritura con O_APPEND: las líneas de varios workers no se mezclan
+            with open(self.ruta_indice, "a", encoding="utf-8") as f:
+                f.write(_linea_indice(entrada))
+        except OSError as e:
+            logger.error(f"Error escribiendo el índice de resultados {self.ruta_indice}: {e}")
+
+    def actualizar(self) -> None:
+        """
+        Recorre la carpeta, indexa los archivos nuevos o modificados y publica el
+        resumen del más reciente. Lo llama el hilo vigilante; las consultas no esperan
+        a que termine, salvo para copiar el índice.
+        """
+        with self._lock_recorrido:
+            if self._indice is None:
+                indice = self._cargar_indice()
+                with self._lock:
+                    self._indice = indice
+            try:
+                mtime_carpeta = os.stat(self.carpeta).st_mtime_ns
+                archivos: List[Tuple[int, ClaveArchivo]] = []
+                with os.scandir(self.carpeta) as entradas:
+                    for entrada in entradas:
+                        if fnmatch.fnmatchcase(entrada.name, self.patron) and entrada.is_file():
+                            estado = entrada.stat()
+                            clave = (entrada.path, estado.st_mtime_ns, estado.st_size)
+                            archivos.append((estado.st_mtime_ns, clave))
+            except OSError as e:
+                logger.error(f"Error leyendo la carpeta de resultados {self.carpeta}: {e}")
+                return
+            self.recorridos += 1
+
+            actual: Tuple[Optional[str], Dict] = (None, {})
+            for _, clave in sorted(archivos, reverse=True):
+                ruta, mtime_ns, tamano = clave
+                entrada = self._indice.get(os.path.basename(ruta))
+                if entrada is None or (entrada.get("version"), entrada["mtime_ns"],
+                                       entrada["tamano"]) != (VERSION_INDICE, mtime_ns, tamano):
+                    entrada = None
+                    if clave not in self._invalidos:
+                        try:
+                            entrada = resumir_archivo(ruta)
+                        except Exception as e:
+                            # Cualquier contenido inesperado invalida el archivo, no la carpeta
+                            logger.debug(f"Archivo de resultados no válido {ruta}: {e}")
+                            self._invalidos.add(clave)
+                        self.lecturas += 1
+                    # Si cambió mientras se leía, se indexará en el siguiente recorrido
+                    if entrada is not None and (entrada["mtime_ns"], entrada["tamano"]) == (mtime_ns, tamano):
+                        self._indexar(entrada)
+                    else:
+                        entrada = None
+                if entrada is not None and actual[0] is None:
+                    actual = (ruta, entrada)
+            # Olvidar las versiones no válidas de archivos que ya no existen o han cambiado
+            self._invalidos &= {clave for _, clave in archivos}
+            self._actual = actual
+            self._mtime_carpeta = mtime_carpeta
+
+
+def _linea_indice(entrada: Dict) -> str:
+    """
+    Serializa una entrada del índice como una línea JSON compacta.
+    """
+    return json.dumps(entrada, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+_caches: Dict[str, CacheResultados] = {}
+_lock_caches = threading.Lock()
+
+
+def cache_resultados(carpeta: str) -> CacheResultados:
+    """
+    Retorna la caché de resultados compartida de una carpeta, creándola si no existe.
+
+    Args:
+        carpeta (str): Carpeta de los archivos de resultados.
+
+    Returns:
+        CacheResultados: Caché de la carpeta.
+    """
+    clave = os.path.normpath(carpeta)
+    cache = _caches.get(clave)
+    if cache is None:
+        with _lock_caches:
+            cache = _caches.setdefault(clave, CacheResultados(clave))
+    return cache
+
+
+def detener_caches_resultados() -> None:
+    """
+    Detiene los hilos vigilantes de todas las cachés de resultados del proceso.
+    """
+    with _lock_caches:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.detener()
@@ -0,0 +1,80 @@
+import json
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from server.core.almacen import AlmacenSQLite
+from server.core.recursos import RecursosCompartidos
+
+
+def registro(id_dato: int, marca: float, valor="x") -> dict:
+    return {"id": id_dato, "timestamp": datetime.fromtimestamp(marca).isoformat(), "valor": valor}
+
+
+@pytest.fixture
+def ruta(tmp_path, monkeypatch):
+    # `preparar` busca la base de versiones anteriores en una ruta relativa
+    monkeypatch.chdir(tmp_path)
+    return str(tmp_path / "almacen" / "datos.sqlite3")
+
+
+def abrir(ruta: str) -> AlmacenSQLite:
+    almacen = AlmacenSQLite(ruta, intervalo=0.01, sincronizacion="siempre")
+    almacen.preparar()
+    return almacen
+
+
+def test_base_en_modo_wal(ruta):
+    almacen = abrir(ruta)
+    almacen.agregar(registro(1, 1000.0))
+    almacen.cerrar()
+    with sqlite3.connect(ruta) as conexion:
+        assert conexion.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_un_id_repetido_reemplaza_al_anterior(ruta):
+    almacen = abrir(ruta)
+    almacen.agregar(registro(7, 1000.0, "antes"))
+    almacen.agregar(registro(7, 1001.0, "despues"))
+    try:
+        assert json.loads(almacen.leer(7))["valor"] == "despues"
+        assert almacen.leer(8) is None
+        assert len(almacen.consultar(None, None, 10)) == 1
+    finally:
+        almacen.cerrar()
+
+
+def test_los_ids_continuan_tras_reiniciar(ruta):
+    almacen = abrir(ruta)
+    for id_dato in (1, 5, 3):
+        almacen.agregar(registro(id_dato, 1000.0 + id_dato))
+    almacen.cerrar()
+
+    almacen = abrir(ruta)
+    try:
+        assert almacen.ultimo_id() == 5
+        recursos = RecursosCompartidos()
+        recursos.continuar_ids(almacen.ultimo_id())
+        assert recursos.generar_id() > 5
+    finally:
+        almacen.cerrar()
+
+
+def test_consultar_por_rango_de_fechas(ruta):
+    almacen = abrir(ruta)
+    # Insertados desordenados: la consulta ordena por `timestamp` y después por id
+    for id_dato, marca in [(4, 1030.0), (1, 1000.0), (3, 1020.0), (2, 1010.0), (5, 1020.0)]:
+        almacen.agregar(registro(id_dato, marca))
+    try:
+        def ids(*argumentos):
+            return [json.loads(fila)["id"] for fila in almacen.consultar(*argumentos)]
+
+        assert ids(None, None, 10) == [1, 2, 3, 5, 4]
+        assert ids(1010.0, None, 10) == [2, 3, 5, 4]
+        assert ids(None, 1020.0, 10) == [1, 2]
+        assert ids(1010.0, 1030.0, 10) == [2, 3, 5]
+        assert ids(1010.0, 1030.0, 2) == [2, 3]
+        assert ids(2000.0, None, 10) == []
+    finally:
+        almacen.cerrar()
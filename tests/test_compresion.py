@@ -0,0 +1,43 @@
+import gzip
+import http.client
+import threading
+
+import pytest
+
+from server.core import compresion
+from server.core.compresion import CacheCompresion
+from server.core.handler import HTTPRequestHandler
+from server.core.http_server import ThreadingHTTPServer
+
+
+@pytest.fixture
+def servidor(monkeypatch, tmp_path):
+    # /api/data indexa la carpeta de resultados relativa al directorio actual
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(HTTPRequestHandler, "compresion", CacheCompresion())
+    # Se comprime cualquier tamaño: /api/data puede ser corto sin archivos de resultados
+    monkeypatch.setattr(compresion, "COMPRESION_MINIMA", 0)
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), HTTPRequestHandler, hilos=2)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+# Ambas llevan la hora de generación: cambian en cada respuesta
+@pytest.mark.parametrize("ruta", ["/index", "/api/data"])
+def test_cuerpos_dinamicos_no_entran_en_la_cache(servidor, ruta):
+    conexion = http.client.HTTPConnection(*servidor.server_address, timeout=5)
+    try:
+        for _ in range(3):
+            conexion.request("GET", ruta, headers={"Accept-Encoding": "gzip"})
+            respuesta = conexion.getresponse()
+            cuerpo = respuesta.read()
+            assert respuesta.getheader("Content-Encoding") == "gzip"
+            assert gzip.decompress(cuerpo)
+    finally:
+        conexion.close()
+    cache = HTTPRequestHandler.compresion
+    assert cache.aciertos == cache.fallos == 0
+    assert not cache._entradas
@@ -0,0 +1,103 @@
+import json
+import os
+from array import array
+
+import pytest
+
+from server.core.diario import (
+    SUFIJO_DATOS,
+    SUFIJO_INDICE,
+    SUFIJO_INDICE_ABIERTO,
+    DiarioPeticiones,
+    EscritorPorLotes,
+    _escribir_segmento,
+)
+
+
+def linea(id_dato: int) -> bytes:
+    return json.dumps({"id": id_dato}).encode() + b"\n"
+
+
+def bases(directorio) -> set:
+    return {nombre[:-len(SUFIJO_INDICE)] for nombre in os.listdir(directorio)
+            if nombre.endswith(SUFIJO_INDICE) and not nombre.endswith(SUFIJO_INDICE_ABIERTO)}
+
+
+def test_compactar_no_reescribe_el_segmento_fusionado(tmp_path):
+    diario = DiarioPeticiones(str(tmp_path), intervalo_compactacion=0)
+    _escribir_segmento(str(tmp_path), [(1, linea(1))])
+    _escribir_segmento(str(tmp_path), [(2, linea(2))])
+    assert diario.compactar() == 2
+    fusionado = bases(tmp_path)
+    assert len(fusionado) == 1
+
+    # Un solo segmento nuevo no basta para volver a reescribir el fusionado
+    _escribir_segmento(str(tmp_path), [(3, linea(3))])
+    assert diario.compactar() == 0
+    assert diario.compactar() == 0
+    assert fusionado <= bases(tmp_path)
+
+    # Dos de generación 0 forman otro de generación 1, y dos de generación 1 uno de 2
+    _escribir_segmento(str(tmp_path), [(4, linea(4))])
+    assert diario.compactar() == 2
+    assert diario.compactar() == 2
+    assert len(bases(tmp_path)) == 1
+    assert diario.compactar() == 0
+    assert [diario.leer(i) for i in range(1, 5)] == [linea(i).rstrip() for i in range(1, 5)]
+
+
+def test_leer_del_segmento_abierto_de_otro_proceso(tmp_path):
+    base = os.path.join(str(tmp_path), "00000000000000000001-99999-0")
+
+    def anexar(ids):
+        with open(base + SUFIJO_DATOS, "ab") as datos, open(base + SUFIJO_INDICE_ABIERTO, "ab") as indice:
+            for id_dato in ids:
+                entrada = array("Q", [id_dato, datos.tell()])
+                datos.write(linea(id_dato))
+                indice.write(entrada.tobytes())
+
+    anexar([10, 12, 11])
+    diario = DiarioPeticiones(str(tmp_path), intervalo_compactacion=0)
+    assert diario.leer(11) == linea(11).rstrip()
+    assert diario.leer(13) is None
+
+    # Las entradas añadidas después de la primera lectura también se encuentran
+    anexar([13, 9])
+    assert diario.leer(13) == linea(13).rstrip()
+    assert diario.leer(9) == linea(9).rstrip()
+    assert diario.leer(10) == linea(10).rstrip()
+    assert diario.leer(14) is None
+
+
+def test_un_almacen_incompleto_no_se_puede_crear():
+    class SinLectura(EscritorPorLotes):
+        def _preparar(self, registro):
+            return registro
+
+        def _escribir_lote(self, lote):
+            pass
+
+    with pytest.raises(TypeError):
+        SinLectura()
+
+
+def test_compactar_conserva_el_registro_mas_reciente_de_un_id_repetido(tmp_path):
+    def version(id_dato: int, timestamp: str, valor: str) -> bytes:
+        return json.dumps({"id": id_dato, "timestamp": timestamp, "valor": valor}).encode() + b"\n"
+
+    directorio = str(tmp_path)
+    nueva = version(5, "2026-01-02T00:00:00", "nueva")
+    antigua = version(5, "2026-01-01T00:00:00", "antigua")
+    # El segmento con la versión nueva se crea antes que el de la antigua, como ocurre
+    # cuando un segmento antiguo se fusiona después que otro más reciente
+    _escribir_segmento(directorio, [(5, nueva), (6, linea(6))])
+    _escribir_segmento(directorio, [(1, linea(1)), (5, antigua)])
+    diario = DiarioPeticiones(directorio, intervalo_compactacion=0)
+    assert diario.compactar() == 2
+    assert diario.leer(5) == nueva.rstrip()
+
+    # Con el mismo `timestamp` gana el segmento creado después
+    _escribir_segmento(directorio, [(7, version(7, "2026-01-03T00:00:00", "a"))])
+    _escribir_segmento(directorio, [(7, version(7, "2026-01-03T00:00:00", "b"))])
+    assert diario.compactar() == 2
+    assert json.loads(diario.leer(7))["valor"] == "b"
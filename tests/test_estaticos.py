@@ -0,0 +1,87 @@
+import http.client
+import os
+import threading
+
+import pytest
+
+from server.core.estaticos import ArchivosEstaticos
+from server.core.handler import HTTPRequestHandler
+from server.core.http_server import ThreadingHTTPServer
+
+RESULTADOS = "resultados_prueba_2025-03-26T15_11_03_414287.json"
+
+
+@pytest.fixture
+def servidor(tmp_path, monkeypatch):
+    # Raíz con resultados y, junto a ellos, los datos internos de versiones anteriores
+    (tmp_path / RESULTADOS).write_text('{"analisis": {}}')
+    (tmp_path / ".indice_resultados.jsonl").write_text("{}\n")
+    (tmp_path / "peticiones.json.migrado").write_text("[]")
+    (tmp_path / "datos.sqlite3").write_bytes(b"SQLite format 3\x00")
+    (tmp_path / "diario").mkdir()
+    (tmp_path / "diario" / "00000001.jsonl").write_text('{"id": 1}\n')
+    monkeypatch.setattr(HTTPRequestHandler, "estaticos", ArchivosEstaticos(str(tmp_path)))
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), HTTPRequestHandler, hilos=2)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def obtener(servidor, ruta: str) -> int:
+    conexion = http.client.HTTPConnection(*servidor.server_address, timeout=5)
+    try:
+        conexion.request("GET", ruta)
+        respuesta = conexion.getresponse()
+        respuesta.read()
+        return respuesta.status
+    finally:
+        conexion.close()
+
+
+def test_sirve_los_resultados(servidor):
+    assert obtener(servidor, f"/archivos/{RESULTADOS}") == 200
+
+
+@pytest.mark.parametrize("ruta", [
+    "/archivos/diario/00000001.jsonl",
+    "/archivos/diario/",
+    "/archivos/datos.sqlite3",
+    "/archivos/.indice_resultados.jsonl",
+    "/archivos/peticiones.json.migrado",
+    "/archivos/diario/../datos.sqlite3",
+    "/archivos/%2e%2e/" + RESULTADOS,
+])
+def test_no_sirve_datos_internos(servidor, ruta):
+    assert obtener(servidor, ruta) == 404
+
+
+def test_almacen_fuera_de_la_raiz_servida():
+    from server.config import ARCHIVO_SQLITE, DIRECTORIO_DIARIO, RAIZ_ESTATICOS
+
+    raiz = os.path.realpath(RAIZ_ESTATICOS)
+    for ruta in (ARCHIVO_SQLITE, DIRECTORIO_DIARIO):
+        assert not os.path.realpath(ruta).startswith(raiz + os.sep)
+
+
+def test_envio_desde_mmap_en_trozos_acotados(tmp_path):
+    from server.core.estaticos import BLOQUE_MMAP, enviar_archivo
+
+    contenido = os.urandom(BLOQUE_MMAP * 3 + 1000)
+    ruta = tmp_path / "grande.bin"
+    ruta.write_bytes(contenido)
+
+    class Salida:
+        def __init__(self):
+            self.trozos = []
+
+        def sendall(self, datos):
+            self.trozos.append(bytes(datos))
+
+    salida = Salida()
+    with open(ruta, "rb") as f:
+        enviar_archivo(salida, f.fileno(), 500, len(contenido) - 600)
+    assert max(len(trozo) for trozo in salida.trozos) <= BLOQUE_MMAP
+    assert b"".join(salida.trozos) == contenido[500:-100]
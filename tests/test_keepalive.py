@@ -0,0 +1,121 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from server.core.handler import HTTPRequestHandler
+from server.core.http_server import ThreadingHTTPServer
+
+HILOS = 4
+
+
+@pytest.fixture
+def servidor():
+    # Cola holgada: las conexiones se abren de golpe y no deben rechazarse con 503
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), HTTPRequestHandler, hilos=HILOS,
+                                   profundidad_cola=HILOS * 8)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def solicitar(conexion: socket.socket) -> bytes:
+    conexion.sendall(b"GET /index HTTP/1.1\r\nHost: test\r\n\r\n")
+    respuesta = b""
+    while b"\r\n\r\n" not in respuesta:
+        respuesta += conexion.recv(65536)
+    cabeceras, _, cuerpo = respuesta.partition(b"\r\n\r\n")
+    longitud = int(next(linea.split(b":")[1] for linea in cabeceras.split(b"\r\n")
+                        if linea.lower().startswith(b"content-length")))
+    while len(cuerpo) < longitud:
+        cuerpo += conexion.recv(65536)
+    return cabeceras.split(b"\r\n")[0]
+
+
+def test_conexiones_inactivas_no_bloquean_el_pool(servidor):
+    direccion = servidor.server_address
+    # Más conexiones keep-alive inactivas que trabajadores
+    inactivas = [socket.create_connection(direccion) for _ in range(HILOS * 3)]
+    try:
+        for conexion in inactivas:
+            assert solicitar(conexion) == b"HTTP/1.1 200 OK"
+
+        inicio = time.monotonic()
+        with socket.create_connection(direccion, timeout=2) as nueva:
+            assert solicitar(nueva) == b"HTTP/1.1 200 OK"
+        # Muy por debajo de KEEPALIVE_TIMEOUT: ningún trabajador está retenido
+        assert time.monotonic() - inicio < 1
+
+        # Las conexiones aparcadas siguen sirviendo solicitudes
+        for conexion in inactivas:
+            assert solicitar(conexion) == b"HTTP/1.1 200 OK"
+        assert servidor.obtener_stats_pool()["conexiones_rechazadas"] == 0
+    finally:
+        for conexion in inactivas:
+            conexion.close()
+
+
+def test_conexiones_nuevas_sin_solicitud_no_bloquean_el_pool(servidor):
+    direccion = servidor.server_address
+    # Conexiones abiertas que todavía no han enviado nada
+    mudas = [socket.create_connection(direccion) for _ in range(HILOS * 3)]
+    try:
+        inicio = time.monotonic()
+        with socket.create_connection(direccion, timeout=2) as nueva:
+            assert solicitar(nueva) == b"HTTP/1.1 200 OK"
+        assert time.monotonic() - inicio < 1
+
+        for conexion in mudas:
+            conexion.settimeout(2)
+            assert solicitar(conexion) == b"HTTP/1.1 200 OK"
+        assert servidor.obtener_stats_pool()["conexiones_rechazadas"] == 0
+    finally:
+        for conexion in mudas:
+            conexion.close()
+
+
+def test_vencimiento_de_una_conexion_ya_cerrada_no_detiene_al_vigilante(servidor, monkeypatch):
+    monkeypatch.setattr(HTTPRequestHandler, "timeout_keepalive", 0.3)
+    direccion = servidor.server_address
+    # Se aparca, vuelve a la cola con su siguiente solicitud y el cliente la cierra:
+    # su vencimiento original sigue pendiente en el hilo vigilante
+    with socket.create_connection(direccion, timeout=2) as conexion:
+        assert solicitar(conexion) == b"HTTP/1.1 200 OK"
+        time.sleep(0.05)
+        assert solicitar(conexion) == b"HTTP/1.1 200 OK"
+    time.sleep(0.6)
+
+    with socket.create_connection(direccion, timeout=2) as conexion:
+        assert solicitar(conexion) == b"HTTP/1.1 200 OK"
+        time.sleep(0.05)
+        assert solicitar(conexion) == b"HTTP/1.1 200 OK"
+    assert servidor._vigilante.is_alive()
+
+
+def test_conexion_aparcada_espera_sitio_en_la_cola_llena():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), HTTPRequestHandler, hilos=1,
+                                   profundidad_cola=1)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    direccion = servidor.server_address
+    try:
+        aparcada = socket.create_connection(direccion, timeout=5)
+        assert solicitar(aparcada) == b"HTTP/1.1 200 OK"
+        time.sleep(0.05)
+
+        # Un trabajador ocupado y la cola llena cuando la conexión aparcada vuelve a hablar
+        lenta = socket.create_connection(direccion, timeout=5)
+        lenta.sendall(b"GET /sleep/1 HTTP/1.1\r\nHost: test\r\n\r\n")
+        time.sleep(0.2)
+        en_cola = socket.create_connection(direccion, timeout=5)
+        time.sleep(0.1)
+        assert solicitar(aparcada) == b"HTTP/1.1 200 OK"
+        assert servidor.obtener_stats_pool()["conexiones_rechazadas"] == 0
+        for conexion in (aparcada, lenta, en_cola):
+            conexion.close()
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+    assert not any(trabajador.is_alive() for trabajador in servidor._trabajadores)
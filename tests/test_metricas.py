@@ -0,0 +1,21 @@
+import threading
+
+from server.core.metricas import Contador
+
+
+def test_los_fragmentos_de_hilos_terminados_se_pliegan_en_la_base():
+    contador = Contador("prueba")
+
+    def incrementar():
+        for _ in range(10):
+            contador.incrementar()
+
+    for _ in range(200):
+        hilo = threading.Thread(target=incrementar)
+        hilo.start()
+        hilo.join()
+    contador.incrementar(5)
+
+    assert contador.valor == 2005
+    assert contador.base == 2000
+    assert len(contador._fragmentos) == 1
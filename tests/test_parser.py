@@ -0,0 +1,103 @@
+import socket
+import threading
+
+import pytest
+
+from server.core.handler import HTTPRequestHandler
+from server.core.http_server import ThreadingHTTPServer
+from server.core.parser import ErrorSolicitud, ParserHTTP
+
+
+def analizar(*trozos: bytes, **limites):
+    parser = ParserHTTP(**limites)
+    solicitudes = []
+    for trozo in trozos:
+        parser.alimentar(trozo)
+        solicitud = parser.siguiente()
+        while solicitud is not None:
+            solicitudes.append(solicitud)
+            solicitud = parser.siguiente()
+    return parser, solicitudes
+
+
+def test_solicitud_repartida_en_varias_lecturas():
+    datos = (b"POST /data?x=1&y= HTTP/1.1\r\nHost: test\r\nContent-Length: 11\r\n"
+             b"X-Dup: a\r\nx-dup: b\r\n\r\nhola, mundo")
+    # Byte a byte: el separador de cabeceras y el cuerpo llegan partidos
+    parser, solicitudes = analizar(*(datos[i:i + 1] for i in range(len(datos))))
+    assert len(solicitudes) == 1
+    solicitud = solicitudes[0]
+    assert (solicitud.metodo, solicitud.ruta, solicitud.version) == ("POST", "/data", "HTTP/1.1")
+    assert solicitud.parametros == {"x": ["1"], "y": [""]}
+    assert solicitud.cabecera("HOST") == "test"
+    assert solicitud.cabecera("x-dup") == "a, b"
+    assert solicitud.cuerpo == b"hola, mundo"
+    assert not parser.tiene_datos
+
+
+def test_solicitudes_encadenadas():
+    parser, solicitudes = analizar(
+        b"GET /a HTTP/1.1\r\n\r\n"
+        b"POST /b HTTP/1.1\r\nContent-Length: 3\r\n\r\nabc"
+        b"GET /c HTTP/1.1\r\n\r\nGET /d HT"
+    )
+    assert [(s.ruta, s.cuerpo) for s in solicitudes] == [("/a", b""), ("/b", b"abc"), ("/c", b"")]
+    # El principio de la cuarta se conserva para la siguiente lectura
+    assert parser.tiene_datos
+    parser.alimentar(b"TP/1.1\r\n\r\n")
+    assert parser.siguiente().ruta == "/d"
+
+
+def test_espera_100_continue_hasta_recibir_el_cuerpo():
+    parser, solicitudes = analizar(
+        b"POST /data HTTP/1.1\r\nContent-Length: 4\r\nExpect: 100-continue\r\n\r\n"
+    )
+    assert solicitudes == [] and parser.espera_continuar
+    parser.alimentar(b"abcd")
+    assert parser.siguiente().cuerpo == b"abcd"
+    assert not parser.espera_continuar
+    # Sin cuerpo no hay nada que confirmar
+    parser, _ = analizar(b"POST /data HTTP/1.1\r\nContent-Length: 0\r\nExpect: 100-continue\r\n\r\n")
+    assert not parser.espera_continuar
+
+
+@pytest.mark.parametrize("datos, codigo", [
+    (b"POST /data HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n", 411),
+    (b"GET /a HTTP/1.1\r\nX-Larga: " + b"a" * 200 + b"\r\n\r\n", 431),
+    (b"POST /data HTTP/1.1\r\nContent-Length: 101\r\n\r\n", 413),
+    (b"POST /data HTTP/1.1\r\nContent-Length: -1\r\n\r\n", 400),
+    (b"POST /data HTTP/1.1\r\nContent-Length: diez\r\n\r\n", 400),
+    (b"GET /a HTTP/1.1\r\nsin dos puntos\r\n\r\n", 400),
+    (b"GET /a\r\n\r\n", 400),
+    (b"BREW /a HTTP/1.1\r\n\r\n", 405),
+    (b"GET /a HTTP/2.0\r\n\r\n", 505),
+])
+def test_solicitudes_rechazadas(datos, codigo):
+    with pytest.raises(ErrorSolicitud) as error:
+        analizar(datos, max_cabeceras=128, max_cuerpo=100)
+    assert error.value.codigo == codigo
+
+
+def test_cabeceras_sin_terminar_que_superan_el_limite():
+    parser = ParserHTTP(max_cabeceras=128)
+    parser.alimentar(b"GET /a HTTP/1.1\r\nX-Larga: ")
+    assert parser.siguiente() is None
+    parser.alimentar(b"a" * 200)
+    with pytest.raises(ErrorSolicitud) as error:
+        parser.siguiente()
+    assert error.value.codigo == 431
+
+
+def test_100_continue_en_el_servidor():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), HTTPRequestHandler, hilos=2)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    try:
+        with socket.create_connection(servidor.server_address, timeout=5) as conexion:
+            conexion.sendall(b"POST /no-existe HTTP/1.1\r\nHost: test\r\nContent-Length: 2\r\n"
+                             b"Expect: 100-continue\r\n\r\n")
+            assert conexion.recv(1024) == b"HTTP/1.1 100 Continue\r\n\r\n"
+            conexion.sendall(b"{}")
+            assert conexion.recv(1024).startswith(b"HTTP/1.1 404")
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
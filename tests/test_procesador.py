@@ -0,0 +1,31 @@
+import threading
+import time
+
+from server.core.procesador import ProcesadorCola
+from server.core.recursos import RecursosCompartidos
+
+
+def test_stop_espera_a_los_consumidores_retirados():
+    recursos = RecursosCompartidos()
+    ocupados = threading.Semaphore(0)
+    terminados = []
+
+    def procesar_lento(lote):
+        ocupados.release()
+        # El último consumidor, el que se retira, tarda más que el que sigue activo
+        retirado = threading.current_thread().name == "ProcesadorCola-2"
+        time.sleep(1.0 if retirado else 0.2)
+        terminados.append(threading.current_thread().name)
+
+    procesador = ProcesadorCola(recursos, consumidores=2, lote=1, funcion=procesar_lento)
+    procesador.start()
+    for _ in range(2):
+        recursos.cola_solicitudes.put((time.monotonic(), "solicitud"))
+    # Los dos consumidores están procesando un lote cuando se retira uno
+    assert ocupados.acquire(timeout=5) and ocupados.acquire(timeout=5)
+    hilos = [hilo for hilo in threading.enumerate() if hilo.name.startswith("ProcesadorCola-")]
+    procesador.redimensionar(1)
+
+    procesador.stop()
+    assert sorted(terminados) == ["ProcesadorCola-1", "ProcesadorCola-2"]
+    assert not any(hilo.is_alive() for hilo in hilos)
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from server.core.estadisticas import TablaEstadisticas
+from server.core.recursos import RecursosCompartidos
+
+
+def test_el_camino_de_la_solicitud_no_publica_ni_suma_fragmentos(monkeypatch):
+    recursos = RecursosCompartidos()
+    tabla = TablaEstadisticas(1)
+    tabla.escribir(0, "total_solicitudes", 40)
+    recursos.conectar_estadisticas(tabla, 0, intervalo=0.05)
+
+    # Leer el total toma el lock de los fragmentos: no debe ocurrir al incrementar
+    def prohibido(*args):
+        raise AssertionError("publicación en el camino de la solicitud")
+
+    with monkeypatch.context() as parche:
+        parche.setattr(RecursosCompartidos, "publicar_estadisticas", prohibido)
+        parche.setattr(type(recursos.solicitudes_totales), "valor", property(prohibido))
+        for _ in range(2):
+            recursos.incrementar_contador()
+
+    # El worker sustituto continúa el total de la tabla y el hilo lo publica
+    for _ in range(100):
+        if tabla.leer(0, "total_solicitudes") == 42:
+            break
+        time.sleep(0.02)
+    assert tabla.leer(0, "total_solicitudes") == 42
+    assert recursos.obtener_stats()["total_solicitudes"] == 42
+
+
+def llena(politica: str, **opciones) -> RecursosCompartidos:
+    recursos = RecursosCompartidos(politica_cola=politica, **opciones)
+    for i in range(recursos.cola_solicitudes.maxsize):
+        assert recursos.agregar_solicitud_a_cola(f"vieja-{i}")
+    return recursos
+
+
+def en_cola(recursos) -> list:
+    return [solicitud for _, solicitud in list(recursos.cola_solicitudes.queue)]
+
+
+def test_politica_desconocida():
+    with pytest.raises(ValueError):
+        RecursosCompartidos(politica_cola="ignorar")
+
+
+def test_descartar_nueva():
+    recursos = llena("descartar_nueva")
+    assert not recursos.agregar_solicitud_a_cola("nueva")
+    assert "nueva" not in en_cola(recursos)
+    cola = recursos.obtener_stats()["cola"]
+    assert (cola["aceptadas"], cola["descartadas"], cola["desalojadas"]) == (50, 1, 0)
+
+
+def test_descartar_antigua():
+    recursos = llena("descartar_antigua")
+    assert recursos.agregar_solicitud_a_cola("nueva")
+    solicitudes = en_cola(recursos)
+    assert solicitudes[0] == "vieja-1" and solicitudes[-1] == "nueva"
+    assert len(solicitudes) == recursos.cola_solicitudes.maxsize
+    cola = recursos.obtener_stats()["cola"]
+    assert (cola["aceptadas"], cola["descartadas"], cola["desalojadas"]) == (51, 0, 1)
+    # La desalojada cuenta como terminada: join() no espera por ella
+    assert recursos.cola_solicitudes.unfinished_tasks == recursos.cola_solicitudes.maxsize
+
+
+def test_bloquear_espera_sitio_y_descarta_al_agotar_la_espera():
+    recursos = llena("bloquear", espera_cola=0.1)
+    inicio = time.monotonic()
+    assert not recursos.agregar_solicitud_a_cola("nueva")
+    assert time.monotonic() - inicio >= 0.1
+
+    # Sin poder esperar (bucle de eventos) se comporta como "descartar_nueva"
+    inicio = time.monotonic()
+    assert not recursos.agregar_solicitud_a_cola("nueva", puede_esperar=False)
+    assert time.monotonic() - inicio < 0.05
+
+    recursos.espera_cola = 5
+    threading.Timer(0.1, recursos.cola_solicitudes.get).start()
+    assert recursos.agregar_solicitud_a_cola("nueva")
+    assert en_cola(recursos)[-1] == "nueva"
+    assert recursos.obtener_stats()["cola"]["descartadas"] == 2
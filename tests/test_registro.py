@@ -0,0 +1,64 @@
+import pytest
+
+from server.core.registro import RegistroSolicitudes
+
+
+def llenar(registro, cantidad, inicio=0):
+    for i in range(inicio, inicio + cantidad):
+        registro.agregar(1000.0 + i, f"10.0.0.{i % 3}", "GET" if i % 2 else "POST", f"/r{i % 5}")
+
+
+def test_capacidad_no_positiva():
+    with pytest.raises(ValueError):
+        RegistroSolicitudes(0)
+
+
+def test_el_buffer_circular_descarta_las_mas_antiguas():
+    registro = RegistroSolicitudes(4)
+    llenar(registro, 10)
+    assert len(registro) == 4
+    assert registro.primera == 6
+    assert [s["ruta"] for s in registro.leer(0, 100)] == ["/r1", "/r2", "/r3", "/r4"]
+    assert registro.buscar_marca(0) == 6
+    assert registro.buscar_marca(1008.5) == 9
+    assert registro.buscar_marca(2000) == 10
+
+
+def test_los_indices_siguen_al_buffer_al_sobrescribir():
+    registro = RegistroSolicitudes(50)
+    llenar(registro, 1000)
+    # Cada índice contiene exactamente las secuencias vigentes de su valor
+    for campo, columna in registro._columnas.items():
+        total = 0
+        for valor, secuencias in registro.indices[campo].items():
+            vigentes = list(secuencias.desde(0))
+            assert vigentes == sorted(vigentes)
+            assert all(columna[s % registro.capacidad] == valor for s in vigentes)
+            assert vigentes[0] >= registro.primera
+            total += len(secuencias)
+        assert total == len(registro)
+    # Los valores que ya no aparecen salen del índice
+    registro.agregar(5000.0, "10.9.9.9", "DELETE", "/unica")
+    llenar(registro, 50, inicio=1001)
+    assert "/unica" not in registro.indices["ruta"]
+
+
+def test_consulta_indexada_con_filtros_y_cursor():
+    registro = RegistroSolicitudes(1000)
+    llenar(registro, 3000)
+    filtros = {"ruta": "/r2", "metodo": "GET"}
+    esperadas = [s for s in range(registro.primera, registro.total)
+                 if s % 5 == 2 and s % 2 == 1]
+
+    obtenidas, cursor = [], registro.primera
+    while cursor is not None:
+        pagina, cursor = registro.consultar(filtros, cursor, 7)
+        obtenidas.extend(pagina)
+    assert obtenidas == [registro.como_dict(s) for s in esperadas]
+
+    coincidencias = [s for s in range(2500, 3000) if s % 3 == 1]
+    pagina, siguiente = registro.consultar({"ip": "10.0.0.1"}, 2500, 3)
+    assert pagina == [registro.como_dict(s) for s in coincidencias[:3]]
+    assert siguiente == coincidencias[3]
+    assert registro.consultar({"ruta": "/no-existe"}, 0, 10) == ([], None)
+    assert registro.consultar({}, 2998, 10)[0] == [registro.como_dict(2998), registro.como_dict(2999)]
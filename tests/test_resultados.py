@@ -0,0 +1,106 @@
+import json
+import os
+
+from server.utils.lector_resultados import resumir_por_url
+from server.utils.resultados import CacheResultados
+
+
+def escribir(ruta, datos, mtime):
+    ruta.write_text(json.dumps(datos))
+    os.utime(ruta, (mtime, mtime))
+
+
+def registro(tiempo, url="http://localhost:8000/status", exito=True):
+    return {"url": url, "metodo": "GET", "status_code": 200, "tiempo_segundos": tiempo,
+            "exito": exito}
+
+
+def test_resumir_por_url_descarta_registros_sin_tiempo():
+    resumen = resumir_por_url([
+        registro(0.5),
+        registro(None),
+        registro("rápido"),
+        registro(float("nan")),
+        registro(True),
+        "no es un registro",
+        None,
+        {"url": 8000, "metodo": ["GET"], "tiempo_segundos": 0.1},
+    ])
+    status = resumen["GET /status"]
+    assert status["solicitudes"] == 1
+    assert status["p50"] == 0.5
+    assert status["sin_tiempo"] == 4
+    assert status["exitosas"] == 5
+    assert status["codigos_respuesta"] == {"200": 5}
+    assert resumen["['GET'] 8000"]["solicitudes"] == 1
+
+
+def test_resumir_por_url_endpoint_sin_tiempos():
+    resumen = resumir_por_url([registro(None)])
+    assert resumen["GET /status"]["solicitudes"] == 0
+    assert resumen["GET /status"]["sin_tiempo"] == 1
+
+
+def test_archivo_con_contenido_inesperado_no_rompe_la_cache(tmp_path):
+    escribir(tmp_path / "resultados_prueba_1.json", {
+        "timestamp": 1000.0,
+        "analisis": {"total_solicitudes": 2},
+        "resultados_detallados": [registro(0.25), registro(None)],
+    }, 1000)
+    for nombre, datos in [
+        ("resultados_prueba_2.json", {"timestamp": 2000.0, "analisis": []}),
+        ("resultados_prueba_3.json", {"timestamp": "ayer", "analisis": {}}),
+        ("resultados_prueba_4.json", {"timestamp": 4000.0, "configuracion": 3}),
+        ("resultados_prueba_5.json", [{"timestamp": 5000.0, "analisis": "x"}]),
+    ]:
+        escribir(tmp_path / nombre, datos, 2000)
+
+    cache = CacheResultados(str(tmp_path))
+    cache.actualizar()
+
+    ruta, entrada = cache._actual
+    assert os.path.basename(ruta) == "resultados_prueba_1.json"
+    assert entrada["por_url"]["GET /status"]["sin_tiempo"] == 1
+    assert cache.historial()["series"]["archivo"] == ["resultados_prueba_1.json"]
+    # Los archivos no válidos no se vuelven a leer en cada recorrido
+    lecturas = cache.lecturas
+    cache.actualizar()
+    assert cache.lecturas == lecturas
+
+
+def test_consultas_no_esperan_al_recorrido_y_el_hilo_se_detiene(tmp_path, monkeypatch):
+    import threading
+    import time
+
+    from server.utils import resultados
+
+    escribir(tmp_path / "resultados_prueba_1.json", {"timestamp": 1000.0, "analisis": {}}, 1000)
+    leyendo = threading.Event()
+    continuar = threading.Event()
+    resumir = resultados.resumir_archivo
+
+    def resumir_lento(ruta):
+        leyendo.set()
+        continuar.wait(5)
+        return resumir(ruta)
+
+    monkeypatch.setattr(resultados, "resumir_archivo", resumir_lento)
+    cache = CacheResultados(str(tmp_path), intervalo=60)
+    assert cache.obtener() == (None, {})
+    assert leyendo.wait(5)
+
+    # Mientras el hilo analiza el archivo, las consultas devuelven lo publicado al momento
+    inicio = time.monotonic()
+    assert cache.obtener() == (None, {})
+    assert cache.historial()["pruebas"] == 0
+    assert time.monotonic() - inicio < 0.5
+
+    continuar.set()
+    for _ in range(100):
+        if cache.obtener()[0] is not None:
+            break
+        time.sleep(0.05)
+    assert os.path.basename(cache.obtener()[0]) == "resultados_prueba_1.json"
+
+    cache.detener()
+    assert not cache._hilo.is_alive()
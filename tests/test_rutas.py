@@ -0,0 +1,111 @@
+import http.client
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from server.core.handler import HTTPRequestHandler
+from server.core.http_server import ThreadingHTTPServer
+from server.core.parser import ErrorSolicitud
+from server.core.rutas import RegistroRutas
+
+
+@pytest.fixture
+def rutas():
+    rutas = RegistroRutas()
+    for patron in ("/api/data", "/api/data/historial", "/api/data/<int:id_dato>",
+                   "/usuarios/<nombre>/perfil", "/usuarios/admin/perfil",
+                   "/archivos/<path:archivo>", "/archivos/indice"):
+        rutas.get(patron)(lambda handler, **parametros: None)
+    return rutas
+
+
+def codigo(rutas, ruta, metodo="GET") -> int:
+    with pytest.raises(ErrorSolicitud) as error:
+        rutas.resolver(metodo, ruta)
+    return error.value.codigo
+
+
+def test_orden_de_resolucion(rutas):
+    # La ruta elegida se distingue por los parámetros que extrae
+    assert rutas.resolver("GET", "/api/data/historial")[1] == {}
+    assert rutas.resolver("GET", "/api/data/42")[1] == {"id_dato": 42}
+    # El segmento literal gana al parámetro en el mismo nivel
+    assert rutas.resolver("GET", "/usuarios/admin/perfil")[1] == {}
+    assert rutas.resolver("GET", "/usuarios/ana/perfil")[1] == {"nombre": "ana"}
+    # <path:...> solo recoge lo que no coincide con nada más
+    assert rutas.resolver("GET", "/archivos/indice")[1] == {}
+    assert rutas.resolver("GET", "/archivos/a/b.json")[1] == {"archivo": "a/b.json"}
+
+
+@pytest.mark.parametrize("ruta", ["/api/data/-1", "/api/data/+1", "/api/data/ 1",
+                                  "/api/data/abc", "/api/data/٣"])
+def test_entero_invalido_responde_400(rutas, ruta):
+    assert codigo(rutas, ruta) == 400
+
+
+def test_ruta_inexistente_y_metodo_no_permitido(rutas):
+    assert codigo(rutas, "/no/existe") == 404
+    assert codigo(rutas, "/usuarios/ana") == 404
+    assert codigo(rutas, "/api/data", "POST") == 405
+    assert codigo(rutas, "/api/data/7", "DELETE") == 405
+
+
+def test_ruta_solo_asincrona_responde_405_en_el_motor_con_hilos():
+    rutas = RegistroRutas()
+
+    @rutas.get("/lenta", asincrona=True)
+    async def lenta(handler):
+        pass
+
+    with pytest.raises(ErrorSolicitud) as error:
+        rutas.despachar(None, SimpleNamespace(metodo="GET", ruta="/lenta"))
+    assert error.value.codigo == 405
+
+
+def test_cadena_de_middleware():
+    rutas = RegistroRutas()
+    traza = []
+
+    @rutas.get("/hola/<int:n>")
+    def hola(handler, n):
+        traza.append(("manejador", n))
+
+    solicitud = SimpleNamespace(metodo="GET", ruta="/hola/3")
+    rutas.despachar(None, solicitud)
+    assert traza == [("manejador", 3)]
+
+    def externo(handler, solicitud, siguiente):
+        traza.append("externo")
+        siguiente()
+
+    def interno(handler, solicitud, siguiente):
+        traza.append("interno")
+        siguiente()
+
+    rutas.usar(externo)
+    rutas.usar(interno)
+    traza.clear()
+    rutas.despachar(None, solicitud)
+    assert traza == ["externo", "interno", ("manejador", 3)]
+
+    # El middleware también ve las solicitudes que terminan en error
+    traza.clear()
+    with pytest.raises(ErrorSolicitud):
+        rutas.despachar(None, SimpleNamespace(metodo="GET", ruta="/adios"))
+    assert traza == ["externo", "interno"]
+
+
+def test_sleep_negativo_responde_400():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), HTTPRequestHandler, hilos=2)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    try:
+        conexion = http.client.HTTPConnection(*servidor.server_address, timeout=5)
+        conexion.request("GET", "/sleep/-1")
+        respuesta = conexion.getresponse()
+        respuesta.read()
+        conexion.close()
+        assert respuesta.status == 400
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+from server.core.sistema import MonitorSistema
+
+
+@pytest.mark.parametrize("intervalo", [0, -1, float("nan")])
+def test_rechaza_intervalos_no_positivos(intervalo):
+    with pytest.raises(ValueError):
+        MonitorSistema(intervalo)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requiere fork")
+def test_cada_proceso_tiene_su_uuid():
+    monitor = MonitorSistema(60)
+    lectura, escritura = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        monitor.muestra()
+        os.write(escritura, monitor.sistema["uuid_servidor"].encode())
+        os._exit(0)
+    os.close(escritura)
+    os.waitpid(pid, 0)
+    del_hijo = os.read(lectura, 64).decode()
+    os.close(lectura)
+
+    monitor.muestra()
+    assert del_hijo and monitor.sistema["uuid_servidor"] != del_hijo
+    assert monitor.muestra().threads["proceso_pid"] == os.getpid()